@@ -1,22 +1,12 @@
 import click
-# from pkg_resources import iter_entry_points
-from importlib.metadata import entry_points
-from click_plugins import with_plugins
-from . import docker as _docker
-from . import config as cfg
-from . import update as _update
-from . import gitlab as _gitlab
-from . import terminal as term
-from . import desktop
 from . import config as cfg
 from . import options
-from . import jupyter as _jupyter
-from .utils import AliasedGroup
+from .utils import LazyGroup
 from .crash import crash_report
 
-# @with_plugins(iter_entry_points('franklin_cli.plugins'))
-@with_plugins(entry_points().select(group='franklin_cli.plugins'))
-@click.group(cls=AliasedGroup, 
+
+# subcommands and plugins are imported only when used to keep startup fast
+@click.group(cls=LazyGroup, plugin_group='franklin_cli.plugins',
              context_settings={"auto_envvar_prefix": "FRANKLIN"}, 
              epilog=f'See {cfg.documentation_url} for more details')
 @click.version_option(package_name='franklin-cli')
@@ -27,24 +17,29 @@ def franklin(update: bool) -> None:
     A tool to download notebook exercises and run jupyter 
     in a way that fits each exercise.    
     """
+    from . import terminal as term
+    from . import update as _update
     term.check_window_size()
     # utils.show_banner()
     if update:
         _update.update_packages()
-    desktop.ensure_docker_installed(lambda _: None)
-    desktop.config_set('UseResourceSaver', False)
-
-franklin.add_command(_update.update)
 
-franklin.add_command(_jupyter.jupyter)
+franklin.add_lazy_command('update', 'franklin_cli.update:update',
+                          'Update Franklin packages manually.')
 
-franklin.add_command(_docker.docker)
+franklin.add_lazy_command('jupyter', 'franklin_cli.jupyter:jupyter',
+                          'Launch Jupyter notebook environment for Franklin '
+                          'exercises.')
 
-franklin.add_command(_gitlab.download)
+franklin.add_lazy_command('docker', 'franklin_cli.docker:docker',
+                          'Commands for showing Docker content.')
 
-franklin.add_command(_docker.cleanup_all_command)
+franklin.add_lazy_command('download', 'franklin_cli.gitlab:download',
+                          'Download a Franklin exercise repository to the '
+                          'local filesystem.')
 
-franklin.add_command(_docker.docker)
+franklin.add_lazy_command('cleanup', 'franklin_cli.docker:cleanup_all_command',
+                          'Cleanup and reclaim disk space used by Franklin.')
 
 
 @click.group(hidden=True)
@@ -71,6 +66,7 @@ def destruct():
 def button():
     """A button command that does something."""
     import time
+    from . import terminal as term
     click.echo("Self destruct will commence in ...")   
     for i in range(10, 0, -1):
         term.secho(f"\r{i} ", end='', fg='red', flush=True)
@@ -40,9 +40,10 @@ from .base import (
     AuthenticationError,
     RepositoryNotFoundError,
     UserNotFoundError,
-    PermissionError as BackendPermissionError
+    BackendPermissionError
 )
 
+from .caching import CachingBackendMixin
 from .factory import BackendFactory, get_backend, get_current_backend
 from .gitlab_backend import GitLabBackend
 from .github_backend import GitHubBackend
@@ -50,6 +51,7 @@ from .github_backend import GitHubBackend
 __all__ = [
     # Base classes
     'GitBackend',
+    'CachingBackendMixin',
     
     # Implementations
     'GitLabBackend',
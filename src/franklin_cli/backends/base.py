@@ -6,8 +6,9 @@ must follow, along with common data models used across backends.
 """
 
 from abc import ABC, abstractmethod
+from itertools import islice
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any, Union, IO
+from typing import Dict, Iterator, List, Optional, Any, Union, IO
 from datetime import datetime
 from enum import Enum
 
@@ -313,6 +314,29 @@ class GitBackend(ABC):
         """
         pass
     
+    def iter_repositories(self, limit: Optional[int] = None,
+                          **filters) -> Iterator[Repository]:
+        """
+        Iterate over repositories with optional filters.
+        
+        Backends override this to fetch repositories page by page, so 
+        the first results are available at once and memory use does not 
+        grow with the number of repositories.
+        
+        Parameters
+        ----------
+        limit : Optional[int]
+            Maximum number of repositories to yield, by default all.
+        **filters
+            Filter options as for list_repositories.
+        
+        Yields
+        ------
+        Repository
+            Repositories matching the filters.
+        """
+        yield from islice(self.list_repositories(**filters), limit)
+    
     @abstractmethod
     def fork_repository(self, repo_id: str, **kwargs) -> Repository:
         """
@@ -0,0 +1,230 @@
+"""
+Response caching for git backends.
+
+Lookups such as get_repository, get_user and get_group are often made
+repeatedly for the same IDs within one command, each a full API round
+trip. `CachingBackendMixin` keeps their results for a per-method time to
+live, drops them when a mutating call could have changed them, and lets
+concurrent identical lookups share a single call. `BackendFactory`
+applies it to every registered backend through `cached_backend_class`.
+"""
+
+import time
+import threading
+from functools import lru_cache
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple, Type
+
+from .base import GitBackend
+
+
+class ResponseCache:
+    """
+    Thread-safe cache of method results with time to live and
+    coalescing of concurrent calls.
+
+    Entries are grouped by scope, the name of the method that produced
+    them, so that all results of a method can be invalidated at once.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize the cache.
+
+        Parameters
+        ----------
+        ttls : Optional[Dict[str, float]]
+            Seconds to keep results for, by scope. Results of scopes not
+            listed, or with a time to live of zero, are not kept, but
+            concurrent calls are still coalesced.
+        """
+        self.ttls = dict(ttls or {})
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple[str, Hashable], Tuple[float, Any]] = {}
+        self._in_flight: Dict[Tuple[str, Hashable], Future] = {}
+        self._generations: Dict[str, int] = {}
+
+    def call(self, scope: str, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Return a cached result, or call func once for all concurrent
+        callers with the same scope and key.
+
+        Parameters
+        ----------
+        scope : str
+            Scope of the result, usually the method name.
+        key : Hashable
+            Arguments identifying the result within the scope.
+        func : Callable[[], Any]
+            Function computing the result.
+
+        Returns
+        -------
+        Any
+            Result of func. Exceptions are raised to all waiting callers
+            and not cached.
+        """
+        entry_key = (scope, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+            future = self._in_flight.get(entry_key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[entry_key] = future
+                generation = self._generations.get(scope, 0)
+        if not owner:
+            return future.result()
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                if self._in_flight.get(entry_key) is future:
+                    del self._in_flight[entry_key]
+                ttl = self.ttls.get(scope, 0)
+                # results of calls started before an invalidation are stale
+                if ttl > 0 and future.exception() is None and \
+                        self._generations.get(scope, 0) == generation:
+                    self._entries[entry_key] = (time.monotonic() + ttl,
+                                                future.result())
+
+    def invalidate(self, scopes: Optional[Iterable[str]] = None) -> None:
+        """
+        Drop cached results.
+
+        Parameters
+        ----------
+        scopes : Optional[Iterable[str]]
+            Scopes to drop, by default all.
+        """
+        with self._lock:
+            scopes = set(self.ttls) | {s for s, _ in self._entries} \
+                if scopes is None else set(scopes)
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            for entry_key in list(self._entries):
+                if entry_key[0] in scopes:
+                    del self._entries[entry_key]
+            # later callers must not join calls started before now
+            for entry_key in list(self._in_flight):
+                if entry_key[0] in scopes:
+                    del self._in_flight[entry_key]
+
+
+def _cache_key(args: tuple, kwargs: Dict[str, Any]) -> Hashable:
+    return args, tuple(sorted(kwargs.items()))
+
+
+def _cached(cls: type, name: str) -> Callable:
+    def method(self, *args, **kwargs):
+        parent = getattr(super(cls, self), name)
+        return self.response_cache.call(
+            name, _cache_key(args, kwargs), lambda: parent(*args, **kwargs))
+    method.__name__ = name
+    method.__doc__ = f"Cached {name}."
+    method._caching_wrapper = True
+    return method
+
+
+def _invalidating(cls: type, name: str,
+                  scopes: Optional[Tuple[str, ...]]) -> Callable:
+    def method(self, *args, **kwargs):
+        try:
+            return getattr(super(cls, self), name)(*args, **kwargs)
+        finally:
+            self.response_cache.invalidate(scopes)
+    method.__name__ = name
+    method.__doc__ = f"{name}, invalidating cached lookups it may change."
+    method._caching_wrapper = True
+    return method
+
+
+class CachingBackendMixin:
+    """
+    Cache lookups of a GitBackend and coalesce concurrent identical ones.
+
+    Mix in before a GitBackend subclass. Cached results are shared
+    objects and should not be modified by callers.
+
+    Attributes
+    ----------
+    cache_ttls : Dict[str, float]
+        Seconds to keep results of each cached method.
+    invalidations : Dict[str, Optional[Tuple[str, ...]]]
+        Cached methods whose results each mutating method invalidates,
+        or None for all.
+    response_cache : ResponseCache
+        Cache of the instance.
+    """
+
+    cache_ttls: Dict[str, float] = {
+        'get_repository': 60,
+        'get_current_user': 300,
+        'get_user': 300,
+        'get_group': 300,
+    }
+
+    invalidations: Dict[str, Optional[Tuple[str, ...]]] = {
+        'authenticate': None,
+        'create_repository': ('get_repository',),
+        'update_repository': ('get_repository',),
+        'delete_repository': ('get_repository',),
+        'fork_repository': ('get_repository',),
+        'create_file': ('get_repository',),
+        'update_file': ('get_repository',),
+        'delete_file': ('get_repository',),
+        'create_merge_request': ('get_repository',),
+        'create_user': ('get_user',),
+        'create_group': ('get_group',),
+        'add_user_to_group': ('get_group',),
+        'remove_user_from_group': ('get_group',),
+    }
+
+    def __init__(self, *args, **kwargs):
+        # backend constructors may already make cached calls
+        self.response_cache = ResponseCache(self.cache_ttls)
+        super().__init__(*args, **kwargs)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name in list(cls.cache_ttls) + list(cls.invalidations):
+            if name in cls.__dict__ or not hasattr(cls, name) or \
+                    getattr(getattr(cls, name), '_caching_wrapper', False):
+                continue
+            if name in cls.cache_ttls:
+                setattr(cls, name, _cached(cls, name))
+            else:
+                setattr(cls, name, _invalidating(cls, name,
+                                                 cls.invalidations[name]))
+
+
+@lru_cache(maxsize=None)
+def cached_backend_class(backend_class: Type[GitBackend]) -> Type[GitBackend]:
+    """
+    Subclass of a backend class with cached lookups.
+
+    Parameters
+    ----------
+    backend_class : Type[GitBackend]
+        Backend class implementing GitBackend interface.
+
+    Returns
+    -------
+    Type[GitBackend]
+        Subclass with the same name, or backend_class itself if it
+        already caches.
+    """
+    if issubclass(backend_class, CachingBackendMixin):
+        return backend_class
+    return type(backend_class.__name__, (CachingBackendMixin, backend_class),
+                {'__module__': backend_class.__module__,
+                 '__qualname__': backend_class.__qualname__})
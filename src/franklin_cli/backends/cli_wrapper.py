@@ -288,10 +288,12 @@ def create(name, visibility, description, organization, backend_type):
               type=click.Choice(['public', 'private', 'internal']),
               help='Filter by visibility')
 @click.option('--search', help='Search term')
+@click.option('--limit', type=click.IntRange(min=1),
+              help='Maximum number of repositories to list')
 @click.option('--backend', 'backend_type',
               type=click.Choice(['gitlab', 'github']),
               help='Backend to use (overrides config)')
-def list(owned, visibility, search, backend_type):
+def list(owned, visibility, search, limit, backend_type):
     """List repositories."""
     # Get backend
     if backend_type:
@@ -314,17 +316,19 @@ def list(owned, visibility, search, backend_type):
         if search:
             filters['search'] = search
         
-        repos = backend.list_repositories(**filters)
-        
-        if repos:
-            click.echo(f"Found {len(repos)} repositories:\n")
-            for repo in repos:
-                visibility_badge = f"[{repo.visibility.value}]"
-                click.echo(f"  {repo.full_name} {visibility_badge}")
-                if repo.description:
-                    click.echo(f"    {repo.description}")
-                click.echo(f"    {repo.web_url}")
-                click.echo()
+        # Print repositories as pages arrive
+        count = 0
+        for repo in backend.iter_repositories(limit=limit, **filters):
+            visibility_badge = f"[{repo.visibility.value}]"
+            click.echo(f"  {repo.full_name} {visibility_badge}")
+            if repo.description:
+                click.echo(f"    {repo.description}")
+            click.echo(f"    {repo.web_url}")
+            click.echo()
+            count += 1
+        
+        if count:
+            click.echo(f"Found {count} repositories.")
         else:
             click.echo("No repositories found.")
         
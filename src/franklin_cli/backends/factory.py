@@ -12,6 +12,7 @@ from typing import Dict, Type, Optional, Any
 from pathlib import Path
 
 from .base import GitBackend, BackendError
+from .caching import cached_backend_class
 from .gitlab_backend import GitLabBackend
 from .github_backend import GitHubBackend
 
@@ -67,7 +68,9 @@ class BackendFactory:
         backend_type : str
             Type of backend to create
         **config
-            Backend-specific configuration
+            Backend-specific configuration. A 'cache' setting of False 
+            (or a string such as 'false', 'no', 'off' or '0') disables 
+            caching of repository, user and group lookups.
         
         Returns
         -------
@@ -77,7 +80,8 @@ class BackendFactory:
         Raises
         ------
         ValueError
-            If backend type is not registered
+            If backend type is not registered, or the 'cache' setting 
+            is not a boolean
         """
         backend_type = backend_type.lower()
         
@@ -89,6 +93,8 @@ class BackendFactory:
             )
         
         backend_class = cls._backends[backend_type]
+        if _as_bool(config.pop('cache', True)):
+            backend_class = cached_backend_class(backend_class)
         return backend_class(**config)
     
     @classmethod
@@ -166,6 +172,19 @@ class BackendFactory:
         cls._current_backend_type = None
 
 
+def _as_bool(value: Any) -> bool:
+    """Interpret a setting given as a boolean or as a string, e.g. from 
+    a configuration file or an expanded environment variable."""
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in ('true', 'yes', 'on', '1'):
+            return True
+        if normalized in ('false', 'no', 'off', '0', ''):
+            return False
+        raise ValueError(f"Invalid boolean setting: '{value}'")
+    return bool(value)
+
+
 def load_backend_config(config_path: Optional[str] = None) -> Dict[str, Any]:
     """
     Load backend configuration from file.
@@ -7,7 +7,8 @@ using the PyGithub library to interact with GitHub's API.
 
 import os
 import base64
-from typing import Dict, List, Optional, Any, Union
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Any, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -71,10 +72,11 @@ class GitHubBackend(GitBackend):
             # Create GitHub client
             if self.base_url:
                 # GitHub Enterprise
-                self.gh = Github(base_url=self.base_url, login_or_token=token)
+                self.gh = Github(base_url=self.base_url, login_or_token=token,
+                                 per_page=100)
             else:
                 # GitHub.com
-                self.gh = Github(login_or_token=token)
+                self.gh = Github(login_or_token=token, per_page=100)
             
             # Test authentication by getting current user
             self.current_user = self.gh.get_user()
@@ -233,18 +235,36 @@ class GitHubBackend(GitBackend):
     
     def list_repositories(self, **filters) -> List[Repository]:
         """List GitHub repositories with filters."""
+        return list(self.iter_repositories(**filters))
+    
+    def iter_repositories(self, limit: Optional[int] = None,
+                          **filters) -> Iterator[Repository]:
+        """
+        Iterate over GitHub repositories page by page.
+        
+        Visibility is filtered by the API when listing the authenticated 
+        user's or an organization's repositories. Other filters, including 
+        the substring search in names and descriptions, are applied to 
+        each page as it arrives. The search API is not used, as it matches 
+        whole words only and returns at most 1000 results.
+        """
         if not self._authenticated:
             raise AuthenticationError("Not authenticated")
         
         try:
-            repos = []
+            visibility = filters.get('visibility')
+            if isinstance(visibility, Visibility):
+                visibility = visibility.value
             
             # Determine what to list
             if filters.get('organization') or filters.get('org'):
                 # List organization repositories
                 org_name = filters.get('organization') or filters.get('org')
                 org = self.gh.get_organization(org_name)
-                repo_list = org.get_repos()
+                if visibility in ('public', 'private'):
+                    repo_list = org.get_repos(type=visibility)
+                else:
+                    repo_list = org.get_repos()
             elif filters.get('user'):
                 # List specific user's repositories
                 user = self.gh.get_user(filters['user'])
@@ -252,41 +272,44 @@ class GitHubBackend(GitBackend):
             else:
                 # List authenticated user's repositories
                 user = self.gh.get_user()
+                params = {}
                 if filters.get('owned'):
-                    repo_list = user.get_repos(affiliation='owner')
-                else:
-                    repo_list = user.get_repos()
-            
-            # Apply filters
-            for repo in repo_list:
-                # Visibility filter
-                if 'visibility' in filters:
-                    visibility = filters['visibility']
-                    if isinstance(visibility, Visibility):
-                        visibility = visibility.value
-                    
-                    if visibility == 'public' and repo.private:
-                        continue
-                    elif visibility == 'private' and not repo.private:
-                        continue
-                
-                # Archived filter
-                if 'archived' in filters and repo.archived != filters['archived']:
-                    continue
-                
-                # Search filter (simple name matching)
-                if 'search' in filters:
-                    search_term = filters['search'].lower()
-                    if search_term not in repo.name.lower() and search_term not in (repo.description or '').lower():
-                        continue
-                
-                repos.append(self._convert_github_repo_to_repository(repo))
+                    params['affiliation'] = 'owner'
+                if visibility in ('public', 'private'):
+                    params['visibility'] = visibility
+                repo_list = user.get_repos(**params)
             
-            return repos
+            # Apply remaining filters
+            matches = (repo for repo in repo_list
+                       if self._matches(repo, filters, visibility))
+            for repo in islice(matches, limit):
+                yield self._convert_github_repo_to_repository(repo)
             
         except Exception as e:
             raise BackendError(f"Failed to list repositories: {e}")
     
+    @staticmethod
+    def _matches(repo: Any, filters: Dict[str, Any],
+                 visibility: Optional[str]) -> bool:
+        """Apply filters the GitHub API could not apply to a repository."""
+        # Visibility filter
+        if visibility == 'public' and repo.private:
+            return False
+        elif visibility == 'private' and not repo.private:
+            return False
+        
+        # Archived filter
+        if 'archived' in filters and repo.archived != filters['archived']:
+            return False
+        
+        # Search filter (simple name matching)
+        if 'search' in filters:
+            search_term = filters['search'].lower()
+            if search_term not in repo.name.lower() and search_term not in (repo.description or '').lower():
+                return False
+        
+        return True
+    
     def fork_repository(self, repo_id: str, **kwargs) -> Repository:
         """Fork a GitHub repository."""
         if not self._authenticated:
@@ -7,7 +7,8 @@ wrapping the existing GitLab functionality in Franklin.
 
 import os
 import sys
-from typing import Dict, List, Optional, Any, Union
+from itertools import islice
+from typing import Dict, Iterator, List, Optional, Any, Union
 from datetime import datetime
 from pathlib import Path
 
@@ -188,12 +189,17 @@ class GitLabBackend(GitBackend):
     
     def list_repositories(self, **filters) -> List[Repository]:
         """List GitLab projects with filters."""
+        return list(self.iter_repositories(**filters))
+    
+    def iter_repositories(self, limit: Optional[int] = None,
+                          **filters) -> Iterator[Repository]:
+        """Iterate over GitLab projects page by page, filtered by the API."""
         if not self._authenticated:
             raise AuthenticationError("Not authenticated")
         
         try:
             # Map filters to GitLab API parameters
-            params = {}
+            params = {'per_page': min(limit, 100) if limit else 100}
             
             if 'owned' in filters and filters['owned']:
                 params['owned'] = True
@@ -207,10 +213,11 @@ class GitLabBackend(GitBackend):
             if 'archived' in filters:
                 params['archived'] = filters['archived']
             
-            # Get projects
-            projects = self.gl.projects.list(all=True, **params)
+            # Get projects lazily, one page at a time
+            projects = self.gl.projects.list(iterator=True, **params)
             
-            return [self._convert_project_to_repository(p) for p in projects]
+            for project in islice(projects, limit):
+                yield self._convert_project_to_repository(project)
             
         except Exception as e:
             raise BackendError(f"Failed to list repositories: {e}")
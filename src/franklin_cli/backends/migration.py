@@ -10,8 +10,15 @@ import sys
 import yaml
 import json
 import shutil
+import time
+import uuid
+import hashlib
+import tempfile
+import threading
 import subprocess
-from typing import Dict, List, Optional, Any, Tuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 from pathlib import Path
 from datetime import datetime
 
@@ -163,11 +170,318 @@ class ConfigMigrator:
         return backup_path
 
 
+# Limits on API calls made by migrations to each backend, as the maximum 
+# number of concurrent calls and the minimum number of seconds between 
+# the start of two calls. GitHub asks clients to make mutating requests 
+# serially and at least one second apart to avoid secondary rate limits.
+API_RATE_LIMITS = {
+    'GitHubBackend': (1, 1.0),
+    'GitLabBackend': (4, 0.1),
+}
+DEFAULT_RATE_LIMIT = (2, 0.5)
+
+
+class RateLimiter:
+    """
+    Bound the number and rate of concurrent calls to a backend API.
+
+    Use as a context manager around each API call.
+    """
+
+    def __init__(self, max_concurrent: int = 1, min_interval: float = 0.0):
+        """
+        Initialize the rate limiter.
+        
+        Parameters
+        ----------
+        max_concurrent : int
+            Maximum number of calls in progress at the same time.
+        min_interval : float
+            Minimum number of seconds between the start of two calls.
+        """
+        self.min_interval = min_interval
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @classmethod
+    def for_backend(cls, backend: GitBackend) -> 'RateLimiter':
+        """Create a rate limiter with the limits of a backend."""
+        return cls(*API_RATE_LIMITS.get(type(backend).__name__,
+                                        DEFAULT_RATE_LIMIT))
+
+    def __enter__(self) -> 'RateLimiter':
+        self._semaphore.acquire()
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self.min_interval
+        if start > now:
+            time.sleep(start - now)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._semaphore.release()
+
+
+MIGRATION_JOURNAL_FILE = Path.home() / '.franklin' / 'migration_journal.jsonl'
+
+
+class MigrationJournal:
+    """
+    Append-only journal of the stages of repository migrations.
+
+    Each stage reached by a migration is appended to a JSON lines file 
+    and flushed to disk at once, so the state of an interrupted bulk 
+    migration survives a crash or Ctrl-C. Migrations are keyed by source 
+    repository and target backend. A 'started' entry resets the state 
+    of a migration.
+    """
+
+    STAGES = ('started', 'created', 'cloned', 'pushed')
+
+    def __init__(self, path: Path = MIGRATION_JOURNAL_FILE):
+        """
+        Initialize the journal.
+        
+        Parameters
+        ----------
+        path : Path
+            Location of the journal file, created on the first write.
+        """
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def record(self, source: str, backend: str, stage: str, **fields) -> None:
+        """
+        Append a stage of a migration to the journal.
+        
+        Parameters
+        ----------
+        source : str
+            Repository identifier in the source backend.
+        backend : str
+            Name of the target backend.
+        stage : str
+            One of STAGES.
+        **fields
+            Data of the stage, e.g. the target repository or pushed refs.
+        """
+        if stage not in self.STAGES:
+            raise ValueError(f"Unknown migration stage: {stage}")
+        entry = {'source': source, 'backend': backend, 'stage': stage,
+                 **fields, 'timestamp': datetime.now().isoformat()}
+        line = json.dumps(entry) + '\n'
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def load(self) -> Dict[Tuple[str, str], Dict[str, Any]]:
+        """
+        Replay the journal.
+        
+        Returns
+        -------
+        Dict[Tuple[str, str], Dict[str, Any]]
+            The state of each migration by source and target backend, 
+            with the fields of its entries and the set of stages reached 
+            under 'stages'.
+        """
+        states = {}
+        if not self.path.exists():
+            return states
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # line cut short by a crash
+                    continue
+                key = (entry.pop('source'), entry.pop('backend'))
+                stage = entry.pop('stage')
+                if stage == 'started' or key not in states:
+                    states[key] = {'stages': set()}
+                states[key].update(entry)
+                states[key]['stages'].add(stage)
+        return states
+
+
+MIRROR_CACHE_DIR = Path.home() / '.franklin' / 'mirrors'
+MIRROR_CACHE_SIZE = 10 * 1024**3
+
+
+@contextmanager
+def temporary_mirror(url: str) -> Iterator[Path]:
+    """Bare mirror clone of a repository, deleted on exit."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo_path = Path(tmpdir) / 'mirror.git'
+        subprocess.run(['git', 'clone', '--mirror', url, str(repo_path)],
+                       check=True, capture_output=True)
+        yield repo_path
+
+
+class MirrorCache:
+    """
+    Persistent bare mirrors of source repositories.
+
+    Mirrors are keyed by the clone URL of the repository and updated 
+    with a fetch of new objects rather than cloned again, so repeated 
+    transfers of the same repositories only download what changed. The 
+    least recently used mirrors are removed when the total size exceeds 
+    the limit. Credentials are passed to git on the command line and 
+    never stored in the mirrors.
+    """
+
+    def __init__(self, root: Path = MIRROR_CACHE_DIR,
+                 max_size: int = MIRROR_CACHE_SIZE):
+        """
+        Initialize the cache.
+        
+        Parameters
+        ----------
+        root : Path
+            Directory holding the mirrors.
+        max_size : int
+            Maximum total size of the mirrors in bytes.
+        """
+        self.root = Path(root)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._users = {}
+
+    def path(self, url: str) -> Path:
+        """Location of the mirror of the repository at url."""
+        key = hashlib.sha1(url.encode()).hexdigest()
+        return self.root / f'{key}.git'
+
+    @contextmanager
+    def checkout(self, url: str, 
+                 auth_url: Optional[str] = None) -> Iterator[Path]:
+        """
+        Create or update the mirror of a repository.
+
+        The mirror is not evicted while the context is active.
+        
+        Parameters
+        ----------
+        url : str
+            Clone URL of the repository, used as cache key.
+        auth_url : Optional[str]
+            Clone URL with credentials, by default url.
+        
+        Yields
+        ------
+        Path
+            Location of the up-to-date bare mirror.
+        """
+        auth_url = auth_url or url
+        path = self.path(url)
+        # waiting for the key lock counts as use, so the lock is not 
+        # dropped by evict() while it is shared
+        with self._lock:
+            key_lock = self._key_locks.setdefault(path, threading.Lock())
+            self._users[path] = self._users.get(path, 0) + 1
+        damaged = None
+        try:
+            with key_lock:
+                damaged = self._update(path, url, auth_url)
+                yield path
+        finally:
+            with self._lock:
+                self._users[path] -= 1
+                if not self._users[path]:
+                    del self._users[path]
+            if damaged is not None:
+                shutil.rmtree(damaged, ignore_errors=True)
+        self.evict()
+
+    @staticmethod
+    def _discard(path: Path) -> Path:
+        """Move a mirror out of the way so it can be deleted without 
+        holding a lock."""
+        trash = path.with_name(f'{path.name}.{uuid.uuid4().hex}.trash')
+        os.replace(path, trash)
+        return trash
+
+    def _update(self, path: Path, url: str, auth_url: str) -> Optional[Path]:
+        """Fetch into an existing mirror or clone a new one. Returns the 
+        moved location of a damaged mirror that was replaced, if any."""
+        damaged = None
+        if path.exists():
+            try:
+                subprocess.run(
+                    ['git', 'fetch', '--prune', '--quiet', auth_url,
+                     '+refs/*:refs/*'],
+                    cwd=path, check=True, capture_output=True)
+                os.utime(path)
+                return None
+            except subprocess.CalledProcessError:
+                # damaged mirror, clone it again
+                damaged = self._discard(path)
+        self.root.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f'{path.name}.{uuid.uuid4().hex}.tmp')
+        try:
+            subprocess.run(['git', 'clone', '--mirror', '--quiet', auth_url,
+                            str(tmp_path)], check=True, capture_output=True)
+            subprocess.run(['git', 'remote', 'set-url', 'origin', url],
+                           cwd=tmp_path, check=True, capture_output=True)
+            os.replace(tmp_path, path)
+        finally:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        return damaged
+
+    @staticmethod
+    def _size(path: Path) -> int:
+        return sum(f.stat().st_size for f in path.rglob('*') if f.is_file())
+
+    def evict(self) -> List[Path]:
+        """
+        Remove least recently used mirrors until the cache fits its size 
+        limit. Mirrors in use, or waited for, are kept.
+        
+        Returns
+        -------
+        List[Path]
+            Removed mirrors.
+        """
+        if not self.root.exists():
+            return []
+        mirrors = sorted(self.root.glob('*.git'), key=lambda p: p.stat().st_mtime)
+        sizes = {p: self._size(p) for p in mirrors}
+        total = sum(sizes.values())
+        removed = []
+        # also mirrors left behind when replacing a damaged one failed
+        trash = list(self.root.glob('*.trash'))
+        for path in mirrors:
+            if total <= self.max_size:
+                break
+            with self._lock:
+                if path in self._users:
+                    continue
+                try:
+                    trash.append(self._discard(path))
+                except OSError:
+                    continue
+                self._key_locks.pop(path, None)
+            total -= sizes[path]
+            removed.append(path)
+        for path in trash:
+            shutil.rmtree(path, ignore_errors=True)
+        return removed
+
+
 class RepositoryMigrator:
     """Migrate repositories between different backends."""
     
     def __init__(self, source_backend: GitBackend, target_backend: GitBackend,
-                 dry_run: bool = False):
+                 dry_run: bool = False, jobs: int = 1,
+                 journal: Optional[MigrationJournal] = None,
+                 resume: bool = False,
+                 mirror_cache: Optional[MirrorCache] = None):
         """
         Initialize repository migrator.
         
@@ -179,12 +493,61 @@ class RepositoryMigrator:
             Target backend to migrate to.
         dry_run : bool
             If True, show what would be done without making changes.
+        jobs : int
+            Number of repositories to migrate concurrently.
+        journal : Optional[MigrationJournal]
+            Journal recording the stages of each migration. Defaults to 
+            one at MIGRATION_JOURNAL_FILE.
+        resume : bool
+            If True, continue migrations recorded in the journal, skipping 
+            completed stages.
+        mirror_cache : Optional[MirrorCache]
+            Cache of source mirrors updated incrementally. If None, each 
+            transfer clones the source into a temporary directory.
         """
         self.source = source_backend
         self.target = target_backend
         self.dry_run = dry_run
+        self.jobs = max(1, jobs)
         self.migration_log = []
+        self.journal = journal or MigrationJournal()
+        self.resume = resume
+        self.mirror_cache = mirror_cache
+        self._journal_state = self.journal.load() if resume else {}
+        self._log_lock = threading.Lock()
+        self._source_limiter = RateLimiter.for_backend(source_backend)
+        self._target_limiter = RateLimiter.for_backend(target_backend)
     
+    def _echo(self, repo_id: str, message: str, **styles) -> None:
+        """Print a message about a repository, prefixed by its name 
+        when repositories are migrated concurrently."""
+        if self.jobs > 1:
+            message = f"[{repo_id}] {message.strip()}"
+        click.secho(message, **styles)
+
+    def _record(self, repo_id: str, stage: str, **fields) -> None:
+        """Record a stage of the migration of a repository in the journal."""
+        if not self.dry_run:
+            self.journal.record(repo_id, type(self.target).__name__, stage,
+                                **fields)
+
+    def _resume_state(self, repo_id: str, 
+                      target_namespace: Optional[str]) -> Dict[str, Any]:
+        """Journaled state of an earlier migration of a repository to the 
+        same namespace, or an empty dict."""
+        state = self._journal_state.get((repo_id, type(self.target).__name__))
+        if not state or state.get('namespace') != target_namespace:
+            return {}
+        return state
+
+    def _log(self, repo_id: str, status: str, **fields) -> None:
+        """Add an entry to the migration log, keyed by the repository 
+        identifier as given to migrate_repository."""
+        entry = {'source': repo_id, 'status': status, **fields,
+                 'timestamp': datetime.now().isoformat()}
+        with self._log_lock:
+            self.migration_log.append(entry)
+
     def migrate_repository(self, repo_id: str, 
                           target_namespace: Optional[str] = None) -> Optional[Repository]:
         """
@@ -201,49 +564,78 @@ class RepositoryMigrator:
         -------
         Optional[Repository]
             Created repository in target backend, or None if dry run.
+
+        Notes
+        -----
+        When resuming, a target repository created by an earlier run is 
+        reused, and if all refs were pushed and the target still has them, 
+        the content is not transferred again.
         """
-        click.echo(f"\nMigrating repository: {repo_id}")
+        self._echo(repo_id, f"\nMigrating repository: {repo_id}")
+        state = self._resume_state(repo_id, target_namespace)
         
         # Get source repository
         try:
-            source_repo = self.source.get_repository(repo_id)
+            with self._source_limiter:
+                source_repo = self.source.get_repository(repo_id)
         except Exception as e:
-            click.secho(f"✗ Failed to get source repository: {e}", fg='red')
+            self._echo(repo_id, f"✗ Failed to get source repository: {e}", fg='red')
+            self._log(repo_id, 'failed', error=f"Failed to get source repository: {e}")
             return None
         
-        click.echo(f"  Source: {source_repo.full_name}")
+        self._echo(repo_id, f"  Source: {source_repo.full_name}")
         
         if self.dry_run:
-            click.echo(f"  Would create in target: {target_namespace or 'default namespace'}")
+            self._echo(repo_id, f"  Would create in target: {target_namespace or 'default namespace'}")
             return None
         
-        # Create in target backend
-        try:
-            target_repo = self.target.create_repository(
-                name=source_repo.name,
-                visibility=source_repo.visibility,
-                description=source_repo.description,
-                namespace=target_namespace,
-                init_readme=False  # We'll copy content
-            )
-            click.echo(f"  Target: {target_repo.full_name}")
-        except Exception as e:
-            click.secho(f"✗ Failed to create target repository: {e}", fg='red')
-            return None
+        # Reuse target repository created by an earlier run
+        target_repo = None
+        if 'created' in state.get('stages', ()):
+            try:
+                with self._target_limiter:
+                    target_repo = self.target.get_repository(state['target'])
+                self._echo(repo_id, f"  Target: {target_repo.full_name} (exists)")
+            except Exception:
+                target_repo = None
+        
+        if target_repo is not None and 'pushed' in state['stages'] and \
+                self._remote_refs(target_repo, self.target) == state['refs']:
+            self._log(repo_id, 'verified', target=target_repo.full_name)
+            self._echo(repo_id, f"✓ Already migrated {source_repo.name}", fg='green')
+            return target_repo
+        
+        if target_repo is None:
+            self._record(repo_id, 'started', namespace=target_namespace)
+        
+            # Create in target backend
+            try:
+                with self._target_limiter:
+                    target_repo = self.target.create_repository(
+                        name=source_repo.name,
+                        visibility=source_repo.visibility,
+                        description=source_repo.description,
+                        namespace=target_namespace,
+                        init_readme=False  # We'll copy content
+                    )
+                self._echo(repo_id, f"  Target: {target_repo.full_name}")
+            except Exception as e:
+                self._echo(repo_id, f"✗ Failed to create target repository: {e}", fg='red')
+                self._log(repo_id, 'failed', error=f"Failed to create target repository: {e}")
+                return None
+            self._record(repo_id, 'created', target=target_repo.full_name)
         
         # Clone and push content
-        if not self._transfer_content(source_repo, target_repo):
-            click.secho(f"✗ Failed to transfer content", fg='red')
+        if not self._transfer_content(source_repo, target_repo, repo_id=repo_id):
+            self._echo(repo_id, f"✗ Failed to transfer content", fg='red')
+            self._log(repo_id, 'failed', target=target_repo.full_name,
+                      error="Failed to transfer content")
             return None
         
         # Log migration
-        self.migration_log.append({
-            'source': source_repo.full_name,
-            'target': target_repo.full_name,
-            'timestamp': datetime.now().isoformat()
-        })
+        self._log(repo_id, 'migrated', target=target_repo.full_name)
         
-        click.secho(f"✓ Successfully migrated {source_repo.name}", fg='green')
+        self._echo(repo_id, f"✓ Successfully migrated {source_repo.name}", fg='green')
         return target_repo
     
     def migrate_multiple(self, repo_ids: List[str],
@@ -262,14 +654,33 @@ class RepositoryMigrator:
         -------
         int
             Number of successfully migrated repositories.
+
+        Notes
+        -----
+        Up to `jobs` repositories are migrated concurrently. Calls to 
+        the APIs of the two backends are throttled by their rate limits 
+        independently of the number of jobs.
         """
         success_count = 0
+        workers = min(self.jobs, len(repo_ids)) or 1
         
-        with click.progressbar(repo_ids, label='Migrating repositories') as bar:
-            for repo_id in bar:
-                result = self.migrate_repository(repo_id, target_namespace)
+        with click.progressbar(length=len(repo_ids),
+                               label='Migrating repositories') as bar, \
+                ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(self.migrate_repository, repo_id,
+                                       target_namespace): repo_id
+                       for repo_id in repo_ids}
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except Exception as e:
+                    repo_id = futures[future]
+                    self._echo(repo_id, f"✗ Failed to migrate {repo_id}: {e}", fg='red')
+                    self._log(repo_id, 'failed', error=str(e))
+                    result = None
                 if result:
                     success_count += 1
+                bar.update(1)
         
         return success_count
     
@@ -289,7 +700,8 @@ class RepositoryMigrator:
         """
         # Get all owned repositories from source
         try:
-            repos = self.source.list_repositories(owned=True)
+            with self._source_limiter:
+                repos = self.source.list_repositories(owned=True)
         except Exception as e:
             click.secho(f"✗ Failed to list source repositories: {e}", fg='red')
             return 0
@@ -310,69 +722,86 @@ class RepositoryMigrator:
         repo_ids = [repo.full_name for repo in repos]
         return self.migrate_multiple(repo_ids, target_namespace)
     
+    @staticmethod
+    def _authenticated_url(url: str, backend: GitBackend) -> str:
+        """Add the token of a backend to an HTTPS clone URL."""
+        if hasattr(backend, 'token') and backend.token:
+            if 'gitlab' in url:
+                url = url.replace('https://', f'https://oauth2:{backend.token}@')
+            elif 'github' in url:
+                url = url.replace('https://', f'https://{backend.token}@')
+        return url
+
+    @staticmethod
+    def _parse_refs(output: str) -> Dict[str, str]:
+        """Branches and tags from 'git ls-remote' or 'git show-ref' output."""
+        refs = {}
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) != 2:
+                continue
+            sha, ref = fields
+            if ref.startswith(('refs/heads/', 'refs/tags/')) and \
+                    not ref.endswith('^{}'):
+                refs[ref] = sha
+        return refs
+
+    def _remote_refs(self, repo: Repository, 
+                     backend: GitBackend) -> Optional[Dict[str, str]]:
+        """Branches and tags of a remote repository, or None if they 
+        cannot be listed."""
+        try:
+            result = subprocess.run(
+                ['git', 'ls-remote', '--heads', '--tags',
+                 self._authenticated_url(repo.clone_url, backend)],
+                check=True, capture_output=True, text=True)
+        except (subprocess.CalledProcessError, OSError):
+            return None
+        return self._parse_refs(result.stdout)
+
+    def _mirror(self, source_repo: Repository):
+        """Context manager giving a bare mirror of the source repository."""
+        clone_url = self._authenticated_url(source_repo.clone_url, self.source)
+        if self.mirror_cache is not None:
+            return self.mirror_cache.checkout(source_repo.clone_url, clone_url)
+        return temporary_mirror(clone_url)
+
     def _transfer_content(self, source_repo: Repository, 
-                         target_repo: Repository) -> bool:
+                         target_repo: Repository,
+                         repo_id: Optional[str] = None) -> bool:
         """Transfer repository content via git clone and push."""
-        import tempfile
-        
-        with tempfile.TemporaryDirectory() as tmpdir:
-            repo_path = Path(tmpdir) / source_repo.name
-            
-            try:
-                # Clone from source
-                click.echo("  Cloning from source...")
-                clone_url = source_repo.clone_url
-                
-                # Add authentication if available
-                if hasattr(self.source, 'token') and self.source.token:
-                    if 'gitlab' in clone_url:
-                        clone_url = clone_url.replace('https://', 
-                                                    f'https://oauth2:{self.source.token}@')
-                    elif 'github' in clone_url:
-                        clone_url = clone_url.replace('https://',
-                                                    f'https://{self.source.token}@')
-                
-                subprocess.run(
-                    ['git', 'clone', '--mirror', clone_url, str(repo_path)],
-                    check=True,
-                    capture_output=True
-                )
-                
-                # Update remote to target
-                click.echo("  Pushing to target...")
-                push_url = target_repo.clone_url
-                
-                # Add authentication if available
-                if hasattr(self.target, 'token') and self.target.token:
-                    if 'gitlab' in push_url:
-                        push_url = push_url.replace('https://',
-                                                   f'https://oauth2:{self.target.token}@')
-                    elif 'github' in push_url:
-                        push_url = push_url.replace('https://',
-                                                  f'https://{self.target.token}@')
-                
-                subprocess.run(
-                    ['git', 'remote', 'set-url', 'origin', push_url],
+        repo_id = repo_id or source_repo.full_name
+        try:
+            # Clone from source, or update its cached mirror
+            self._echo(repo_id, "  Cloning from source...")
+            with self._mirror(source_repo) as repo_path:
+                refs = self._parse_refs(subprocess.run(
+                    ['git', 'show-ref'],
                     cwd=repo_path,
-                    check=True
-                )
+                    capture_output=True,
+                    text=True
+                ).stdout)
+                self._record(repo_id, 'cloned', refs=refs)
                 
-                # Push all branches and tags
+                # Push all branches and tags that differ in the target
+                self._echo(repo_id, "  Pushing to target...")
+                push_url = self._authenticated_url(target_repo.clone_url, self.target)
                 subprocess.run(
-                    ['git', 'push', '--mirror'],
+                    ['git', 'push', '--mirror', push_url],
                     cwd=repo_path,
                     check=True,
                     capture_output=True
                 )
-                
-                return True
-                
-            except subprocess.CalledProcessError as e:
-                click.echo(f"  Git error: {e}")
-                return False
-            except Exception as e:
-                click.echo(f"  Error: {e}")
-                return False
+                self._record(repo_id, 'pushed', refs=refs)
+            
+            return True
+            
+        except subprocess.CalledProcessError as e:
+            self._echo(repo_id, f"  Git error: {e}")
+            return False
+        except Exception as e:
+            self._echo(repo_id, f"  Error: {e}")
+            return False
     
     def save_migration_log(self, path: Optional[Path] = None) -> None:
         """Save migration log to file."""
@@ -516,9 +945,19 @@ def config(dry_run):
 @click.option('--target-namespace', help='Target namespace/organization')
 @click.option('--repo', multiple=True, help='Specific repository to migrate')
 @click.option('--all-repos', is_flag=True, help='Migrate all owned repositories')
+@click.option('--jobs', '-j', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of repositories to migrate concurrently')
+@click.option('--resume', is_flag=True,
+              help='Continue an interrupted migration, skipping completed work')
+@click.option('--mirror-cache/--no-mirror-cache', default=False, show_default=True,
+              help='Keep mirrors of source repositories in ~/.franklin for '
+                   'incremental transfers in later migrations')
+@click.option('--cache-size', type=click.FloatRange(min=0), default=10, show_default=True,
+              help='Maximum size of the mirror cache in GB')
 @click.option('--dry-run', is_flag=True, help='Show what would be done without making changes')
 def repos(source_backend, target_backend, source_token, target_token,
-         target_namespace, repo, all_repos, dry_run):
+         target_namespace, repo, all_repos, jobs, resume, mirror_cache, cache_size,
+         dry_run):
     """Migrate repositories between backends."""
     
     if source_backend == target_backend:
@@ -541,7 +980,9 @@ def repos(source_backend, target_backend, source_token, target_token,
         return
     
     # Create migrator
-    migrator = RepositoryMigrator(source, target, dry_run=dry_run)
+    cache = MirrorCache(max_size=int(cache_size * 1024**3)) if mirror_cache else None
+    migrator = RepositoryMigrator(source, target, dry_run=dry_run, jobs=jobs,
+                                  resume=resume, mirror_cache=cache)
     
     # Perform migration
     if all_repos:
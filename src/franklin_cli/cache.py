@@ -0,0 +1,256 @@
+"""
+Persistent on-disk cache for the GitLab course and exercise catalog.
+
+Catalog listings (course subgroups, exercise projects and the container
+registry listing) change rarely but are requested by every ``franklin
+download`` and ``franklin docker`` listing. This module keeps the last
+response for each listing under ``~/.franklin`` together with its ETag so
+that repeat invocations can be served from disk while the entry is fresh
+and revalidated with a cheap conditional request once it is not.
+
+The same store records when each exercise image was last pulled or found
+up to date, so that launching Jupyter need not contact the registry on
+every run, and when the Docker Desktop settings were last applied and
+its version last checked, so that commands needing Docker do not repeat
+these checks on every run.
+"""
+
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+if sys.platform == 'win32':
+    import msvcrt
+else:
+    import fcntl
+
+from .logger import logger
+
+
+CATALOG_CACHE_FILE = Path.home() / '.franklin' / 'catalog_cache.json'
+IMAGE_FRESHNESS_FILE = Path.home() / '.franklin' / 'image_freshness.json'
+DESKTOP_STATE_FILE = Path.home() / '.franklin' / 'desktop_state.json'
+
+
+@contextmanager
+def file_lock(lock_file: Path) -> Iterator[None]:
+    """
+    Hold an exclusive lock on lock_file, blocking until it is available.
+
+    Parameters
+    ----------
+    lock_file : Path
+        File used only for locking; created if missing.
+    """
+    lock_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_file, 'a+') as f:
+        if sys.platform == 'win32':
+            f.seek(0)
+            # LK_LOCK retries for about ten seconds before raising
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+class CatalogCache:
+    """
+    Key-value store of catalog responses with timestamps and ETags.
+
+    Entries are kept in memory once loaded. Every update re-reads the 
+    file and writes it back atomically while holding a file lock, so 
+    concurrent franklin processes neither see a partially written file 
+    nor lose each other's entries.
+
+    Attributes
+    ----------
+    cache_file : Path
+        Location of the JSON file backing the cache.
+    refresh : bool
+        If True, all entries are treated as expired and must be
+        revalidated against the server (set by ``--refresh`` for the 
+        duration of a command, see refreshing()).
+    """
+
+    def __init__(self, cache_file: Path = CATALOG_CACHE_FILE):
+        """Initialize cache backed by cache_file."""
+        self.cache_file = Path(cache_file)
+        self.refresh = False
+        self._entries = None
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def refreshing(self, refresh: bool = True) -> Iterator[None]:
+        """
+        Set refresh while the context is active and restore it on exit.
+
+        Commands taking ``--refresh`` use this with 
+        ``click.Context.with_resource`` so that the flag does not leak 
+        into later calls in the same process.
+        """
+        previous = self.refresh
+        self.refresh = refresh
+        try:
+            yield
+        finally:
+            self.refresh = previous
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        """Read entries from persistent storage."""
+        try:
+            if self.cache_file.exists():
+                with open(self.cache_file, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load catalog cache: {e}")
+        return {}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Load entries from persistent storage on first use."""
+        if self._entries is None:
+            self._entries = self._read()
+        return self._entries
+
+    def _update(self, change: Callable[[Dict[str, Dict[str, Any]]], Any]) -> None:
+        """
+        Apply change to the entries on disk and save them.
+
+        The file is re-read under a file lock so that entries written by 
+        other processes since it was loaded are kept.
+        """
+        with self._lock:
+            try:
+                with file_lock(self.cache_file.with_suffix('.lock')):
+                    self._entries = self._read()
+                    change(self._entries)
+                    self._write(self._entries)
+            except Exception as e:
+                logger.warning(f"Failed to save catalog cache: {e}")
+                # keep the change in memory for this process
+                change(self._load())
+
+    def _write(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Write entries atomically."""
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = self.cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_file, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp_file, self.cache_file)
+
+    def save(self) -> None:
+        """Save entries to persistent storage, merged with those on disk."""
+        with self._lock:
+            entries = dict(self._load())
+        self._update(lambda on_disk: on_disk.update(entries))
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Get cache entry for key.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (normally the request URL with parameters).
+
+        Returns
+        -------
+        Optional[Dict[str, Any]]
+            Entry with 'data', 'etag' and 'fetched' keys, or None.
+        """
+        with self._lock:
+            return self._load().get(key)
+
+    def is_fresh(self, entry: Dict[str, Any], ttl: float) -> bool:
+        """Determine if an entry can be used without revalidation.
+
+        Parameters
+        ----------
+        entry : Dict[str, Any]
+            Cache entry as returned by get().
+        ttl : float
+            Time to live in seconds.
+
+        Returns
+        -------
+        bool
+            True if the entry is younger than ttl and refresh is not set.
+        """
+        if self.refresh:
+            return False
+        return time.time() - entry.get('fetched', 0) < ttl
+
+    def set(self, key: str, data: Any, etag: Optional[str] = None,
+            pagination: Optional[Dict[str, str]] = None) -> None:
+        """Store response data for key.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        data : Any
+            JSON serializable response data.
+        etag : Optional[str]
+            ETag header of the response, if any.
+        pagination : Optional[Dict[str, str]]
+            Pagination headers of the response, if any.
+        """
+        entry = {
+            'data': data,
+            'etag': etag,
+            'pagination': pagination or {},
+            'fetched': time.time()
+        }
+        self._update(lambda entries: entries.__setitem__(key, entry))
+
+    def touch(self, key: str,
+              pagination: Optional[Dict[str, str]] = None) -> None:
+        """Record that the entry for key was successfully revalidated.
+
+        Parameters
+        ----------
+        key : str
+            Cache key.
+        pagination : Optional[Dict[str, str]]
+            Pagination headers of the revalidation response, replacing 
+            the stored ones if given.
+        """
+        with self._lock:
+            known = self._load().get(key)
+        if known is None:
+            return
+        fetched = time.time()
+
+        def change(entries):
+            # keep our copy if another process removed the entry
+            entry = entries.setdefault(key, dict(known))
+            entry['fetched'] = fetched
+            if pagination is not None:
+                entry['pagination'] = pagination
+
+        self._update(change)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._update(lambda entries: entries.clear())
+
+
+catalog_cache = CatalogCache()
+
+# image URL -> digest of the local image when it was last found up to date
+image_freshness = CatalogCache(IMAGE_FRESHNESS_FILE)
+
+# 'settings' -> mtime of the Docker Desktop settings file when last applied,
+# 'update_check' -> time of the last Docker Desktop update check
+desktop_state = CatalogCache(DESKTOP_STATE_FILE)
@@ -48,9 +48,56 @@ pg_ljust : int
     Left justification width for progress bars.
 docker_settings : dict
     Default Docker Desktop configuration settings.
+catalog_cache_ttl : dict
+    Seconds before cached GitLab catalog listings are revalidated.
+gitlab_per_page : int
+    Number of entries requested per page from the GitLab API.
+gitlab_max_workers : int
+    Maximum number of concurrent requests to the GitLab API.
+http_timeout : float
+    Default timeout in seconds for HTTP requests.
+http_retries : int
+    Number of retries for failed idempotent HTTP requests.
+http_backoff_factor : float
+    Backoff factor in seconds for retries of HTTP requests.
+container_start_timeout : float
+    Seconds to wait for Docker to create an exercise container.
+jupyter_start_timeout : float
+    Seconds to wait for Jupyter in a container to report its URL.
+pull_retries : int
+    Number of times to retry an interrupted image pull.
+pull_backoff_factor : float
+    Backoff factor in seconds between retries of image pulls.
+image_update_policy : str
+    When to check the registry for updates of a downloaded image:
+    'always', 'interval' or 'never'.
+image_update_interval : float
+    Hours between update checks with the 'interval' policy.
+docker_inventory_ttl : float
+    Seconds to reuse container and image listings within one command.
+docker_max_workers : int
+    Maximum number of containers or images removed concurrently.
+jupyter_port : int
+    Preferred host port for Jupyter in exercise containers.
+dash_port : int
+    Preferred host port for Dash apps in exercise containers.
+port_reservation_ttl : float
+    Seconds a host port reserved for a starting container stays reserved.
+warm_pool_size : int
+    Maximum number of containers kept ready by 'franklin docker warm'.
+warm_after_download : bool
+    Prepare a warm container for each exercise after 'franklin download'.
+desktop_start_settings : list
+    Docker Desktop settings applied before running commands that need Docker.
+desktop_update_interval : float
+    Hours between checks for Docker Desktop updates.
+desktop_start_timeout : float
+    Seconds to wait for Docker Desktop to respond after a start or restart.
+desktop_update_timeout : float
+    Seconds to wait for Docker Desktop to respond after an update.
 """
 
-from typing import Dict, Any
+from typing import Dict, List, Any
 
 name: str = 'franklin'
 maintainer_email: str = 'kaspermunch@birc.au.dk'
@@ -75,6 +122,44 @@ bold_text_on_windows: bool = False
 pg_options: Dict[str, Any] = dict(fill_char='=', empty_char=' ', width=36, show_eta=False)
 pg_ljust: int = 30
 
+container_start_timeout: float = 50
+jupyter_start_timeout: float = 120
+
+pull_retries: int = 3
+pull_backoff_factor: float = 2
+
+image_update_policy: str = 'interval'
+image_update_interval: float = 12
+
+docker_inventory_ttl: float = 2
+docker_max_workers: int = 8
+
+jupyter_port: int = 8888
+dash_port: int = 8050
+port_reservation_ttl: float = 60
+
+warm_pool_size: int = 3
+warm_after_download: bool = False
+
+desktop_start_settings: List[str] = ['UseResourceSaver',
+                                     'OpenUIOnStartupDisabled']
+desktop_update_interval: float = 24
+desktop_start_timeout: float = 60
+desktop_update_timeout: float = 300
+
+gitlab_per_page: int = 100
+gitlab_max_workers: int = 8
+
+http_timeout: float = 10
+http_retries: int = 3
+http_backoff_factor: float = 0.5
+
+catalog_cache_ttl: Dict[str, int] = {
+            "courses": 3600,
+            "exercises": 900,
+            "registry": 300,
+        }
+
 docker_settings: Dict[str, Any] = {
             "AutoDownloadUpdates": True,
             "AutoPauseTimedActivitySeconds": 30,
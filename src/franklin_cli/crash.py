@@ -5,7 +5,6 @@ import inspect
 import webbrowser
 import urllib.parse
 import pyperclip
-import requests
 import json
 import click
 from functools import wraps
@@ -194,6 +193,7 @@ def crash_report(func: Callable) -> Callable:
                 "body": body,
                 "labels": ['bug']
             }
+            import requests # not imported at startup to keep it fast
             response = requests.post(url, headers=headers, data=json.dumps(data))
             response.raise_for_status()  # Raises an HTTPError for bad responses        
             issue_data = response.json()
@@ -13,6 +13,10 @@ from functools import wraps
 import sys
 import os
 import tempfile
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    tomllib = None
 
 
 def crash_report(func):
@@ -46,6 +50,23 @@ curl -fsSL https://pixi.sh/install.sh | bash
 '''
 
 
+def declared_packages(manifest='pixi.toml'):
+    """Names of the dependencies declared in the pixi manifest for the 
+    notebook environment: the default dependencies and those that 
+    'pixi add --feature exercise --platform linux-64' adds to."""
+    if tomllib is None or not os.path.exists(manifest):
+        return set()
+    with open(manifest, 'rb') as f:
+        data = tomllib.load(f)
+    exercise = data.get('feature', {}).get('exercise', {})
+    tables = [data, exercise.get('target', {}).get('linux-64', {})]
+    names = set()
+    for table in tables:
+        for key in ('dependencies', 'pypi-dependencies'):
+            names.update(table.get(key, {}))
+    return names
+
+
 @crash_report
 def load_ipython_extension(ipython):
     """Load the Franklin magic extension.
@@ -73,6 +94,16 @@ def load_ipython_extension(ipython):
         if not packages:
             print("Usage: %franklin <package-name> <package-name> ...")
             return
+
+        # packages without version specs that are already declared need 
+        # no solve
+        declared = declared_packages()
+        present = [p for p in packages if p in declared]
+        packages = [p for p in packages if p not in declared]
+        if present:
+            print(f"Already installed: {', '.join(present)}")
+        if not packages:
+            return
         
         # Check if Pixi is installed
         pixi_exe = os.environ.get('PIXI_EXE', '/home/vscode/.pixi/bin/pixi')
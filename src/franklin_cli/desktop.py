@@ -11,6 +11,9 @@ from . import config as cfg
 from subprocess import check_output, DEVNULL, TimeoutExpired
 from .logger import logger
 from . import system
+from . import http_client
+from .engine import engine, with_fallback, socket_candidates
+from .cache import desktop_state
 import subprocess
 import time
 import shutil
@@ -22,6 +25,10 @@ from functools import wraps
 from . import system
 
 
+# set once Docker Desktop is known to be running in this process
+_desktop_ready = False
+
+
 def ensure_docker_installed(func: Callable) -> Callable:
     """
     Decorator for functions that require Docker Desktop to be installed.
@@ -96,6 +103,37 @@ def write_user_config(settings: dict) -> None:
         json.dump(settings, f)
 
 
+def update_user_config(settings: dict) -> bool:
+    """
+    Updates the Docker Desktop configuration file with the settings, 
+    leaving the file untouched if they are already set.
+
+    Parameters
+    ----------
+    settings : 
+        Variable names and values.
+
+    Returns
+    -------
+    :
+        True if the file was written.
+    """
+    config = read_user_config()
+    changed = False
+    for variable, value in settings.items():
+        if variable == 'DiskSizeMiB':
+            # for some reason Docker Desktop only accepts values in multiples of 1024
+            value = int(value / 1024) * 1024
+        if variable in config and config[variable] == value:
+            continue
+        logger.debug(f"Setting {variable} to {value}")
+        config[variable] = value
+        changed = True
+    if changed:
+        write_user_config(config)
+    return changed
+
+
 # class docker_config():
 #     """
 #     Contest manager for Docker Desktop settings.
@@ -156,8 +194,6 @@ def config_get(variable: str=None) -> None:
             term.echo(f'{str(variable).rjust(31)}: {config[variable]}', 
                       nowrap=True)
 
-    write_user_config(config)
-
     # with docker_config() as config:
     #     if variable is not None:
     #         if variable not in cfg.docker_settings:
@@ -174,6 +210,8 @@ def config_set(variable: str, value: Any) -> None:
     """
     Set value of Docker configuration variable.
 
+    The settings file is only rewritten if the value changes.
+
     Parameters
     ----------
     variable : 
@@ -189,18 +227,10 @@ def config_set(variable: str, value: Any) -> None:
         term.echo(f'Variable "{variable}" cannot be set/changed by Franklin.')
         return
     
-    config = read_user_config()
-
     if type(value) is str:
         value = utils.as_type(value)
 
-    if variable == 'DiskSizeMiB':
-        # for some reason Docker Desktop only accepts values in multiples of 1024
-        value = int(value / 1024) * 1024
-
-    logger.debug(f"Setting {variable} to {value}")
-    config[variable] = value
-    write_user_config(config)
+    update_user_config({variable: value})
 
 
 def config_reset(variable: str=None) -> None:
@@ -213,32 +243,26 @@ def config_reset(variable: str=None) -> None:
         Variable name, by default None in which case all variables are reset.
     """
     if variable:
-        logger.debug(
-            f"Setting {variable} to {cfg.docker_settings[variable]}")
         config_set(variable, cfg.docker_settings[variable])
     else:
-        config = read_user_config()
-        for variable in cfg.docker_settings:
-            logger.debug(
-                f"Setting {variable} to {cfg.docker_settings[variable]}")
-            config[variable] = cfg.docker_settings[variable]
-        write_user_config(config)
+        update_user_config(cfg.docker_settings)
 
 
 def config_fit():
     """Set resource limits to reasonable values given available resources.
     """
-
-    config_reset()
+    settings = dict(cfg.docker_settings)
 
     nr_cpu = psutil.cpu_count(logical=True)
     logger.debug(f"Fitting Cpus to {int(nr_cpu // 2)}")
-    config_set('Cpus', int(nr_cpu // 2))
+    settings['Cpus'] = int(nr_cpu // 2)
 
     svmem = psutil.virtual_memory()
     mem_mb = svmem.total // (1024 ** 2)
-    logger.debug(f"Fitting MemoryMiB to {int(mem_mb * 0.7)}")
-    config_set('MemoryMiB', int(mem_mb // 2))
+    logger.debug(f"Fitting MemoryMiB to {int(mem_mb // 2)}")
+    settings['MemoryMiB'] = int(mem_mb // 2)
+
+    update_user_config(settings)
 
 
 def install_desktop() -> None:
@@ -360,12 +384,10 @@ def install_desktop() -> None:
 
     if not desktop_status() == 'running':
         desktop_start()
-        term.dummy_progressbar(seconds=10, label='Starting Docker Desktop:')
-
-    if not desktop_status() == 'running':
-        term.secho("Docker Desktop is not running. "
-                   "Please install Docker Desktop manually.", fg='red')
-        sys.exit(1)
+        if not wait_for_desktop():
+            term.secho("Docker Desktop is not running. "
+                       "Please install Docker Desktop manually.", fg='red')
+            sys.exit(1)
 
     config_reset()
 
@@ -376,29 +398,120 @@ def install_desktop() -> None:
     #  /Applications/Docker.app/Contents/MacOS/uninstall
 
 
+def apply_start_settings() -> None:
+    """
+    Apply the Docker Desktop settings in cfg.desktop_start_settings.
+
+    The modification time of the settings file is recorded once the
+    settings are applied. As long as the file is unchanged, it is not
+    read again, neither in this nor in later franklin processes.
+    """
+    settings_file = get_user_config_file()
+    if not settings_file.parent.exists():
+        return
+    entry = desktop_state.get('settings')
+    if (entry is not None and settings_file.exists()
+            and entry['data'] == settings_file.stat().st_mtime):
+        return
+    update_user_config({variable: cfg.docker_settings[variable]
+                        for variable in cfg.desktop_start_settings})
+    if settings_file.exists():
+        desktop_state.set('settings', settings_file.stat().st_mtime)
+
+
+def check_desktop_update() -> None:
+    """
+    Update Docker Desktop if cfg.desktop_update_interval hours have passed 
+    since the last check.
+    """
+    entry = desktop_state.get('update_check')
+    if entry is not None and desktop_state.is_fresh(
+            entry, cfg.desktop_update_interval * 3600):
+        return
+    update_desktop()
+    desktop_state.set('update_check', None)
+
+
 @ensure_docker_installed
 def failsafe_start_desktop() -> None:
     """
     Starts Docker Desktop if it is not running, attempting to handle any 
     errors.
+
+    Once Docker Desktop is found running, later calls in the same process
+    return immediately.
     """
+    global _desktop_ready
+    if _desktop_ready:
+        return
 
     logger.debug('Starting Docker Desktop')
 
-    config_set('OpenUIOnStartupDisabled', True)
+    apply_start_settings()
 
     if not desktop_status() == 'running':
         desktop_restart()
         term.echo('')
-        term.dummy_progressbar(seconds=10, label='Starting Docker Desktop:')
-
-    if not desktop_status() == 'running':
-        term.secho("Could not reach Docker Desktop. "
-                   "Please quit Docker Desktop manually.", fg='red')
-        sys.exit(1)
+        if not wait_for_desktop():
+            term.secho("Could not reach Docker Desktop. "
+                       "Please quit Docker Desktop manually.", fg='red')
+            sys.exit(1)
 
     if system.system() == 'Darwin':
-        update_desktop()
+        check_desktop_update()
+
+    _desktop_ready = True
+
+
+def _ping() -> bool:
+    """
+    Check if the Docker daemon responds, without spawning the docker CLI 
+    where the Engine socket can be used.
+    """
+    if engine.socket_path is not None or socket_candidates():
+        return engine.ping()
+    return desktop_status() == 'running'
+
+
+def wait_for_desktop(label: str='Starting Docker Desktop:', 
+                     timeout: float=None, restarting: bool=False) -> bool:
+    """
+    Wait for the Docker daemon to respond, showing a progressbar.
+
+    Parameters
+    ----------
+    label : 
+        Label for progressbar, by default 'Starting Docker Desktop:'
+    timeout : 
+        Seconds to wait, by default cfg.desktop_start_timeout.
+    restarting : 
+        Wait for the daemon to go down before waiting for it to respond, 
+        for restarts that happen in the background, by default False. If 
+        the daemon keeps responding for cfg.desktop_start_timeout seconds, 
+        it is taken to not restart.
+
+    Returns
+    -------
+    :
+        True if the daemon responded before the timeout.
+    """
+    if timeout is None:
+        timeout = cfg.desktop_start_timeout
+    start = time.monotonic()
+    went_down = not restarting
+
+    def responds():
+        nonlocal went_down
+        if not _ping():
+            went_down = True
+            return False
+        return went_down or \
+            time.monotonic() - start > cfg.desktop_start_timeout
+
+    ready = term.polling_progressbar(responds, timeout=timeout, label=label)
+    if not ready:
+        logger.debug(f"Docker Desktop did not respond within {timeout} seconds.")
+    return ready
 
 
 def desktop_restart() -> None:
@@ -453,6 +566,8 @@ def desktop_status() -> str:
     :
         'running' if Docker Desktop is running.
     """
+    if engine.ping():
+        return 'running'
     stdout = utils.run_cmd('docker desktop status --format json', check=False)
     if not stdout:
         return 'not running'
@@ -469,10 +584,12 @@ def desktop_version() -> Version:
     :
         Docker Desktop version.
     """
-    stdout = subprocess.check_output(
-        utils.fmt_cmd('docker version --format json'))
-    data = json.loads(stdout.decode())
-    cmp = data['Server']['Components']
+    def cli():
+        stdout = subprocess.check_output(
+            utils.fmt_cmd('docker version --format json'))
+        return json.loads(stdout.decode())['Server']
+
+    cmp = with_fallback(engine.version, cli)['Components']
     vers = [c['Version'] for c in cmp if c['Name'] == 'Engine'][0]
     return Version(vers)
 
@@ -487,11 +604,11 @@ def get_latest_docker_version() -> Version:
     """
     # A bit of a hack: gets version as tag of base docker image 
     # (which is for use with "docker in docker")
-    s = requests.Session()
-    url = 'https://registry.hub.docker.com'
-    '/v2/namespaces/library/repositories/docker/tags'
+    url = ('https://registry.hub.docker.com'
+           '/v2/namespaces/library/repositories/docker/tags')
     tags = []
-    r  = s.get(url, headers={ "Content-Type" : "application/json"})
+    r  = http_client.session.get(url, 
+                                 headers={ "Content-Type" : "application/json"})
     if not r.ok:
         r.raise_for_status()
     data = r.json()
@@ -528,7 +645,8 @@ def update_desktop() -> None:
                        'Do not interrupt the process. You may be prompted '
                        'for your password to allow the update.', fg='red')
             utils.run_cmd('docker desktop update --quiet')
-            term.dummy_progressbar(
-                seconds=60, label='Docker Desktop is updating:')
+            wait_for_desktop(label='Docker Desktop is updating:', 
+                             timeout=cfg.desktop_update_timeout, 
+                             restarting=True)
 
 
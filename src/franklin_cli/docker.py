@@ -15,13 +15,18 @@ Blah blah blah
 # %%
 
 
+import re
 import json
 import os
+import requests
 import click
 import shutil
 import time
+import tempfile
+import hashlib
 import psutil
 from functools import wraps
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path, PureWindowsPath, PurePosixPath
 import subprocess
 from subprocess import Popen, PIPE, DEVNULL, STDOUT
@@ -35,6 +40,7 @@ from .desktop import (
     install_desktop,
     desktop_status, desktop_start, desktop_stop, 
     desktop_restart, update_desktop, failsafe_start_desktop, 
+    wait_for_desktop,
     desktop_version, 
     config_get, config_set, config_reset, config_fit
 )
@@ -44,11 +50,16 @@ from .utils import AliasedGroup, fmt_cmd
 from .crash import crash_report
 from . import config as cfg
 from . import cutie
-from .gitlab import get_course_names, get_exercise_names
+from .gitlab import resolve_exercise_labels, get_registry_listing
+from .cache import catalog_cache, image_freshness
+from . import options
 from .logger import logger
 from . import system
+from . import http_client
+from .ports import allocate_ports
+from .engine import engine, with_fallback, EngineError
 
-from typing import Tuple, List, Dict, Callable, Any, Optional, Union
+from typing import Tuple, List, Dict, Callable, Any, Optional, Union, Iterable
 
 # import yaml
 # _root = os.path.abspath(os.path.dirname(__file__))
@@ -59,7 +70,7 @@ from typing import Tuple, List, Dict, Callable, Any, Optional, Union
 os.environ['DOCKER_CLI_HINTS'] = 'false'
 
 
-def run_container(image_url: str) -> Tuple[str, Popen, str]:
+def run_container(image_url: str, **run_kwargs: Any) -> Tuple[str, Popen, str]:
     """
     Run a Docker container from a specified image.
 
@@ -71,6 +82,8 @@ def run_container(image_url: str) -> Tuple[str, Popen, str]:
     ----------
     image_url : str
         The Docker image URL/name to run as a container.
+    **run_kwargs : Any
+        Keyword arguments passed to run().
 
     Returns
     -------
@@ -83,9 +96,9 @@ def run_container(image_url: str) -> Tuple[str, Popen, str]:
     Raises
     ------
     Exception
-        If a container ID for the running container is not retrieved within
-        50 seconds, indicating Docker may not be running or the image failed
-        to start.
+        If the container fails to start or its ID is not reported within
+        cfg.container_start_timeout seconds, indicating Docker may not be
+        running or the image failed to start.
 
     Examples
     --------
@@ -94,20 +107,34 @@ def run_container(image_url: str) -> Tuple[str, Popen, str]:
 
     Notes
     -----
-    This function polls for up to 50 seconds (10 iterations × 5 seconds)
-    to find the running container matching the specified image URL.
-    """
-    docker_run_p, port = run(image_url)
-    run_container_id = None
-    for _ in range(10):
-        time.sleep(5)    
-        for cont in containers():
-            if cont['Image'].startswith(image_url):
-                run_container_id  = cont['ID']
-        if run_container_id is not None:
-            return run_container_id, docker_run_p, port
-    else:
-        raise Exception(f"Failed to find running container for image {image_url} after 50 seconds. Docker may not be running or the image failed to start.")
+    The container ID is read from the file passed to 'docker run --cidfile',
+    which Docker writes as soon as the container is created. The file is
+    checked every 50 ms, so the function returns as soon as the container
+    exists, and fails fast if 'docker run' exits before that.
+    """
+    cidfile = os.path.join(tempfile.mkdtemp(prefix='franklin-'), 'cid')
+    docker_run_p, port = run(image_url, cidfile=cidfile, **run_kwargs)
+    try:
+        deadline = time.monotonic() + cfg.container_start_timeout
+        while time.monotonic() < deadline:
+            # polled before reading the cidfile, as 'docker run --detach' 
+            # exits right after writing it
+            exited = docker_run_p.poll() is not None
+            if os.path.exists(cidfile):
+                with open(cidfile) as f:
+                    run_container_id = f.read().strip()
+                if run_container_id:
+                    logger.debug(f"Container {run_container_id} created")
+                    return run_container_id, docker_run_p, port
+            if exited:
+                raise Exception(f"Container for image {image_url} exited with "
+                                f"code {docker_run_p.returncode} before it "
+                                f"started.")
+            time.sleep(0.05)
+        docker_run_p.terminate()
+        raise Exception(f"Failed to find running container for image {image_url} after {cfg.container_start_timeout} seconds. Docker may not be running or the image failed to start.")
+    finally:
+        shutil.rmtree(os.path.dirname(cidfile), ignore_errors=True)
 
 
 def failsafe_run_container(image_url: str) -> Tuple[str, Popen, str]:
@@ -155,6 +182,7 @@ def failsafe_run_container(image_url: str) -> Tuple[str, Popen, str]:
     except:
         prune_all()    
         desktop_restart()    
+        wait_for_desktop()
         return run_container(image_url)
 
 
@@ -186,7 +214,9 @@ def ensure_docker_running(func: Callable[..., Any]) -> Callable[..., Any]:
     Notes
     -----
     Uses failsafe_start_desktop() to handle Docker startup, which includes
-    error recovery mechanisms.
+    error recovery mechanisms. Commands that need Docker declare it with
+    this decorator; the Docker Desktop checks are made once per process and
+    are skipped in later runs while the Docker Desktop settings are unchanged.
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
@@ -264,7 +294,7 @@ def image_exists(image_url: str) -> bool:
     This function uses the images() function to get all local images
     and checks if any repository name starts with the provided image_url.
     """
-    for image in images():
+    for image in images(filters=[f'reference={image_url}']):
         if image['Repository'].startswith(image_url):
             return True
     return False
@@ -345,6 +375,67 @@ def format_table(header: str, table: List[List[str]], ids: List[str],
     return [ids[i]for i in selected_indices]
 
 
+def exercise_labels(image_name: str) -> Optional[Tuple[str, str]]:
+    """
+    Extract course and exercise identifiers from a Franklin image name.
+
+    Parameters
+    ----------
+    image_name : 
+        Image name (repository, optionally with tag).
+
+    Returns
+    -------
+    :
+        Tuple of (course, exercise) identifiers, or None if the image is not
+        a Franklin exercise image.
+    """
+    prefix = f'{cfg.registry_base_url}/{cfg.gitlab_group}'
+    if not image_name.startswith(prefix):
+        return None
+    rep = image_name.replace(prefix, '')
+    if rep.endswith(':latest'):
+        rep = rep[:-7]
+    if rep.startswith('/'):
+        rep = rep[1:]
+    parts = rep.split('/')
+    if len(parts) != 2:
+        return None
+    course_label, exercise_label = parts
+    return course_label, exercise_label
+
+
+def apply_concurrently(func: Callable[..., Any], items: Iterable[str], 
+                       **kwargs: Any) -> None:
+    """
+    Call a function for each of several containers or images concurrently.
+
+    Parameters
+    ----------
+    func : 
+        Function taking a container or image ID as first argument.
+    items : 
+        Container or image IDs.
+    **kwargs : 
+        Keyword arguments passed to func.
+
+    Raises
+    ------
+    Exception
+        The first exception raised by any of the calls, once all calls 
+        have finished.
+    """
+    items = list(items)
+    if not items:
+        return
+    workers = min(len(items), cfg.docker_max_workers)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(func, item, **kwargs) for item in items]
+    errors = [f.exception() for f in futures if f.exception() is not None]
+    if errors:
+        raise errors[0]
+
+
 def container_list(callback: Callable=None) -> None:
     """
     Displays a list of running containers in the terminal. If callback 
@@ -363,35 +454,26 @@ def container_list(callback: Callable=None) -> None:
     :
         None
     """
-    current_containers = containers()
+    current_containers = containers(sizes=True, filters=[franklin_filter()])
     if not current_containers:
         click.echo("\nNo running containers\n")
         return
 
-    course_names = get_course_names()
-    exercise_names = {}
+    labeled = [(exercise_labels(cont['Image']), cont) 
+               for cont in current_containers]
+    labeled = [(labels, cont) for labels, cont in labeled if labels]
+    names = resolve_exercise_labels(labels for labels, _ in labeled)
 
     header = ['Course', 'Exercise', 'Started', 'Size']
     table = []
     ids = []
-    prefix = f'{cfg.registry_base_url}/{cfg.gitlab_group}'
-    for cont in current_containers:
-        if cont['Image'].startswith(prefix):
-            rep = cont['Image'].replace(prefix, '')
-            if rep.endswith(':latest'):
-                rep = rep[:-7]
-            if rep.startswith('/'):
-                rep = rep[1:]
-            course_label, exercise_label = rep.split('/')
-            if exercise_label not in exercise_names:
-                exercise_names.update(get_exercise_names(course_label))
-            course_name = course_names[course_label]
-            exercise_name = exercise_names[exercise_label]
-            ids.append(cont['ID'])
-            table.append(
-                (course_name, exercise_name, 
-                 cont['RunningFor'].replace(' ago', ''), cont['Size'])
-                 )
+    for labels, cont in labeled:
+        course_name, exercise_name = names[labels]
+        ids.append(cont['ID'])
+        table.append(
+            (course_name, exercise_name, 
+             cont['RunningFor'].replace(' ago', ''), cont['Size'])
+             )
 
     if callback is None:
         for row in format_table(
@@ -402,9 +484,9 @@ def container_list(callback: Callable=None) -> None:
     
     term.secho("Select containers:", fg='green')
 
-    for cont_id in format_table(
-        header, table, ids, min_widths=[None, None, 20, 25], select=True):
-        callback(cont_id, force=True)
+    selected = format_table(
+        header, table, ids, min_widths=[None, None, 20, 25], select=True)
+    apply_concurrently(callback, selected, force=True)
 
 
 def image_list(callback: Callable=None):
@@ -423,38 +505,31 @@ def image_list(callback: Callable=None):
     :
         None
     """
-    img = images()
-    if not img:
+    current_images = images(
+        filters=[f'reference={cfg.registry_base_url}/{cfg.gitlab_group}/*/*'])
+    if not current_images:
         click.echo("\nNo images\n")
         return
 
-    course_names = get_course_names()
-    exercise_names = {}
+    labeled = [(exercise_labels(img['Repository']), img) 
+               for img in current_images]
+    labeled = [(labels, img) for labels, img in labeled if labels]
+    names = resolve_exercise_labels(labels for labels, _ in labeled)
 
     header = ['Course', 'Exercise', 'Age', 'Size']
     table = []
     ids = []
-    prefix = f'{cfg.registry_base_url}/{cfg.gitlab_group}'
 
-    for img in images():
-        if img['Repository'].startswith(prefix):
-
-            rep = img['Repository'].replace(prefix, '')
-            if rep.startswith('/'):
-                rep = rep[1:]
-            course_label, exercise_label = rep.split('/')
-            if exercise_label not in exercise_names:
-                exercise_names.update(get_exercise_names(course_label))
-            course_name = course_names[course_label]
-            exercise_name = exercise_names[exercise_label]
-            course_field = course_name
-            exercise_field = exercise_name
-            ids.append(img['ID'])
-            table.append(
-                (course_field, exercise_field, 
-                 img['CreatedSince'].replace(' ago', ''), 
-                 img['Size'].replace("GB", " GB"))
-                 )
+    for labels, img in labeled:
+        course_name, exercise_name = names[labels]
+        course_field = course_name
+        exercise_field = exercise_name
+        ids.append(img['ID'])
+        table.append(
+            (course_field, exercise_field, 
+             img['CreatedSince'].replace(' ago', ''), 
+             img['Size'].replace("GB", " GB"))
+             )
 
     if not ids:
         return
@@ -468,9 +543,9 @@ def image_list(callback: Callable=None):
 
     term.secho("\nSelect images:", fg='green')
 
-    for img_id in format_table(
-        header, table, ids, min_widths=[None, None, 9, 9], select=True):
-        callback(img_id, force=True)
+    selected = format_table(
+        header, table, ids, min_widths=[None, None, 9, 9], select=True)
+    apply_concurrently(callback, selected, force=True)
 
 
 ###########################################################
@@ -533,6 +608,7 @@ def _restart():
     """Restart Docker Desktop.
     """
     desktop_restart()
+    wait_for_desktop()
 
 
 @desktop.command('start')
@@ -541,6 +617,7 @@ def _start():
     """Start Docker Desktop.
     """
     desktop_start()
+    wait_for_desktop()
 
 
 @desktop.command('stop')
@@ -583,46 +660,291 @@ def _version():
     term.echo(desktop_version())
 
 
-def pull(image_url :str) -> None:
+MANIFEST_MEDIA_TYPES = ', '.join([
+    'application/vnd.oci.image.index.v1+json',
+    'application/vnd.docker.distribution.manifest.list.v2+json',
+    'application/vnd.oci.image.manifest.v1+json',
+    'application/vnd.docker.distribution.manifest.v2+json',
+])
+
+
+def local_image_digest(image_url: str) -> Optional[str]:
     """
-    Pull Docker image.
+    Digest of the local copy of an image as recorded when it was pulled.
 
     Parameters
     ----------
     image_url : 
-        Image URL.
+        Image URL without tag.
+
+    Returns
+    -------
+    :
+        Manifest digest (sha256:...) or None if the image is not present.
     """
-    # p = Popen(utils.format_cmd(f'docker pull {image_url}:latest'), stdout=PIPE, stderr=STDOUT, bufsize=1, universal_newlines=True)
-    # p = Popen(fmt_cmd(f'docker pull {image_url}:latest'), stdout=PIPE, stderr=STDOUT, bufsize=1, universal_newlines=True)
-    # f = p.stdout
-    # while True:
-    #     line = f.readline()
-    #     if not line:
-    #         break
-    #     sys.stdout.write(line)
-    #     sys.stdout.flush()
-    # p.wait()
-
-    # buffer = []
-    # while True:            
-    #     c = f.read(1)
-    #     if not c:
-    #         break
-    #     if len(buffer) < 6:
-    #         buffer.append(c)
-    #     else:
-    #         if ''.join(buffer) == 'Digest':
-    #             break
-    #         buffer.append(c)
-    #         buffer.pop(0)
-    #         sys.stdout.write(c)
-    #         sys.stdout.flush()
-    # for c in buffer:
-    #     sys.stdout.write(c)
-    #     sys.stdout.flush()
-    # p.wait()
+    def api():
+        details = engine.inspect_image(f'{image_url}:latest') or {}
+        return details.get('RepoDigests') or []
+
+    def cli():
+        output = utils.run_cmd(
+            f'docker image inspect --format "{{{{json .RepoDigests}}}}" '
+            f'{image_url}:latest', check=False)
+        try:
+            return json.loads(output.strip() or '[]') or []
+        except json.JSONDecodeError:
+            return []
+
+    repo_digests = with_fallback(api, cli)
+    for repo_digest in repo_digests:
+        repo, _, digest = repo_digest.partition('@')
+        if repo == image_url:
+            return digest
+    return None
+
+
+def _registry_token(challenge: str) -> Optional[str]:
+    """
+    Obtain a bearer token for the registry from a WWW-Authenticate challenge.
+
+    Parameters
+    ----------
+    challenge : 
+        Value of the WWW-Authenticate header of a 401 response.
+
+    Returns
+    -------
+    :
+        Bearer token or None if the challenge cannot be answered.
+    """
+    if not challenge.lower().startswith('bearer '):
+        return None
+    params = dict(re.findall(r'(\w+)="([^"]*)"', challenge))
+    realm = params.pop('realm', None)
+    if realm is None:
+        return None
+    response = http_client.session.get(realm, params=params)
+    if not response.ok:
+        return None
+    payload = response.json()
+    return payload.get('token') or payload.get('access_token')
+
 
-    subprocess.run(utils.fmt_cmd(f'docker pull {image_url}:latest'), check=True)
+def registry_image_digest(image_url: str, tag: str='latest') -> Optional[str]:
+    """
+    Digest of an image tag in the registry.
+
+    Parameters
+    ----------
+    image_url : 
+        Image URL without tag, starting with the registry host.
+    tag : 
+        Image tag, by default 'latest'.
+
+    Returns
+    -------
+    :
+        Manifest digest (sha256:...) or None if the registry does not 
+        report a digest.
+
+    Raises
+    ------
+    requests.ConnectionError
+        If the registry cannot be reached.
+    requests.Timeout
+        If the registry does not respond in time.
+    """
+    registry, _, repository = image_url.partition('/')
+    url = f'https://{registry}/v2/{repository}/manifests/{tag}'
+    headers = {'Accept': MANIFEST_MEDIA_TYPES}
+    # no retries: when offline, pull() falls back to the local image
+    try:
+        response = http_client.probe_session.head(url, headers=headers)
+        if response.status_code == 401:
+            token = _registry_token(
+                response.headers.get('WWW-Authenticate', ''))
+            if token is None:
+                return None
+            headers['Authorization'] = f'Bearer {token}'
+            response = http_client.probe_session.head(url, headers=headers)
+    except (requests.ConnectionError, requests.Timeout):
+        raise
+    except requests.RequestException as e:
+        logger.debug(f'Could not get registry digest for {image_url}: {e}')
+        return None
+    if not response.ok:
+        logger.debug(f'Registry returned {response.status_code} for {url}')
+        return None
+    return response.headers.get('Docker-Content-Digest')
+
+
+class PullProgress:
+    """
+    Aggregated progress of the layers in a 'docker pull'.
+
+    Each layer counts two steps: one when it is downloaded and one when 
+    it is extracted. Layers already present locally count as done.
+
+    Attributes
+    ----------
+    layers : 
+        Number of completed steps for each layer ID seen so far.
+    """
+
+    LAYER_LINE = re.compile(r'^([0-9a-f]{12}): (.+)$')
+    STEPS = {
+        'Download complete': 1,
+        'Extracting': 1,
+        'Pull complete': 2,
+        'Already exists': 2,
+    }
+
+    def __init__(self):
+        """Initialize with no layers seen."""
+        self.layers = {}
+
+    @property
+    def length(self) -> int:
+        """Total number of steps for the layers seen so far."""
+        return 2 * len(self.layers)
+
+    @property
+    def done(self) -> int:
+        """Number of completed steps."""
+        return sum(self.layers.values())
+
+    def update(self, line: str) -> int:
+        """
+        Update layer states from a line of 'docker pull' output.
+
+        Parameters
+        ----------
+        line : 
+            Line of output.
+
+        Returns
+        -------
+        :
+            Number of steps completed by this line.
+        """
+        match = self.LAYER_LINE.match(line.strip())
+        if match is None:
+            return 0
+        layer, status = match.groups()
+        steps = 0
+        for prefix, value in self.STEPS.items():
+            if status.startswith(prefix):
+                steps = value
+                break
+        before = self.layers.get(layer, 0)
+        self.layers[layer] = max(before, steps)
+        return self.layers[layer] - before
+
+
+def _pull_with_progress(image_url: str) -> None:
+    """
+    Run 'docker pull' showing per-layer progress as one progress bar.
+
+    Parameters
+    ----------
+    image_url : 
+        Image URL without tag.
+
+    Raises
+    ------
+    subprocess.CalledProcessError
+        If 'docker pull' fails.
+    """
+    cmd = utils.fmt_cmd(f'docker pull {image_url}:latest')
+    progress = PullProgress()
+    output = []
+    with Popen(cmd, stdout=PIPE, stderr=STDOUT, bufsize=1, 
+               universal_newlines=True) as p:
+        with click.progressbar(length=1, label='Pulling layers:'.ljust(cfg.pg_ljust),
+                               **cfg.pg_options) as bar:
+            for line in p.stdout:
+                output.append(line)
+                logger.debug(line.rstrip())
+                steps = progress.update(line)
+                bar.length = max(progress.length, 1)
+                if steps:
+                    bar.update(steps)
+            if p.wait() == 0:
+                bar.update(bar.length - progress.done)
+    if p.returncode:
+        raise subprocess.CalledProcessError(p.returncode, cmd, ''.join(output))
+
+
+def pull(image_url :str, policy: Optional[str]=None) -> None:
+    """
+    Pull Docker image unless the local copy is up to date.
+
+    Parameters
+    ----------
+    image_url : 
+        Image URL.
+    policy : 
+        When to check the registry for updates of an image that is 
+        already present: 'always', 'interval' (at most every 
+        cfg.image_update_interval hours) or 'never'. By default 
+        cfg.image_update_policy.
+
+    Notes
+    -----
+    - Compares the digest of the local image with the registry manifest 
+      and skips the pull if they match
+    - Records the digest and time of each check in the image freshness 
+      cache so that the registry is not contacted again within the 
+      update interval
+    - Uses the local image without updating if the registry cannot be 
+      reached
+    - Shows progress of all layers in one progress bar
+    - Retries up to cfg.pull_retries times with exponential backoff; 
+      Docker keeps completed layers so a retry only fetches the rest
+    """
+    if policy is None:
+        policy = cfg.image_update_policy
+
+    local_digest = local_image_digest(image_url)
+    if local_digest is not None:
+        if policy == 'never':
+            logger.debug(f'Not checking for updates of {image_url}')
+            return
+        entry = image_freshness.get(image_url)
+        if policy == 'interval' and entry is not None \
+                and entry['data'] == local_digest \
+                and image_freshness.is_fresh(
+                    entry, cfg.image_update_interval * 3600):
+            logger.debug(f'{image_url} was checked recently ({local_digest})')
+            term.echo('Image is up to date')
+            return
+        try:
+            remote_digest = registry_image_digest(image_url)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            logger.debug(f'Registry unreachable: {e}')
+            term.secho('Could not check for updates. Using the image '
+                       'already downloaded.', fg='yellow')
+            return
+        if remote_digest == local_digest:
+            logger.debug(f'{image_url} is up to date ({local_digest})')
+            image_freshness.set(image_url, local_digest)
+            term.echo('Image is up to date')
+            return
+
+    for attempt in range(cfg.pull_retries + 1):
+        try:
+            _pull_with_progress(image_url)
+            invalidate_inventory()
+            image_freshness.set(image_url, local_image_digest(image_url))
+            return
+        except subprocess.CalledProcessError as e:
+            logger.debug(f'Pull attempt {attempt + 1} failed:\n{e.output}')
+            if attempt == cfg.pull_retries:
+                raise
+            delay = cfg.pull_backoff_factor * 2 ** attempt
+            term.secho(f'Download interrupted. Retrying in {delay:.0f} seconds.', 
+                       fg='yellow')
+            time.sleep(delay)
 
 
 ## commented out to avoid confusion
@@ -638,7 +960,33 @@ def pull(image_url :str) -> None:
 #     pull(url)
 
 
-def run(image_url :str) -> Tuple[Popen, str]:
+def container_host_ports() -> List[int]:
+    """
+    Host ports published by existing containers.
+
+    Returns
+    -------
+    :
+        Port numbers.
+    """
+    ports = set()
+    for cont in containers():
+        # e.g. "0.0.0.0:8888->8888/tcp, :::8888->8888/tcp"
+        for binding in cont.get('Ports', '').split(','):
+            host, sep, _ = binding.partition('->')
+            host_port = host.rpartition(':')[2].split('-')[0]
+            if sep and host_port.isdigit():
+                ports.add(int(host_port))
+    return sorted(ports)
+
+
+# label recording the host port used for jupyter display
+PORT_LABEL = 'dk.au.franklin.port'
+
+
+def run(image_url :str, cidfile: Optional[str]=None, 
+        workdir: Optional[Path]=None, detach: bool=False, 
+        labels: Optional[Dict[str, str]]=None) -> Tuple[Popen, str]:
     """
     Runs a container from an image.
 
@@ -646,6 +994,17 @@ def run(image_url :str) -> Tuple[Popen, str]:
     ----------
     image_url : 
         Image URL.
+    cidfile : 
+        Path of a (not yet existing) file Docker writes the container ID to
+        once the container is created, by default None.
+    workdir : 
+        Directory mounted as working directory in the container, by 
+        default the current directory.
+    detach : 
+        Run the container in the background and keep it when it stops 
+        instead of removing it, by default False.
+    labels : 
+        Extra container labels, by default None.
 
     Returns
     -------
@@ -664,8 +1023,10 @@ def run(image_url :str) -> Tuple[Popen, str]:
 
     ssh_mount = Path.home() / '.ssh'
     anaconda_mount = Path.home() / '.anaconda'
-    cwd_mount_source = Path.cwd()
-    cwd_mount_target = Path.cwd()
+    if workdir is None:
+        workdir = Path.cwd()
+    cwd_mount_source = Path(workdir)
+    cwd_mount_target = Path(workdir)
     ssh_mount.mkdir(exist_ok=True)
     anaconda_mount.mkdir(exist_ok=True)
     if system.system() == 'Windows':
@@ -677,11 +1038,11 @@ def run(image_url :str) -> Tuple[Popen, str]:
         assert ':' in parts[0]
         cwd_mount_target = PurePosixPath('/', *(cwd_mount_target.parts[1:]))
 
-    # check if the host is running a jupyter server taking up the default port
-    port = 8888
-    occupied_ports = system.jupyter_ports_in_use()
-    if occupied_ports:
-        port = max(occupied_ports) + 1
+    # free host ports for jupyter and dash not published by other containers
+    port, dash_port = allocate_ports(
+        [cfg.jupyter_port, cfg.dash_port], taken=container_host_ports())
+    if dash_port != cfg.dash_port:
+        term.echo(f'Dash apps in this exercise are served on port {dash_port}')
 
     # # check if the port occupied, in whih case it is probably another docker instance using it...
     # if utils.port_in_use(port):
@@ -727,12 +1088,23 @@ def run(image_url :str) -> Tuple[Popen, str]:
         rf"docker run --rm --platform linux/amd64 --label dk.au.gitlab.group={cfg.gitlab_group}"
         rf" --mount type=bind,source={anaconda_mount},target=/root/.anaconda"
         rf" --mount type=bind,source={cwd_mount_source},target={cwd_mount_target}"
-        rf" -w {cwd_mount_target} -i -p 8050:8050 -p {port}:8888 {image_url}:latest"
+        rf" -w {cwd_mount_target} -i -p {dash_port}:8050 -p {port}:8888 {image_url}:latest"
     )
     logger.debug(cmd)
 
     cmd = cmd.split()
     cmd[0] = shutil.which(cmd[0])
+    if cidfile is not None:
+        # added after splitting as the path may contain spaces
+        cmd[2:2] = ['--cidfile', str(cidfile)]
+    labels = {PORT_LABEL: port, **(labels or {})}
+    for key, value in labels.items():
+        cmd[2:2] = ['--label', f'{key}={value}']
+    if detach:
+        cmd.remove('--rm')
+        cmd.remove('-i')
+        cmd[2:2] = ['--detach']
+    invalidate_inventory()
     docker_run_p = Popen(cmd, 
                         stdout=DEVNULL, stderr=DEVNULL, 
                         **popen_kwargs)
@@ -753,6 +1125,226 @@ def run(image_url :str) -> Tuple[Popen, str]:
 #     run(url)
 
 
+###########################################################
+# docker warm subcommand
+###########################################################
+
+WARM_LABEL = 'dk.au.franklin.warm'
+WARM_TIME_LABEL = 'dk.au.franklin.warm.time'
+
+
+def jupyter_responds(port: str) -> bool:
+    """
+    Check if a Jupyter server answers HTTP requests on a host port.
+
+    Parameters
+    ----------
+    port : 
+        Host port.
+
+    Returns
+    -------
+    :
+        True if the server responded (with any status).
+    """
+    try:
+        requests.get(f'http://127.0.0.1:{port}/api/status', timeout=0.5)
+        return True
+    except requests.RequestException:
+        return False
+
+
+def _workdir_key(workdir: Path) -> str:
+    """
+    Short key identifying a working directory in container labels.
+
+    Parameters
+    ----------
+    workdir : 
+        Working directory.
+
+    Returns
+    -------
+    :
+        Hash of the resolved path.
+    """
+    return hashlib.sha1(str(Path(workdir).resolve()).encode()).hexdigest()[:12]
+
+
+def _container_action(container_id: str, action: str) -> None:
+    """
+    Start, pause or unpause a container.
+
+    Parameters
+    ----------
+    container_id : 
+        Container ID.
+    action : 
+        'start', 'pause' or 'unpause'.
+    """
+    invalidate_inventory()
+    with_fallback(
+        lambda: engine.request('POST', f'/containers/{container_id}/{action}'),
+        lambda: utils.run_cmd(f'docker {action} {container_id}'))
+
+
+def container_labels(cont: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Labels of a container as a dictionary.
+
+    Parameters
+    ----------
+    cont : 
+        Container information as returned by containers().
+
+    Returns
+    -------
+    :
+        Label names and values.
+    """
+    labels = {}
+    for label in cont.get('Labels', '').split(','):
+        key, _, value = label.partition('=')
+        if key:
+            labels[key] = value
+    return labels
+
+
+def warm_containers(image_url: Optional[str]=None, 
+                    workdir: Optional[Path]=None) -> List[Dict[str, Any]]:
+    """
+    Warm containers, most recently warmed first.
+
+    Parameters
+    ----------
+    image_url : 
+        Only containers of this image, by default all.
+    workdir : 
+        Only containers for this working directory, by default all.
+
+    Returns
+    -------
+    :
+        Container information as returned by containers().
+    """
+    filters = [franklin_filter()]
+    if workdir is None:
+        filters.append(f'label={WARM_LABEL}')
+    else:
+        filters.append(f'label={WARM_LABEL}={_workdir_key(workdir)}')
+    if image_url is not None:
+        filters.append(f'ancestor={image_url}:latest')
+    warm = containers(filters=filters)
+
+    def warmed(cont):
+        return float(container_labels(cont).get(WARM_TIME_LABEL, 0))
+    return sorted(warm, key=warmed, reverse=True)
+
+
+def warm_container(image_url: str, workdir: Optional[Path]=None, 
+                   pause: bool=True) -> Optional[str]:
+    """
+    Start a container ahead of time so Jupyter can be launched instantly.
+
+    The container is started in the background with the working directory
+    mounted and, once Jupyter inside it responds, paused so it uses no CPU
+    until claimed by claim_warm_container(). Existing warm containers for 
+    the same image and directory are replaced, and the oldest warm 
+    containers are removed to keep at most cfg.warm_pool_size.
+
+    Parameters
+    ----------
+    image_url : 
+        Image URL without tag.
+    workdir : 
+        Exercise directory, by default the current directory.
+    pause : 
+        Pause the container once Jupyter is ready, by default True.
+
+    Returns
+    -------
+    :
+        Container ID, or None if the container could not be paused and 
+        was removed again.
+    """
+    if workdir is None:
+        workdir = Path.cwd()
+    for cont in warm_containers(image_url, workdir):
+        rm_container(cont['ID'], force=True)
+
+    key = _workdir_key(workdir)
+    labels = {WARM_LABEL: key, WARM_TIME_LABEL: str(time.time())}
+    container_id, docker_run_p, port = run_container(
+        image_url, workdir=workdir, detach=True, labels=labels)
+    logger.debug(f'Warm container {container_id} for {workdir} on port {port}')
+
+    deadline = time.monotonic() + cfg.jupyter_start_timeout
+    while not jupyter_responds(port):
+        if time.monotonic() > deadline:
+            rm_container(container_id, force=True)
+            raise TimeoutError(f'Jupyter did not start within '
+                               f'{cfg.jupyter_start_timeout} seconds.')
+        time.sleep(0.5)
+    if pause:
+        try:
+            _container_action(container_id, 'pause')
+        except (EngineError, subprocess.CalledProcessError) as e:
+            # do not leave an unpaused container running in the background
+            logger.warning(f'Could not pause warm container {container_id}: {e}')
+            rm_container(container_id, force=True)
+            return None
+
+    for cont in warm_containers()[cfg.warm_pool_size:]:
+        logger.debug(f"Removing old warm container {cont['ID']}")
+        rm_container(cont['ID'], force=True)
+    return container_id
+
+
+def claim_warm_container(image_url: str, workdir: Optional[Path]=None
+                         ) -> Optional[Tuple[str, Popen, str]]:
+    """
+    Resume a warm container for an image and working directory.
+
+    Parameters
+    ----------
+    image_url : 
+        Image URL without tag.
+    workdir : 
+        Exercise directory, by default the current directory.
+
+    Returns
+    -------
+    :
+        Tuple of container ID, handle of a 'docker wait' process that 
+        exits with the container, and host port used for jupyter display.
+        None if there is no usable warm container.
+    """
+    if workdir is None:
+        workdir = Path.cwd()
+    for cont in warm_containers(image_url, workdir):
+        container_id = cont['ID']
+        port = container_labels(cont).get(PORT_LABEL)
+        try:
+            if port is None:
+                raise RuntimeError('Host port is not recorded')
+            if cont['State'] == 'paused':
+                _container_action(container_id, 'unpause')
+            elif cont['State'] in ['created', 'exited']:
+                # e.g. after Docker Desktop restarted
+                _container_action(container_id, 'start')
+            elif cont['State'] != 'running':
+                raise RuntimeError(f"Container is {cont['State']}")
+        except Exception as e:
+            logger.debug(f'Cannot resume warm container {container_id}: {e}')
+            rm_container(container_id, force=True)
+            continue
+        logger.debug(f'Claimed warm container {container_id} on port {port}')
+        docker_wait_p = Popen(fmt_cmd(f'docker wait {container_id}'), 
+                              stdout=DEVNULL, stderr=DEVNULL)
+        return container_id, docker_wait_p, port
+    return None
+
+
 ###########################################################
 # docker prune subcommands
 ###########################################################
@@ -766,8 +1358,10 @@ def prune():
 
 
 def prune_networks():
-    utils.run_cmd(f'docker network prune --force '
-                  f'--filter="dk.au.gitlab.group={cfg.gitlab_group}"')
+    with_fallback(
+        lambda: engine.prune('networks', filters=[franklin_filter()]),
+        lambda: utils.run_cmd(f'docker network prune --force '
+                              f'--filter {franklin_filter()}'))
 
 
 @prune.command('networks')
@@ -782,9 +1376,11 @@ def prune_containers():
     """
     Prunes containers.
     """
-    utils.run_cmd(f'docker container prune --all --force '
-                  f'--filter="dk.au.gitlab.group={cfg.gitlab_group}"', 
-                  check=False)
+    invalidate_inventory()
+    with_fallback(
+        lambda: engine.prune('containers', filters=[franklin_filter()]),
+        lambda: utils.run_cmd(f'docker container prune --force '
+                              f'--filter {franklin_filter()}', check=False))
 
 
 @prune.command('containers')
@@ -799,9 +1395,11 @@ def prune_images():
     """
     Prunes images.
     """
-    utils.run_cmd(f'docker image prune --all --force '
-                  f'--filter="dk.au.gitlab.group={cfg.gitlab_group}"', 
-                  check=False)
+    invalidate_inventory()
+    with_fallback(
+        lambda: engine.prune('images', filters=[franklin_filter()]),
+        lambda: utils.run_cmd(f'docker image prune --all --force '
+                              f'--filter {franklin_filter()}', check=False))
 
 
 @prune.command('images')
@@ -824,12 +1422,44 @@ def _prune_images():
 #     _prune_cache()
 
 
+def system_prune():
+    """
+    Removes unused Franklin containers, networks, images and build cache.
+
+    Notes
+    -----
+    Build cache records carry no labels and the daemon rejects a label 
+    filter for them, so all unused build cache is removed. Kinds the 
+    daemon refuses to prune through the API are pruned with the CLI.
+    """
+    cli_commands = {
+        'containers': f'docker container prune --force --filter {franklin_filter()}',
+        'networks': f'docker network prune --force --filter {franklin_filter()}',
+        'images': f'docker image prune --all --force --filter {franklin_filter()}',
+        'build': 'docker builder prune --all --force',
+    }
+
+    def api():
+        for kind, cmd in cli_commands.items():
+            filters = None if kind == 'build' else [franklin_filter()]
+            try:
+                engine.prune(kind, filters=filters)
+            except EngineError as e:
+                logger.debug(f'Could not prune {kind} through the API: {e}')
+                utils.run_cmd(cmd, check=False)
+
+    def cli():
+        for cmd in cli_commands.values():
+            utils.run_cmd(cmd, check=False)
+
+    with_fallback(api, cli)
+
+
 def prune_all():
     """Prunes all Docker elements.
     """
-    utils.run_cmd(f'docker system prune --all --force '
-                  f'--filter="dk.au.gitlab.group={cfg.gitlab_group}"', 
-                  check=False)
+    invalidate_inventory()
+    system_prune()
 
 
 @prune.command('all')
@@ -880,26 +1510,99 @@ def docker():
     pass
 
 
+# command -> (time of query, parsed output)
+_inventory_cache: Dict[str, Tuple[float, List[Dict[str, Any]]]] = {}
+
+
+def invalidate_inventory() -> None:
+    """
+    Forget cached container and image listings.
+
+    Called whenever franklin creates or removes containers or images.
+    """
+    _inventory_cache.clear()
+
+
+def _inventory(cmd: str, api: Callable[[], List[Dict[str, Any]]]
+               ) -> List[Dict[str, Any]]:
+    """
+    Run a Docker listing, reusing recent output.
+
+    Parameters
+    ----------
+    cmd : 
+        Docker command producing one JSON object per line. Also used as 
+        cache key.
+    api : 
+        Function producing the same listing through the Engine API.
+
+    Returns
+    -------
+    :
+        List of dictionaries, one for each line of output.
+    """
+    cached = _inventory_cache.get(cmd)
+    if cached is not None \
+            and time.monotonic() - cached[0] < cfg.docker_inventory_ttl:
+        return cached[1]
+
+    def cli():
+        output = utils.run_cmd(cmd)
+        return [json.loads(line) for line in output.strip().splitlines()]
+
+    entries = with_fallback(api, cli)
+    _inventory_cache[cmd] = (time.monotonic(), entries)
+    return entries
+
+
+def franklin_filter() -> str:
+    """
+    Filter matching containers started by Franklin.
+
+    Returns
+    -------
+    :
+        Filter for 'docker ps --filter'.
+    """
+    return f'label=dk.au.gitlab.group={cfg.gitlab_group}'
+
+
 # def containers(return_json=False):
-def containers() -> List[Dict[str, Any]]:
+def containers(sizes: bool=False, filters: Optional[List[str]]=None
+               ) -> List[Dict[str, Any]]:
     """
     Get information about running containers.
 
+    Parameters
+    ----------
+    sizes : 
+        Include the 'Size' field, by default False. Computing sizes is 
+        slow with large images, so only ask for them if they are shown.
+    filters : 
+        Filters passed to 'docker ps --filter', e.g. 
+        [franklin_filter()], by default None
+
     Returns
     -------
     :
         List of dictionaries with information about running containers.
     """
-    output = utils.run_cmd('docker ps --all --size --format json')
-    return [json.loads(line) for line in output.strip().splitlines()]
+    cmd = 'docker ps --all --format json'
+    if sizes:
+        cmd += ' --size'
+    for f in filters or []:
+        cmd += f' --filter {f}'
+    return _inventory(cmd, lambda: engine.containers(size=sizes, filters=filters))
 
 
 @docker.command('containers')
+@options.refresh
 @ensure_docker_running
 @crash_report
-def _containers():
+def _containers(refresh):
     """Show running docker containers.
     """
+    click.get_current_context().with_resource(catalog_cache.refreshing(refresh))
     container_list()
 
 
@@ -972,28 +1675,67 @@ def _storage(verbose):
 #     term.echo(volumes(), nowrap=True)
 
 
-def images() -> List[Dict[str, Any]]:
+def images(filters: Optional[List[str]]=None) -> List[Dict[str, Any]]:
     """
     Docker images.
 
+    Parameters
+    ----------
+    filters : 
+        Filters passed to 'docker images --filter', e.g. 
+        ['reference=nginx'], by default None
+
     Returns
     -------
     :
         List of dictionaries with image information.
     """
     # return _command('docker images', return_json=return_json)
-    output = utils.run_cmd('docker images --format json')
-    return [json.loads(line) for line in output.strip().splitlines()]
+    cmd = 'docker images --format json'
+    for f in filters or []:
+        cmd += f' --filter {f}'
+    return _inventory(cmd, lambda: engine.images(filters=filters))
 
 
 @docker.command('images')
+@options.refresh
 @ensure_docker_running
 @crash_report
-def _images():
+def _images(refresh):
     """List docker images.
     """
     # term.echo(_images(), nowrap=True)
+    click.get_current_context().with_resource(catalog_cache.refreshing(refresh))
     image_list()
+
+
+@docker.command('warm')
+@click.argument('exercise')
+@click.option('--directory', type=click.Path(exists=True, file_okay=False),
+              default='.', help='Exercise directory mounted in the container')
+@ensure_docker_running
+@crash_report
+def _warm(exercise: str, directory: str) -> None:
+    """Prepare a container for fast Jupyter startup.
+
+    EXERCISE is given as course/exercise (e.g. python-101/exercise-1).
+    Run it in the exercise folder, or give the folder with --directory.
+    The next "franklin jupyter" in that folder starts in seconds.
+    """
+    url = \
+        f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}/registry/repositories'
+    course, _, exercise_name = exercise.partition('/')
+    image_url = get_registry_listing(url).get((course, exercise_name))
+    if image_url is None:
+        term.secho(f'No exercise image found for "{exercise}". Give the '
+                   'exercise as course/exercise.', fg='red')
+        raise click.Abort()
+    pull(image_url)
+    term.echo('Preparing container')
+    if warm_container(image_url, Path(directory)) is None:
+        term.secho('Could not prepare container', fg='red')
+    else:
+        term.secho('Container is ready', fg='green')
     
 
 ###########################################################
@@ -1008,16 +1750,38 @@ def kill():
     pass
 
 
-def kill_container(container_id: str) -> None:
+def kill_container(container_id: str, force: bool=True) -> None:
     """Kills a running container.
 
     Parameters
     ----------
     container_id : 
         Container ID.
+    force : 
+        Kill the container with SIGKILL right away, by default True. If 
+        False, the container is stopped, giving it time to shut down, 
+        and the call returns once it has exited.
     """
-    cmd = fmt_cmd(f'docker kill {container_id}')
-    Popen(cmd, stderr=DEVNULL, stdout=DEVNULL)
+    invalidate_inventory()
+    action = 'kill' if force else 'stop'
+
+    def api():
+        try:
+            if force:
+                engine.kill(container_id)
+            else:
+                engine.stop(container_id)
+        except EngineError as e:
+            logger.debug(f'Could not {action} container {container_id}: {e}')
+
+    def cli():
+        if force:
+            cmd = fmt_cmd(f'docker kill {container_id}')
+            Popen(cmd, stderr=DEVNULL, stdout=DEVNULL)
+        else:
+            utils.run_cmd(f'docker stop {container_id}', check=False)
+
+    with_fallback(api, cli)
 
 
 # @docker.command('kill')
@@ -1050,9 +1814,7 @@ def shutdown_wsl():
     if system.system() == 'Windows':
         logger.debug('Restarting WSL Docker Desktop distribution.')
         subprocess.check_call('wsl -t docker-desktop')
-        term.dummy_progressbar(10, label='Restarting.')
-        if desktop_status() == 'running':
-            return
+        wait_for_desktop(label='Restarting.')
         
 
 def shutdown_wsl_docker_distribution():
@@ -1063,9 +1825,7 @@ def shutdown_wsl_docker_distribution():
         logger.debug('Shutting down WSL Docker Desktop distribution.')
         term.echo('WSL needs to restart.')
         subprocess.check_call('wsl --shutdown')    
-        term.dummy_progressbar(10, label='Restarting.')
-        if desktop_status() == 'running':
-            return    
+        wait_for_desktop(label='Restarting.')
 
 
 @kill.command('containers')
@@ -1094,17 +1854,33 @@ def kill_selected_containers(container_id: str=None) -> None:
 ###########################################################
 
 def cleanup_exercises(image_id: str, force=True) -> None:
+    """
+    Remove an exercise image and all containers created from it.
 
-    for cont in containers():
-        if cont['Image'].startswith(image_id):
-            container_id = cont['ID']
-            logger.debug(f"Killing container: {container_id}")
-            kill_container(container_id, force=force)   
-            time.sleep(1)         
-            logger.debug(f"Removing container: {container_id}")
-            rm_container(container_id, force=force)
-            break
-    time.sleep(2)
+    Parameters
+    ----------
+    image_id : 
+        Image ID or URL.
+    force : 
+        Kill running containers before removing them, by default True. 
+        If False, running containers are stopped gracefully first.
+
+    Notes
+    -----
+    Containers are removed concurrently. Removal returns once Docker has 
+    stopped and deleted a container, so the image can be removed right 
+    after without waiting a fixed time.
+    """
+    container_ids = [cont['ID'] for cont in containers(
+        filters=[franklin_filter(), f'ancestor={image_id}'])]
+
+    def remove(container_id, force):
+        if not force:
+            kill_container(container_id, force=False)
+        rm_container(container_id, force=force)
+
+    logger.debug(f"Removing containers: {container_ids}")
+    apply_concurrently(remove, container_ids, force=force)
     logger.debug(f"Removing image: {image_id}")
     rm_image(image_id)
     
@@ -1161,11 +1937,21 @@ def rm_container(container, force=False) -> None:
     force : 
         Force removal if container is in use, by default False
     """
-    if force:
-        utils.run_cmd(f'docker rm -f {container}', check=False)
+    invalidate_inventory()
 
-    else:
-        utils.run_cmd(f'docker rm {container}', check=False)
+    def api():
+        try:
+            engine.remove_container(container, force=force)
+        except EngineError as e:
+            logger.debug(f'Could not remove container {container}: {e}')
+
+    def cli():
+        if force:
+            utils.run_cmd(f'docker rm -f {container}', check=False)
+        else:
+            utils.run_cmd(f'docker rm {container}', check=False)
+
+    with_fallback(api, cli)
 
 
 @remove.command('containers')
@@ -1192,10 +1978,21 @@ def rm_image(image, force=False):
     force : 
         Force removal if image is in use, by default False
     """    
-    if force:
-        utils.run_cmd(f'docker image rm -f {image}', check=False)
-    else:
-        utils.run_cmd(f'docker image rm {image}', check=False)
+    invalidate_inventory()
+
+    def api():
+        try:
+            engine.remove_image(image, force=force)
+        except EngineError as e:
+            logger.debug(f'Could not remove image {image}: {e}')
+
+    def cli():
+        if force:
+            utils.run_cmd(f'docker image rm -f {image}', check=False)
+        else:
+            utils.run_cmd(f'docker image rm {image}', check=False)
+
+    with_fallback(api, cli)
 
 
 @remove.command('images')
@@ -1211,9 +2008,8 @@ def remove_selected_images(image_id=None):
 
 
 def remove_everything():
-    utils.run_cmd(f'docker system prune --all --force '
-                  f'--filter="dk.au.gitlab.group={cfg.gitlab_group}"', 
-                  check=False)
+    invalidate_inventory()
+    system_prune()
 
 
 @remove.command('everything')
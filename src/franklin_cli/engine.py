@@ -0,0 +1,446 @@
+"""
+Minimal client for the Docker Engine API over its Unix socket.
+
+Listing, inspecting, killing and removing containers and images through
+the ``docker`` CLI costs a process fork and CLI startup per call. The
+Engine API answers the same requests over the local socket in a few
+milliseconds. Results are converted to the dictionaries produced by the
+CLI's ``--format json`` output so callers do not depend on which route
+was taken.
+
+When no socket is found (e.g. on Windows, where Docker Desktop uses a
+named pipe, or when DOCKER_HOST points to a TCP daemon) or the socket
+cannot be reached, callers fall back to the CLI via `with_fallback`.
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import http.client
+from pathlib import Path
+from urllib.parse import urlencode, quote
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+
+from .logger import logger
+
+T = TypeVar('T')
+
+
+class EngineError(Exception):
+    """
+    Error response from the Docker Engine API.
+
+    Attributes
+    ----------
+    status : int
+        HTTP status code of the response.
+    """
+
+    def __init__(self, status: int, message: str):
+        """Initialize error with HTTP status and daemon message."""
+        super().__init__(message)
+        self.status = status
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a Unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float = 10):
+        """Initialize connection to the socket at socket_path."""
+        super().__init__('localhost', timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        """Connect to the Unix socket."""
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def socket_candidates() -> List[Path]:
+    """
+    Possible locations of the Docker Engine socket in order of preference.
+
+    Returns
+    -------
+    :
+        Socket paths. Empty if DOCKER_HOST points to a non-Unix daemon or
+        on Windows.
+    """
+    docker_host = os.environ.get('DOCKER_HOST')
+    if docker_host:
+        if docker_host.startswith('unix://'):
+            return [Path(docker_host[len('unix://'):])]
+        return []
+    if sys.platform == 'win32':
+        return []
+    return [
+        Path.home() / '.docker' / 'run' / 'docker.sock',
+        Path.home() / '.docker' / 'desktop' / 'docker.sock',
+        Path('/var/run/docker.sock'),
+    ]
+
+
+def human_size(size: float) -> str:
+    """
+    Format a size in bytes like the docker CLI.
+
+    Parameters
+    ----------
+    size :
+        Size in bytes.
+
+    Returns
+    -------
+    :
+        Size with three significant digits and a decimal unit, e.g. '1.23GB'.
+    """
+    units = ['B', 'kB', 'MB', 'GB', 'TB', 'PB']
+    i = 0
+    while size >= 1000 and i < len(units) - 1:
+        size /= 1000
+        i += 1
+    return f'{size:.3g}{units[i]}'
+
+
+def human_duration(seconds: float) -> str:
+    """
+    Format a duration like the docker CLI.
+
+    Parameters
+    ----------
+    seconds :
+        Duration in seconds.
+
+    Returns
+    -------
+    :
+        Duration such as 'About a minute' or '3 weeks'.
+    """
+    if seconds < 1:
+        return 'Less than a second'
+    if int(seconds) == 1:
+        return '1 second'
+    if seconds < 60:
+        return f'{int(seconds)} seconds'
+    minutes = int(seconds / 60)
+    if minutes == 1:
+        return 'About a minute'
+    if minutes < 60:
+        return f'{minutes} minutes'
+    hours = seconds / 3600
+    if round(hours) == 1:
+        return 'About an hour'
+    if hours < 48:
+        return f'{int(hours)} hours'
+    if hours < 24 * 7 * 2:
+        return f'{int(hours / 24)} days'
+    if hours < 24 * 30 * 2:
+        return f'{int(hours / 24 / 7)} weeks'
+    if hours < 24 * 365 * 2:
+        return f'{int(hours / 24 / 30)} months'
+    return f'{int(hours / 24 / 365)} years'
+
+
+def cli_filters(filters: Optional[List[str]]) -> Optional[str]:
+    """
+    Convert CLI style filters to the JSON encoding used by the API.
+
+    Parameters
+    ----------
+    filters :
+        Filters as passed to '--filter', e.g. ['label=a=b'].
+
+    Returns
+    -------
+    :
+        JSON object mapping filter names to lists of values, or None.
+    """
+    if not filters:
+        return None
+    encoded = {}
+    for f in filters:
+        name, _, value = f.partition('=')
+        encoded.setdefault(name, []).append(value)
+    return json.dumps(encoded)
+
+
+class EngineClient:
+    """
+    Docker Engine API client.
+
+    Each request opens a new connection to the socket, which costs
+    microseconds and keeps the client safe to use from several threads.
+
+    Attributes
+    ----------
+    timeout : float
+        Socket timeout in seconds.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None,
+                 timeout: float = 10):
+        """Initialize client for socket_path or the first socket found."""
+        self._socket_path = socket_path
+        self.timeout = timeout
+
+    @property
+    def socket_path(self) -> Optional[str]:
+        """Path of the Engine socket, or None if there is none."""
+        if self._socket_path is None:
+            for path in socket_candidates():
+                if path.exists():
+                    self._socket_path = str(path)
+                    break
+        return self._socket_path
+
+    def request(self, method: str, path: str,
+                params: Optional[Dict[str, Any]] = None,
+                timeout: Optional[float] = None) -> Any:
+        """
+        Send a request to the Engine API.
+
+        Parameters
+        ----------
+        method :
+            HTTP method.
+        path :
+            API path, e.g. '/containers/json'.
+        params :
+            Query parameters. Parameters with value None are left out.
+        timeout :
+            Socket timeout for this request, by default the timeout of
+            the client.
+
+        Returns
+        -------
+        :
+            Decoded JSON response, or None if the response has no body.
+
+        Raises
+        ------
+        OSError
+            If the socket cannot be reached.
+        EngineError
+            If the daemon answers with an error status.
+        """
+        if self.socket_path is None:
+            raise FileNotFoundError('No Docker Engine socket found')
+        if params:
+            params = {k: v for k, v in params.items() if v is not None}
+            if params:
+                path = f'{path}?{urlencode(params)}'
+        conn = UnixHTTPConnection(self.socket_path,
+                                  timeout=timeout or self.timeout)
+        try:
+            conn.request(method, path)
+            response = conn.getresponse()
+            body = response.read()
+        finally:
+            conn.close()
+        if response.status >= 400:
+            try:
+                message = json.loads(body)['message']
+            except (ValueError, KeyError, TypeError):
+                message = body.decode(errors='replace')
+            raise EngineError(response.status, message)
+        if not body:
+            return None
+        content_type = response.getheader('Content-Type', '')
+        if 'json' not in content_type:
+            return body.decode()
+        return json.loads(body)
+
+    def ping(self) -> bool:
+        """
+        Check if the daemon responds.
+
+        Returns
+        -------
+        :
+            True if the daemon answered /_ping.
+        """
+        try:
+            return self.request('GET', '/_ping') == 'OK'
+        except (OSError, http.client.HTTPException, EngineError):
+            return False
+
+    def version(self) -> Dict[str, Any]:
+        """
+        Daemon version information, shaped like the 'Server' section of
+        'docker version --format json'.
+        """
+        return self.request('GET', '/version')
+
+    def containers(self, size: bool = False,
+                   filters: Optional[List[str]] = None
+                   ) -> List[Dict[str, Any]]:
+        """
+        List all containers like 'docker ps --all --format json'.
+
+        Parameters
+        ----------
+        size :
+            Include the 'Size' field, by default False.
+        filters :
+            CLI style filters, by default None
+
+        Returns
+        -------
+        :
+            List of dictionaries with the fields of the CLI output.
+        """
+        now = time.time()
+        result = []
+        for c in self.request('GET', '/containers/json', {
+                'all': 1, 'size': 1 if size else None,
+                'filters': cli_filters(filters)}):
+            entry = {
+                'ID': c['Id'][:12],
+                'Image': c['Image'],
+                'Command': f'"{c.get("Command", "")}"',
+                'Names': ','.join(n.lstrip('/') for n in c.get('Names') or []),
+                'Labels': ','.join(f'{k}={v}' for k, v
+                                   in (c.get('Labels') or {}).items()),
+                'Ports': ', '.join(
+                    f"{p.get('IP', '')}:{p['PublicPort']}->{p['PrivatePort']}/{p['Type']}"
+                    if 'PublicPort' in p else f"{p['PrivatePort']}/{p['Type']}"
+                    for p in c.get('Ports') or []),
+                'State': c.get('State', ''),
+                'Status': c.get('Status', ''),
+                'RunningFor': human_duration(now - c['Created']) + ' ago',
+            }
+            if size:
+                entry['Size'] = (f"{human_size(c.get('SizeRw', 0))} "
+                                 f"(virtual {human_size(c.get('SizeRootFs', 0))})")
+            result.append(entry)
+        return result
+
+    def images(self, filters: Optional[List[str]] = None
+               ) -> List[Dict[str, Any]]:
+        """
+        List images like 'docker images --format json'.
+
+        Parameters
+        ----------
+        filters :
+            CLI style filters, by default None
+
+        Returns
+        -------
+        :
+            List of dictionaries with the fields of the CLI output, one
+            for each repository tag.
+        """
+        now = time.time()
+        result = []
+        for img in self.request('GET', '/images/json',
+                                {'filters': cli_filters(filters)}):
+            tags = [t for t in img.get('RepoTags') or []
+                    if t != '<none>:<none>'] or ['<none>:<none>']
+            for tag in tags:
+                repository, _, tag = tag.rpartition(':')
+                result.append({
+                    'ID': img['Id'].replace('sha256:', '')[:12],
+                    'Repository': repository,
+                    'Tag': tag,
+                    'CreatedSince': human_duration(now - img['Created']) + ' ago',
+                    'Size': human_size(img['Size']),
+                })
+        return result
+
+    def inspect_image(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Inspect an image like 'docker image inspect'.
+
+        Parameters
+        ----------
+        name :
+            Image name or ID.
+
+        Returns
+        -------
+        :
+            Image details, or None if there is no such image.
+        """
+        try:
+            return self.request('GET', f'/images/{quote(name, safe="/:@")}/json')
+        except EngineError as e:
+            if e.status == 404:
+                return None
+            raise
+
+    def kill(self, container_id: str) -> None:
+        """Kill a container."""
+        self.request('POST', f'/containers/{container_id}/kill')
+
+    def stop(self, container_id: str, grace: int = 10) -> None:
+        """Stop a container, killing it if it does not exit within grace
+        seconds. The request waits for the container to exit."""
+        self.request('POST', f'/containers/{container_id}/stop',
+                     {'t': grace}, timeout=grace + self.timeout)
+
+    def remove_container(self, container_id: str, force: bool = False) -> None:
+        """Remove a container."""
+        self.request('DELETE', f'/containers/{container_id}',
+                     {'force': 1 if force else None})
+
+    def remove_image(self, name: str, force: bool = False) -> None:
+        """Remove an image."""
+        self.request('DELETE', f'/images/{quote(name, safe="/:@")}',
+                     {'force': 1 if force else None})
+
+    def prune(self, kind: str, filters: Optional[List[str]] = None) -> None:
+        """
+        Prune unused objects of one kind.
+
+        Parameters
+        ----------
+        kind :
+            'containers', 'images', 'networks' or 'build'.
+        filters :
+            CLI style filters, by default None. Image pruning removes all
+            unused images, not only dangling ones, like '--all'.
+        """
+        filters = list(filters or [])
+        params = {}
+        if kind == 'images':
+            filters.append('dangling=false')
+        if kind == 'build':
+            params['all'] = 1
+        params['filters'] = cli_filters(filters)
+        self.request('POST', f'/{kind}/prune', params)
+
+
+def with_fallback(api: Callable[[], T], cli: Callable[[], T]) -> T:
+    """
+    Call the Engine API, falling back to the docker CLI.
+
+    Parameters
+    ----------
+    api :
+        Function using `engine`.
+    cli :
+        Function doing the same through the docker CLI.
+
+    Returns
+    -------
+    :
+        Return value of whichever function succeeded.
+    """
+    if engine.socket_path is not None:
+        try:
+            return api()
+        except (OSError, http.client.HTTPException) as e:
+            logger.debug(f'Docker Engine API unavailable, using CLI: {e}')
+    return cli()
+
+
+engine = EngineClient()
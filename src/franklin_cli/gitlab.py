@@ -7,8 +7,9 @@ import os
 import sys
 import shutil
 from pathlib import Path, PurePosixPath, PureWindowsPath
-from typing import Tuple, List, Dict, Callable, Any, Optional, Union
+from typing import Tuple, List, Dict, Callable, Any, Optional, Union, Iterable
 from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor, Future
 # import importlib_resources
 from . import config as cfg
 from . import utils
@@ -17,6 +18,187 @@ from . import terminal as term
 from .logger import logger
 from .utils import is_educator
 from . import system
+from . import options
+from .cache import catalog_cache
+from . import http_client
+
+# Background executor for catalog fetches that overlap with user interaction
+_prefetch_executor = ThreadPoolExecutor(max_workers=cfg.gitlab_max_workers,
+                                        thread_name_prefix='franklin-prefetch')
+
+
+def _get_page(url: str, params: Dict[str, Any], headers: Dict[str, str],
+              ttl: Optional[float] = None) -> Tuple[List[Any], Dict[str, str]]:
+    """
+    Retrieve a single page of a GitLab API listing.
+
+    If `ttl` is given, the page is served from and stored in the on-disk
+    catalog cache: cached pages younger than `ttl` seconds are returned
+    without any network traffic, and older ones are revalidated with a
+    conditional request (If-None-Match) so that an unchanged page only
+    costs a 304 response. If GitLab cannot be reached, a cached page is
+    used regardless of its age.
+
+    Parameters
+    ----------
+    url : str
+        GitLab API URL to fetch.
+    params : Dict[str, Any]
+        Query parameters for the request, including the page number.
+    headers : Dict[str, str]
+        Request headers.
+    ttl : Optional[float], default=None
+        Seconds a cached page is used without revalidation. If None, the
+        catalog cache is not used.
+
+    Returns
+    -------
+    Tuple[List[Any], Dict[str, str]]
+        The decoded JSON page and the pagination headers of the response
+        ('X-Total-Pages' and 'X-Next-Page' when present).
+
+    Raises
+    ------
+    requests.HTTPError
+        If the API request fails or returns an error status.
+    """
+    entry = None
+    if ttl is not None:
+        key = url + '?' + '&'.join(
+            f'{k}={v}' for k, v in sorted(params.items()))
+        entry = catalog_cache.get(key)
+        if entry is not None and catalog_cache.is_fresh(entry, ttl):
+            logger.debug(f"Catalog cache hit: {key}")
+            return entry['data'], entry.get('pagination', {})
+        if entry is not None and entry.get('etag'):
+            headers = dict(headers, **{'If-None-Match': entry['etag']})
+
+    try:
+        r = http_client.session.get(url, headers=headers, params=params)
+    except (requests.ConnectionError, requests.Timeout) as e:
+        if entry is None:
+            raise
+        logger.debug(f"Using stale catalog cache for {key}: {e}")
+        return entry['data'], entry.get('pagination', {})
+
+    pagination = {h: r.headers[h] for h in ('X-Total-Pages', 'X-Next-Page')
+                  if r.headers.get(h)}
+    if r.status_code == 304 and entry is not None:
+        logger.debug(f"Catalog cache revalidated: {key}")
+        # an unchanged page can still be part of a listing that grew or
+        # shrank, so the pagination headers of the 304 take precedence
+        pagination = pagination or entry.get('pagination', {})
+        catalog_cache.touch(key, pagination=pagination)
+        return entry['data'], pagination
+    if not r.ok:
+        r.raise_for_status()
+
+    data = r.json()
+    if ttl is not None:
+        catalog_cache.set(key, data, etag=r.headers.get('ETag'),
+                          pagination=pagination)
+    return data, pagination
+
+
+def get_all_pages(url: str, params: Optional[Dict[str, Any]] = None,
+                  headers: Optional[Dict[str, str]] = None,
+                  ttl: Optional[float] = None) -> List[Any]:
+    """
+    Retrieve all pages of a GitLab API listing.
+
+    The first page is fetched on its own to learn the number of pages from
+    the X-Total-Pages header. The remaining pages are then fetched
+    concurrently over the shared connection pool and assembled in order.
+
+    Parameters
+    ----------
+    url : str
+        GitLab API URL to fetch.
+    params : Optional[Dict[str, Any]], default=None
+        Query parameters for the request.
+    headers : Optional[Dict[str, str]], default=None
+        Request headers. Without a PRIVATE-TOKEN header, the configured
+        GitLab token is used.
+    ttl : Optional[float], default=None
+        Seconds cached pages are used without revalidation. If None, the
+        catalog cache is not used.
+
+    Returns
+    -------
+    List[Any]
+        Concatenated entries from all pages.
+
+    Raises
+    ------
+    requests.HTTPError
+        If any API request fails or returns an error status.
+
+    Notes
+    -----
+    - Requests cfg.gitlab_per_page entries per page (GitLab allows 100)
+    - GitLab omits X-Total-Pages for very large listings, in which case
+      X-Next-Page is followed one page at a time
+    """
+    if headers is None:
+        headers = {}
+    params = dict(params or {}, per_page=cfg.gitlab_per_page)
+
+    entries, pagination = _get_page(url, dict(params, page=1), headers, ttl)
+    if 'X-Total-Pages' not in pagination:
+        while pagination.get('X-Next-Page'):
+            page = pagination['X-Next-Page']
+            data, pagination = _get_page(
+                url, dict(params, page=page), headers, ttl)
+            entries = entries + data
+        return entries
+
+    total_pages = int(pagination['X-Total-Pages'])
+    if total_pages <= 1:
+        return entries
+
+    def fetch(page):
+        return _get_page(url, dict(params, page=page), headers, ttl)[0]
+
+    nr_workers = min(cfg.gitlab_max_workers, total_pages - 1)
+    with ThreadPoolExecutor(max_workers=nr_workers) as executor:
+        for data in executor.map(fetch, range(2, total_pages + 1)):
+            entries = entries + data
+    return entries
+
+
+def get_catalog_json(url: str, params: Optional[Dict[str, str]] = None,
+                     ttl: float = 0) -> List[Any]:
+    """
+    Retrieve a complete GitLab catalog listing through the catalog cache.
+
+    Parameters
+    ----------
+    url : str
+        GitLab API URL to fetch.
+    params : Optional[Dict[str, str]], default=None
+        Query parameters for the request.
+    ttl : float, default=0
+        Seconds a cached response is used without revalidation.
+
+    Returns
+    -------
+    List[Any]
+        The entries of all pages of the listing.
+
+    Raises
+    ------
+    requests.HTTPError
+        If the API request fails or returns an error status.
+
+    Notes
+    -----
+    - Each page is cached separately, keyed by URL and sorted parameters
+    - Setting catalog_cache.refresh (the --refresh flag, see
+      CatalogCache.refreshing) forces revalidation
+    """
+    headers = {"Content-Type" : "application/json"}
+    return get_all_pages(url, params=params, headers=headers, ttl=ttl)
+
 
 def get_group_members(group_id: str, api_token: str) -> Dict[int, int]:
     """
@@ -54,14 +236,14 @@ def get_group_members(group_id: str, api_token: str) -> Dict[int, int]:
     - Uses GitLab API v4 /groups/{id}/members/all endpoint
     - Includes inherited members from parent groups
     - Requires valid API token with group read permissions
+    - Fetches all pages of the member listing
     """
 
     headers = {'PRIVATE-TOKEN': api_token}
     url = f'https://{cfg.gitlab_domain}/api/v4/groups/{group_id}/members/all'
 
-    response = requests.get(url, headers=headers)
     members = {}
-    for member in response.json():
+    for member in get_all_pages(url, headers=headers):
         members[member['id']] = member['access_level']
     return members
 
@@ -160,7 +342,7 @@ def get_user_info(user_id: int, api_token: str) -> Optional[Dict[str, Any]]:
     headers = {'PRIVATE-TOKEN': api_token}
     url = f'https://{cfg.gitlab_domain}/api/v4/users/{user_id}'
 
-    response = requests.get(url, headers=headers)
+    response = http_client.session.get(url, headers=headers)
     if response.status_code == 200:
         return response.json()
     else:
@@ -201,8 +383,8 @@ def get_group_id(group_name: str, api_token: str) -> Optional[int]:
     """
     url = f"https://{cfg.gitlab_domain}/api/v4/groups"
     headers = {"PRIVATE-TOKEN": api_token}
-    response = requests.get(url, headers=headers, params={"search": group_name})
-    for group in response.json():
+    groups = get_all_pages(url, params={"search": group_name}, headers=headers)
+    for group in groups:
         if group["path"] == group_name or group["full_path"] == group_name:
             return group['id']
 
@@ -242,8 +424,7 @@ def get_project_id(project_name: str, group_id: int, api_token: str) -> Optional
     """
     url = f"https://{cfg.gitlab_domain}/api/v4/groups/{group_id}/projects"
     headers = {"PRIVATE-TOKEN": api_token}
-    response = requests.get(url, headers=headers)
-    for project in response.json():
+    for project in get_all_pages(url, headers=headers):
         if project["path"] == project_name or project["name"] == project_name:
             return project['id']
 
@@ -284,7 +465,7 @@ def get_user_id(user_name: str, api_token: str) -> int:
     """
     url = f"https://{cfg.gitlab_domain}/api/v4/users?username={user_name}"
     headers = {"PRIVATE-TOKEN": api_token}
-    response = requests.get(url, headers=headers)
+    response = http_client.session.get(url, headers=headers)
     data = response.json()
     if not data:
         return None
@@ -329,7 +510,7 @@ def get_project_visibility(course: str, exercise: str, api_token: str) -> Option
     project_path = f'{cfg.gitlab_group}/{course}/{exercise}'
     url = f"{cfg.gitlab_api_url}/projects/{requests.utils.quote(project_path, safe='')}"
 
-    response = requests.get(url, headers = {"PRIVATE-TOKEN": api_token})
+    response = http_client.session.get(url, headers={"PRIVATE-TOKEN": api_token})
     if response.status_code == 200:
         return response.json().get("visibility")
     else:
@@ -388,7 +569,8 @@ def create_public_gitlab_project(project_name: str, course: str,
         "visibility": "public",
         "namespace_id": get_group_id(course, api_token),
     }
-    response = requests.post(cfg.gitlab_api_url, headers=headers, json=payload)
+    response = http_client.session.post(cfg.gitlab_api_url, headers=headers, 
+                                        json=payload)
 
     # Handle response
     if response.status_code == 201:
@@ -431,18 +613,14 @@ def get_registry_listing(registry: str) -> Dict[Tuple[str, str], str]:
 
     Notes
     -----
-    - Uses authenticated session with GitLab private token
+    - Served from the catalog cache while fresh (see get_catalog_json)
     - Filters out 'base' exercises and template repositories
     - Expects registry entries with path format: 'group/course/exercise'
     - Automatically excludes 'base-images' and 'base-templates' courses
     """
-    s = requests.Session()
-    s.headers.update({'PRIVATE-TOKEN': cfg.gitlab_token})
     images = {}
-    r  = s.get(registry,  headers={ "Content-Type" : "application/json"})
-    if not r.ok:
-      r.raise_for_status()
-    for entry in r.json():
+    listing = get_catalog_json(registry, ttl=cfg.catalog_cache_ttl['registry'])
+    for entry in listing:
         group, course, exercise = entry['path'].split('/')
         if exercise in ['base']:
             continue
@@ -479,21 +657,17 @@ def get_course_names() -> Dict[str, str]:
 
     Notes
     -----
-    - Uses authenticated session with GitLab private token from configuration
+    - Served from the catalog cache while fresh (see get_catalog_json)
     - Excludes subgroups with 'template' in the path name
     - Uses subgroup description as display name, falls back to path
     - Accesses GitLab API v4 /groups/{id}/subgroups endpoint
     """
-    s = requests.Session()
-    s.headers.update({'PRIVATE-TOKEN': cfg.gitlab_token})
     url = f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}/subgroups'
 
     name_mapping = {}
-    r  = s.get(url, headers={ "Content-Type" : "application/json"})
-    if not r.ok:
-        r.raise_for_status()
+    listing = get_catalog_json(url, ttl=cfg.catalog_cache_ttl['courses'])
 
-    for entry in r.json():
+    for entry in listing:
         if 'template' in entry['path'].lower():
             continue
         if entry['description']:
@@ -536,33 +710,24 @@ def get_exercise_names(course: str) -> Dict[str, str]:
 
     Notes
     -----
-    - Uses authenticated session with GitLab private token from configuration
+    - Served from the catalog cache while fresh (see get_catalog_json)
     - Only includes non-archived projects
     - Uses project description as display name, falls back to path
     - Accesses GitLab API v4 /groups/{encoded_path}/projects endpoint
+    - Fetches all pages, so large courses are not truncated
     - Course path is URL-encoded for the API request
     """
 
-    s = requests.Session()
-    s.headers.update({'PRIVATE-TOKEN': cfg.gitlab_token,
-                      "Content-Type" : "application/json"})
     params = {
         "archived": "false",  # must be passed as a string
         # "membership": "true",  # optional: only projects the user is a member of
-        # "per_page": 100        # optional: number of results per page
     }
     url = f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}%2F{course}/projects'
-    r  = s.get(url, params=params)
+    listing = get_catalog_json(url, params=params,
+                               ttl=cfg.catalog_cache_ttl['exercises'])
 
-    # s = requests.Session()
-    # s.headers.update({'PRIVATE-TOKEN': cfg.gitlab_token})
-    # url = f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}%2F{course}/projects'
-    # r  = s.get(url, headers={ "Content-Type" : "application/json"})
     name_mapping = {}
-    if not r.ok:
-        r.raise_for_status()
-
-    for entry in r.json():
+    for entry in listing:
         if entry['description']:
             name_mapping[entry['path']] = entry['description']
         else:
@@ -571,13 +736,79 @@ def get_exercise_names(course: str) -> Dict[str, str]:
     return name_mapping
 
 
-def pick_course() -> Tuple[str, str]:
+def resolve_exercise_labels(labels: Iterable[Tuple[str, str]]
+                            ) -> Dict[Tuple[str, str], Tuple[str, str]]:
+    """
+    Resolve (course, exercise) labels to display names in one batch.
+
+    The course listing and the exercise listings of all distinct courses
+    are fetched concurrently, so resolving labels from many courses costs
+    a single round of parallel requests (or none, if the catalog cache is
+    fresh).
+
+    Parameters
+    ----------
+    labels : Iterable[Tuple[str, str]]
+        (course, exercise) identifier pairs, e.g. parsed from image names.
+
+    Returns
+    -------
+    Dict[Tuple[str, str], Tuple[str, str]]
+        Dictionary mapping each (course, exercise) pair to a pair of
+        (course display name, exercise display name).
+
+    Examples
+    --------
+    >>> names = resolve_exercise_labels([('python-101', 'exercise-1')])
+    >>> course_name, exercise_name = names[('python-101', 'exercise-1')]
+
+    Notes
+    -----
+    - Pairs are keyed by both course and exercise, so identically named
+      exercises in different courses do not collide
+    - Identifiers are used as display names for courses or exercises that
+      can no longer be found on GitLab
+    """
+    labels = set(labels)
+    if not labels:
+        return {}
+    courses = {course for course, _ in labels}
+    course_future = _prefetch_executor.submit(get_course_names)
+    exercise_futures = {
+        course: _prefetch_executor.submit(get_exercise_names, course)
+        for course in courses
+        }
+
+    course_names = course_future.result()
+    exercise_names = {}
+    for course, future in exercise_futures.items():
+        try:
+            exercise_names[course] = future.result()
+        except requests.HTTPError as e:
+            logger.debug(f"Could not get exercise names for {course}: {e}")
+            exercise_names[course] = {}
+
+    return {
+        (course, exercise): (course_names.get(course, course),
+                             exercise_names[course].get(exercise, exercise))
+        for course, exercise in labels
+        }
+
+
+def pick_course(course_names: Optional[Dict[str, str]] = None
+                ) -> Tuple[str, str]:
     """
     Interactively prompt user to select a course from available options.
 
     This function displays a list of available courses and allows the user
     to select one using arrow keys and Enter.
 
+    Parameters
+    ----------
+    course_names : Optional[Dict[str, str]], default=None
+        Mapping of course identifiers to display names as returned by
+        get_course_names(). Fetched if not provided.
+
     Returns
     -------
     Tuple[str, str]
@@ -597,7 +828,8 @@ def pick_course() -> Tuple[str, str]:
     - Default selection is the first course in the list
     - Displays green-colored instruction text
     """
-    course_names = get_course_names()
+    if course_names is None:
+        course_names = get_course_names()
     course_group_names, course_danish_names, = \
         zip(*sorted(course_names.items()))
     term.echo()
@@ -608,7 +840,8 @@ def pick_course() -> Tuple[str, str]:
     return course_group_names[course_idx], course_danish_names[course_idx]
 
 
-def pick_exercise(course: str, danish_course_name: str, exercises_images: Optional[Dict[Tuple[str, str], str]]) -> Tuple[str, str]:
+def pick_exercise(course: str, danish_course_name: str, exercises_images: Optional[Dict[Tuple[str, str], str]],
+                  exercise_names: Optional[Dict[str, str]] = None) -> Tuple[str, str]:
     """
     Interactively prompt user to select an exercise from a course.
 
@@ -624,6 +857,9 @@ def pick_exercise(course: str, danish_course_name: str, exercises_images: Option
     exercises_images : Optional[Dict[Tuple[str, str], str]]
         Dictionary mapping (course, exercise) tuples to image locations.
         If None, no image filtering is applied.
+    exercise_names : Optional[Dict[str, str]], default=None
+        Mapping of exercise identifiers to display names as returned by
+        get_exercise_names(course). Fetched if not provided.
 
     Returns
     -------
@@ -653,7 +889,10 @@ def pick_exercise(course: str, danish_course_name: str, exercises_images: Option
     is_edu = is_educator()
     # while True:
         
-    exercise_names = get_exercise_names(course)
+    if exercise_names is None:
+        exercise_names = get_exercise_names(course)
+    else:
+        exercise_names = dict(exercise_names)
     # only use those with listed images and not with 'HIDDEN' in the name
 
     for key, val in list(exercise_names.items()):            
@@ -693,18 +932,21 @@ def pick_exercise(course: str, danish_course_name: str, exercises_images: Option
         raise click.Abort()
 
 
-def select_exercise(exercises_images: Optional[Dict[Tuple[str, str], str]] = None) -> Tuple[Tuple[str, str], Tuple[str, str]]:
+def select_exercise(exercises_images: Optional[Union[Dict[Tuple[str, str], str], Future]] = None) -> Tuple[Tuple[str, str], Tuple[str, str]]:
     """
     Interactively select both course and exercise with full information.
 
     This function provides a complete selection workflow where the user first
-    picks a course, then selects an exercise from that course.
+    picks a course, then selects an exercise from that course. The exercise
+    listings of all courses are fetched in the background while the course
+    menu is shown, so the exercise menu appears as soon as a course is picked.
 
     Parameters
     ----------
-    exercises_images : Optional[Dict[Tuple[str, str], str]], default=None
-        Dictionary mapping (course, exercise) tuples to Docker image locations.
-        Used to filter exercises based on Docker image availability.
+    exercises_images : Optional[Union[Dict[Tuple[str, str], str], Future]], default=None
+        Dictionary mapping (course, exercise) tuples to Docker image locations,
+        or a Future resolving to one (see get_registry_listing). Used to 
+        filter exercises based on Docker image availability.
         If None, no image-based filtering is applied.
 
     Returns
@@ -725,12 +967,26 @@ def select_exercise(exercises_images: Optional[Dict[Tuple[str, str], str]] = Non
     - Combines pick_course() and pick_exercise() functionality
     - Respects user role permissions and image availability
     - Provides complete selection workflow for Franklin exercises
+    - Exercise listings are prefetched concurrently during course selection
     """
     # # hide_hidden = not is_educator()
     # is_edu = is_educator()
-    course, danish_course_name = pick_course()
+    course_names = get_course_names()
+    exercise_futures = {
+        course: _prefetch_executor.submit(get_exercise_names, course)
+        for course in course_names
+        }
+    try:
+        course, danish_course_name = pick_course(course_names)
+        exercise_names = exercise_futures[course].result()
+        if isinstance(exercises_images, Future):
+            exercises_images = exercises_images.result()
+    finally:
+        for future in exercise_futures.values():
+            future.cancel()
     exercise, listed_exercise_name = pick_exercise(course, danish_course_name, 
-                                                   exercises_images)
+                                                   exercises_images,
+                                                   exercise_names)
     return ((course, danish_course_name), 
             (exercise, listed_exercise_name))
 
@@ -803,22 +1059,24 @@ def select_image() -> str:
     - Only shows exercises that have associated Docker images
     - Uses GitLab Container Registry API to fetch available images
     - Combines registry listing with interactive selection
+    - Registry listing is fetched in the background during course selection
     - Returns the full image location suitable for Docker operations
     """
     url = \
         f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}/registry/repositories'
-    exercises_images = get_registry_listing(url)
+    exercises_images = _prefetch_executor.submit(get_registry_listing, url)
 
     (course, _), (exercise, _) = select_exercise(exercises_images)
 
-    selected_image = exercises_images[(course, exercise)]
+    selected_image = exercises_images.result()[(course, exercise)]
     return selected_image
 
 
 @click.option('--vscode', default=False, is_flag=True,
               help='Include vscode devcontainer files in the download.')
+@options.refresh
 @click.command(epilog=f'See {cfg.documentation_url} for more details')
-def download(vscode: bool) -> None:
+def download(vscode: bool, refresh: bool) -> None:
     """
     Download a Franklin exercise repository to the local filesystem.
 
@@ -849,7 +1107,17 @@ def download(vscode: bool) -> None:
     - Removes development files (keeping only exercise.ipynb)
     - Creates a clean student environment
     - Checks for existing directories to prevent conflicts
+    - Use --refresh to revalidate cached course and exercise listings
+    - Prepares a warm container for the exercise if 
+      cfg.warm_after_download is set and Docker is running
     """
+    click.get_current_context().with_resource(catalog_cache.refreshing(refresh))
+
+    # get images for available exercises while the user is busy picking
+    url = \
+        f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}/registry/repositories'
+    exercises_images = _prefetch_executor.submit(get_registry_listing, url)
+
     # Check if educator plugin is installed without importing it
     try:
         from importlib.metadata import entry_points
@@ -864,11 +1132,6 @@ def download(vscode: bool) -> None:
     except Exception:
         pass
 
-    # get images for available exercises
-    url = \
-        f'{cfg.gitlab_api_url}/groups/{cfg.gitlab_group}/registry/repositories'
-    exercises_images = get_registry_listing(url)
-
     # pick course and exercise
     (course, _), (exercise, listed_exercise_name) = \
         select_exercise(exercises_images)
@@ -919,3 +1182,13 @@ def download(vscode: bool) -> None:
                 os.remove(path)
 
     term.secho(f"Downloaded exercise to folder: {repo_local_path}")
+
+    if cfg.warm_after_download:
+        from .docker import pull, warm_container
+        from .desktop import desktop_status
+        if desktop_status() == 'running':
+            image_url = exercises_images.result().get((course, exercise))
+            if image_url is not None:
+                pull(image_url)
+                term.echo('Preparing container')
+                warm_container(image_url, repo_local_path)
@@ -0,0 +1,73 @@
+"""
+Shared HTTP client for GitLab, registry and connectivity requests.
+
+All HTTP traffic goes through the module-level `session` so that
+connections to the same host are kept alive and reused instead of paying a
+new TCP and TLS handshake for every API call. Connectivity checks use
+`probe_session`, which does not retry, so that being offline is detected
+within a single timeout.
+"""
+
+from urllib.parse import urlparse
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from . import config as cfg
+
+
+class FranklinSession(requests.Session):
+    """
+    Connection-pooled session with retries, timeouts and GitLab tokens.
+
+    Idempotent requests answered with 429 or a 5xx status, or failing to
+    connect, are retried with exponential backoff (honouring Retry-After).
+    Requests without an explicit timeout get cfg.http_timeout, and
+    requests to cfg.gitlab_domain without authentication headers get the
+    configured GitLab token.
+    """
+
+    def __init__(self, retries: Optional[int] = None):
+        """
+        Initialize session with pooled, retrying adapters.
+
+        Parameters
+        ----------
+        retries :
+            Maximum number of retries, by default cfg.http_retries.
+        """
+        super().__init__()
+        retry = Retry(
+            total=cfg.http_retries if retries is None else retries,
+            backoff_factor=cfg.http_backoff_factor,
+            status_forcelist=(429, 500, 502, 503, 504),
+            respect_retry_after_header=True,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=4,
+                              pool_maxsize=cfg.gitlab_max_workers,
+                              max_retries=retry)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+
+    def request(self, method: str, url: str, **kwargs: Any
+                ) -> requests.Response:
+        """Send request with default timeout and GitLab token injection."""
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = cfg.http_timeout
+        if urlparse(url).hostname == cfg.gitlab_domain:
+            headers = CaseInsensitiveDict(kwargs.get('headers') or {})
+            if 'PRIVATE-TOKEN' not in headers \
+                    and 'Authorization' not in headers:
+                headers['PRIVATE-TOKEN'] = cfg.gitlab_token
+            kwargs['headers'] = headers
+        return super().request(method, url, **kwargs)
+
+
+session = FranklinSession()
+
+# for connectivity checks, which should fail after a single timeout
+probe_session = FranklinSession(retries=0)
@@ -2,23 +2,28 @@ import sys
 import os
 import re
 import logging
-import shlex
 import time
 import webbrowser
 import subprocess
 import click
 import shutil
 import time
+import queue
+import threading
+from functools import partial
 from subprocess import Popen, PIPE, STDOUT
 from typing import Optional
 from .crash import crash_report
 from .gitlab import select_image
+from .cache import catalog_cache
 from . import docker as _docker
 from .logger import logger, LoggerWriter
 from .desktop import config_fit
 from . import terminal as term
 from . import options
 from . import system
+from . import utils
+from . import config as cfg
 from .utils import DelayedKeyboardInterrupt
 from . import chrome
 
@@ -78,6 +83,105 @@ from . import chrome
 #             pass
 
 
+def wait_for_token_url(container_id: str, port: str, 
+                       docker_run_p: Optional[Popen] = None,
+                       timeout: Optional[float] = None) -> str:
+    """
+    Wait for the Jupyter server in a container to report its token URL.
+
+    Two sources are watched at once: the container log, streamed line by 
+    line in a background thread, and the Jupyter /api/status endpoint on
+    the mapped host port. The URL is returned as soon as it appears in the
+    log, or as soon as the server answers HTTP requests (in which case the
+    URL is read from the log printed so far).
+
+    Parameters
+    ----------
+    container_id : str
+        ID of the container running the Jupyter server.
+    port : str
+        Host port mapped to the Jupyter port in the container.
+    docker_run_p : Optional[Popen], default=None
+        Handle of the 'docker run' process. If it exits, the container is
+        considered dead.
+    timeout : Optional[float], default=None
+        Seconds to wait before giving up. Defaults to 
+        cfg.jupyter_start_timeout.
+
+    Returns
+    -------
+    str
+        Jupyter URL with token, using the host port.
+
+    Raises
+    ------
+    TimeoutError
+        If no URL is found within the timeout.
+    RuntimeError
+        If the container stops before Jupyter reports its URL.
+    """
+    if timeout is None:
+        timeout = cfg.jupyter_start_timeout
+    url_regex = re.compile(r'https?://127.0.0.1\S+')
+
+    def host_url(url):
+        return re.sub(r'(?<=127.0.0.1:)\d+', port, url)
+
+    cmd = f"docker logs --follow {container_id}"
+    if system.system() == "Windows":
+        popen_kwargs = dict(
+            creationflags = subprocess.DETACHED_PROCESS \
+                | subprocess.CREATE_NEW_PROCESS_GROUP)
+    else:
+        popen_kwargs = dict(start_new_session = True)
+    docker_log_p = Popen(utils.fmt_cmd(cmd), stdout=PIPE, stderr=STDOUT, 
+                         bufsize=1, universal_newlines=True, **popen_kwargs)
+
+    lines = queue.Queue()
+    def read_log():
+        for line in docker_log_p.stdout:
+            lines.put(line)
+        lines.put(None)
+    log_reader = threading.Thread(target=read_log, daemon=True)
+    log_reader.start()
+
+    deadline = time.monotonic() + timeout
+    next_status_check = time.monotonic()
+    try:
+        while time.monotonic() < deadline:
+            try:
+                line = lines.get(timeout=0.2)
+            except queue.Empty:
+                line = ''
+            if line is None or (docker_run_p is not None 
+                                and docker_run_p.poll() is not None):
+                raise RuntimeError('The container stopped before Jupyter '
+                                   'started.')
+            if line:
+                logger.debug('JUPYTER: '+line.strip())
+                match = url_regex.search(line)
+                if match:
+                    return host_url(match.group(0))
+
+            if time.monotonic() >= next_status_check:
+                next_status_check = time.monotonic() + 0.5
+                if not _docker.jupyter_responds(port):
+                    continue
+                logger.debug('Jupyter server answers on port ' + port)
+                output = utils.run_cmd(f'docker logs {container_id}', 
+                                       check=False, stderr2stdout=True)
+                match = url_regex.search(output)
+                if match:
+                    return host_url(match.group(0))
+        raise TimeoutError(f'Jupyter did not start within {timeout} seconds.')
+    finally:
+        docker_log_p.terminate()
+        docker_log_p.wait()
+        log_reader.join(timeout=1)
+        if not log_reader.is_alive():
+            docker_log_p.stdout.close()
+
+
 def launch_jupyter(image_url: str, cwd: Optional[str] = None) -> None:
     """
     Launch Jupyter notebook server in a Docker container with browser automation.
@@ -112,8 +216,12 @@ def launch_jupyter(image_url: str, cwd: Optional[str] = None) -> None:
 
     Notes
     -----
+    - Resumes a container prepared with 'franklin docker warm' for the 
+      image and current directory if there is one
     - Uses failsafe container startup with automatic recovery
-    - Monitors Docker logs to extract Jupyter server URL with token
+    - Monitors Docker logs and the Jupyter HTTP API for the server URL
+    - Aborts with a message if Jupyter does not start within
+      cfg.jupyter_start_timeout seconds
     - Replaces container port with host-mapped port in URL
     - Uses Chrome browser automation for better user experience
     - Handles cleanup even on KeyboardInterrupt
@@ -130,34 +238,28 @@ def launch_jupyter(image_url: str, cwd: Optional[str] = None) -> None:
     _docker.pull(image_url)
     term.echo()    
 
-    term.secho('Starting container')
-    run_container_id, docker_run_p, port = \
-        _docker.failsafe_run_container(image_url)
-
-    cmd = f"docker logs --follow {run_container_id}"
-    if system.system() == "Windows":
-        popen_kwargs = dict(
-            creationflags = subprocess.DETACHED_PROCESS \
-                | subprocess.CREATE_NEW_PROCESS_GROUP)
+    warm = _docker.claim_warm_container(image_url)
+    if warm is not None:
+        term.secho('Resuming prepared container')
+        run_container_id, docker_run_p, port = warm
+        # warm containers are not started with --rm
+        stop_container = partial(_docker.rm_container, force=True)
     else:
-        popen_kwargs = dict(start_new_session = True)
-    docker_log_p = Popen(shlex.split(cmd), stdout=PIPE, stderr=STDOUT, 
-                         bufsize=1, universal_newlines=True, **popen_kwargs)
+        stop_container = _docker.kill_container
+        term.secho('Starting container')
+        run_container_id, docker_run_p, port = \
+            _docker.failsafe_run_container(image_url)
 
-    while True:
-        time.sleep(0.1)
-        line = docker_log_p.stdout.readline()
-        if line:
-            logger.debug('JUPYTER: '+line.strip())
-        match= re.search(r'https?://127.0.0.1\S+', line)
-        if match:
-            token_url = match.group(0)
-            # replace port in token_url
-            token_url = re.sub(r'(?<=127.0.0.1:)\d+', port, token_url)
-            docker_log_p.stdout.close()
-            docker_log_p.terminate()
-            docker_log_p.wait()
-            break
+    try:
+        token_url = wait_for_token_url(run_container_id, port, docker_run_p)
+    except (TimeoutError, RuntimeError) as e:
+        logger.debug(f'Jupyter failed to start: {e}')
+        stop_container(run_container_id)
+        docker_run_p.terminate()
+        docker_run_p.wait()
+        term.secho(f'{e} Please try again. If the problem persists, '
+                   'restart Docker Desktop.', fg='red')
+        raise click.Abort()
 
     if cwd is not None:
         token_url = token_url.replace('/lab', f'/lab/tree/{cwd}')
@@ -209,7 +311,7 @@ def launch_jupyter(image_url: str, cwd: Optional[str] = None) -> None:
             term.secho('Stopping Docker container') 
             sys.stdout.flush()
             time.sleep(0.5)
-            _docker.kill_container(run_container_id)
+            stop_container(run_container_id)
             docker_run_p.terminate()
             docker_run_p.wait()
             term.secho('Stopping Docker Desktop') 
@@ -257,9 +359,10 @@ def launch_jupyter(image_url: str, cwd: Optional[str] = None) -> None:
 
 
 @options.subdirs_allowed
+@options.refresh
 @click.command()
 @crash_report
-def jupyter(allow_subdirs_at_your_own_risk: bool) -> None:
+def jupyter(allow_subdirs_at_your_own_risk: bool, refresh: bool) -> None:
     """
     Launch Jupyter notebook environment for Franklin exercises.
 
@@ -275,6 +378,8 @@ def jupyter(allow_subdirs_at_your_own_risk: bool) -> None:
         Flag to bypass subdirectory validation. When False (default),
         prevents running from directories containing subdirectories
         to avoid file conflicts and ensure clean exercise environment.
+    refresh : bool
+        Revalidate cached course and exercise listings with GitLab.
 
     Returns
     -------
@@ -338,8 +443,8 @@ def jupyter(allow_subdirs_at_your_own_risk: bool) -> None:
 
     # Ensure Docker Desktop is running
     _docker.failsafe_start_desktop()
-    time.sleep(2)
 
     # Interactive exercise selection and launch
+    click.get_current_context().with_resource(catalog_cache.refreshing(refresh))
     image_url = select_image()
     launch_jupyter(image_url)
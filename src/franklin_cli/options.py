@@ -19,4 +19,10 @@ git_commands = click.option(
     '--commands/--no-commands', 
     default=False,
     help="Show git commands executed",
-    )
\ No newline at end of file
+    )
+refresh = click.option(
+    '--refresh',
+    is_flag=True,
+    default=False,
+    help="Revalidate cached course and exercise listings with GitLab",
+    )
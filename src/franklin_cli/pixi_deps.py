@@ -1,10 +1,35 @@
+"""
+Detection of the conda packages used by the notebooks of an exercise.
+
+Code cells are parsed with `ast`, so aliased, multi-line and
+``importlib`` imports are found, and R cells are searched for
+``library()`` and ``require()`` calls. Results are cached by content
+hash for each notebook and each cell, so rescanning a course repository
+only parses the cells that changed since the last scan.
+
+Notebooks are read with a streaming reader that decodes only the cell
+sources, and many notebooks can be scanned in parallel processes.
+"""
+
 import sys, os, re
-import nbformat
-import nbformat
+import ast
+import json
+import mmap
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 # import importlib_resources
 import subprocess, shlex, shutil
 
+try:
+    from .pixi_manifest import PixiManifest
+except ImportError:
+    # run as a script
+    from pixi_manifest import PixiManifest
+
+
+NOTEBOOK_CACHE_FILE = Path.home() / '.franklin' / 'notebook_deps_cache.json'
 
 py_to_conda_package_map = {
     "sklearn": "scikit-learn",
@@ -229,66 +254,635 @@ r_to_conda_package_map = {
 }
 
 
-def get_notebook_dependencies(filename: Path) -> list:
-
-    with open(filename) as ff:
-        nb = nbformat.read(ff, nbformat.NO_CONVERT)
-
-    py_modules = []
-    r_modules = []
-    for cell in nb['cells']:
-        if cell['cell_type'] == 'code':
-            if not cell['source'].strip() or cell['source'].startswith('%'):
-                continue
-        # R
-        r_modules.extend(
-            re.findall(r'''library\s*\(['"]([a-zA-Z0-9_.]+)['"]\)''', 
-                       cell['source']))
-
-        # Python
-        for line in cell['source'].split('\n'):
-            line = line.strip()
-            if line.startswith('#'):
-                continue
-            words = re.split(r'(?<!,)\s+(?!,)', line)
-            if len(words) >= 2:
-                if words[0] == 'from':                    
-                    py_modules.append(words[1].split('.')[0])
-                elif words[0] == 'import':
-                    if ',' not in words[1]:
-                        py_modules.append(words[1].split('.')[0])
-                    else:
-                        for x in re.split(r'\s*,\s*', line):
-                            if x:
-                                py_modules.append(x.split('.')[0])
-    
+R_LIBRARY_PATTERN = re.compile(
+    r'''\b(?:library|require|requireNamespace)\s*\(\s*['"]?'''
+    r'''([A-Za-z][A-Za-z0-9_.]*)['"]?\s*[,)]''')
+
+# cell magics with a body of Python code
+PYTHON_CELL_MAGICS = {'time', 'timeit', 'capture', 'prun', 'debug'}
+
+
+class ImportVisitor(ast.NodeVisitor):
+    """
+    Collects names of imported modules, excluding relative imports.
+
+    Attributes
+    ----------
+    modules : Set[str]
+        Full dotted module names.
+    """
+
+    def __init__(self):
+        """Initialize with no modules found."""
+        self.modules = set()
+
+    def visit_Import(self, node: ast.Import) -> None:
+        """Record 'import a.b as c'."""
+        for alias in node.names:
+            self.modules.add(alias.name)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom) -> None:
+        """Record 'from a.b import c'."""
+        if node.level == 0 and node.module:
+            self.modules.add(node.module)
+
+    def visit_Call(self, node: ast.Call) -> None:
+        """Record importlib.import_module('a') and __import__('a')."""
+        func = node.func
+        name = func.attr if isinstance(func, ast.Attribute) else \
+            getattr(func, 'id', None)
+        if name in ('import_module', '__import__') and node.args:
+            arg = node.args[0]
+            if isinstance(arg, ast.Constant) and isinstance(arg.value, str) \
+                    and not arg.value.startswith('.'):
+                self.modules.add(arg.value)
+        self.generic_visit(node)
+
+
+def python_modules(source: str) -> Set[str]:
+    """
+    Modules imported by Python code with IPython magics and shell escapes.
+
+    Parameters
+    ----------
+    source :
+        Cell source.
+
+    Returns
+    -------
+    :
+        Full dotted module names.
+    """
+    # blank out magics and shell escapes, keeping line numbers
+    lines = ['' if line.lstrip().startswith(('%', '!', '?')) else line
+             for line in source.split('\n')]
+    visitor = ImportVisitor()
+    try:
+        visitor.visit(ast.parse('\n'.join(lines)))
+    except SyntaxError:
+        # unparsable cell (e.g. incomplete exercise code): 
+        # parse the lines that are complete statements one by one
+        for line in lines:
+            try:
+                visitor.visit(ast.parse(line.strip()))
+            except SyntaxError:
+                pass
+    return visitor.modules
+
+
+def r_packages(source: str) -> Set[str]:
+    """
+    Packages loaded by R code.
+
+    Parameters
+    ----------
+    source :
+        Cell source.
+
+    Returns
+    -------
+    :
+        R package names.
+    """
+    lines = [line for line in source.split('\n')
+             if not line.lstrip().startswith('#')]
+    return set(R_LIBRARY_PATTERN.findall('\n'.join(lines)))
+
+
+def scan_cell(source: str, language: str='python') -> Tuple[List[str], List[str]]:
+    """
+    Python modules and R packages used by a code cell.
+
+    Parameters
+    ----------
+    source :
+        Cell source.
+    language :
+        Language of the notebook kernel, by default 'python'.
+
+    Returns
+    -------
+    :
+        Sorted Python module names and sorted R package names.
+    """
+    if source.startswith('%%'):
+        magic, _, body = source.partition('\n')
+        magic = magic[2:].split()[0] if magic[2:].split() else ''
+        if magic == 'R':
+            return [], sorted(r_packages(body))
+        if magic not in PYTHON_CELL_MAGICS:
+            return [], []
+        source = body
+    if language == 'r':
+        return [], sorted(r_packages(source))
+    return sorted(python_modules(source)), []
+
+
+def notebook_language(nb: dict) -> str:
+    """
+    Language of a notebook's kernel.
+
+    Parameters
+    ----------
+    nb :
+        Notebook JSON.
+
+    Returns
+    -------
+    :
+        Lower case language name, by default 'python'.
+    """
+    metadata = nb.get('metadata', {})
+    language = metadata.get('kernelspec', {}).get('language') or \
+        metadata.get('language_info', {}).get('name') or 'python'
+    return language.lower()
+
+
+def code_cells(nb: dict) -> Iterable[str]:
+    """
+    Sources of the code cells of a notebook.
+
+    Parameters
+    ----------
+    nb :
+        Notebook JSON in format version 3 or 4.
+
+    Returns
+    -------
+    :
+        Cell sources.
+    """
+    if 'cells' in nb:
+        cells = nb['cells']
+    else:
+        cells = [c for ws in nb.get('worksheets', []) for c in ws['cells']]
+    for cell in cells:
+        if cell.get('cell_type') != 'code':
+            continue
+        source = cell.get('source', cell.get('input', ''))
+        if isinstance(source, list):
+            source = ''.join(source)
+        if source.strip():
+            yield source
+
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+# short strings without escapes are matched whole, other strings only
+# by their opening quote
+_TOKEN = re.compile(rb'"[^"\\]{0,64}"|["{}\[\]]')
+_SCALAR = re.compile(rb'[^,}\]\s]*')
+
+
+def _skip_whitespace(buf: bytes, i: int) -> int:
+    """Index of the first non-whitespace byte at or after i."""
+    return _WHITESPACE.match(buf, i).end()
+
+
+def _string_end(buf: bytes, i: int) -> int:
+    """Index just after the JSON string starting at i."""
+    j = i
+    while True:
+        # bytes.find is much faster than a regex on long strings
+        j = buf.find(b'"', j + 1)
+        if j < 0:
+            raise ValueError('Unterminated JSON string')
+        k = j
+        while buf[k - 1] == 0x5c:
+            k -= 1
+        if (j - k) % 2 == 0:
+            return j + 1
+
+
+def _value_end(buf: bytes, i: int) -> int:
+    """
+    Index just after the JSON value starting at i, found without 
+    decoding the value.
+    """
+    first = buf[i:i+1]
+    if first == b'"':
+        return _string_end(buf, i)
+    if first not in (b'{', b'['):
+        return _SCALAR.match(buf, i).end()
+    depth = 0
+    while True:
+        m = _TOKEN.search(buf, i)
+        if m is None:
+            raise ValueError('Unterminated JSON value')
+        token = m.group()
+        if token == b'"':
+            i = _string_end(buf, m.start())
+            continue
+        i = m.end()
+        if len(token) > 1:
+            continue
+        depth += 1 if token in (b'{', b'[') else -1
+        if depth == 0:
+            return i
+
+
+def _members(buf: bytes, i: int) -> Iterator[Tuple[str, int, int]]:
+    """
+    Keys and value spans of the JSON object starting at i.
+    """
+    i = _skip_whitespace(buf, i + 1)
+    while buf[i:i+1] != b'}':
+        key_end = _string_end(buf, i)
+        key = json.loads(buf[i:key_end])
+        start = _skip_whitespace(buf, _skip_whitespace(buf, key_end) + 1)
+        end = _value_end(buf, start)
+        yield key, start, end
+        i = _skip_whitespace(buf, end)
+        if buf[i:i+1] == b',':
+            i = _skip_whitespace(buf, i + 1)
+
+
+def notebook_cells(buf: bytes) -> Tuple[str, List[str]]:
+    """
+    Kernel language and code cell sources of a notebook.
+
+    Only the notebook metadata and the 'cell_type' and 'source' fields of
+    each cell are decoded. Outputs, which may hold megabytes of images
+    and HTML, are skipped without being turned into Python objects.
+
+    Parameters
+    ----------
+    buf :
+        Notebook file content, e.g. a memory map.
+
+    Returns
+    -------
+    :
+        Lower case language name and cell sources.
+    """
+    top = {}
+    cells = None
+    for key, start, end in _members(buf, _skip_whitespace(buf, 0)):
+        if key == 'cells':
+            cells = start
+        elif key in ('metadata', 'worksheets'):
+            top[key] = json.loads(buf[start:end])
+    if cells is None:
+        # nbformat 3
+        return notebook_language(top), list(code_cells(top))
+    sources = []
+    i = _skip_whitespace(buf, cells + 1)
+    while buf[i:i+1] != b']':
+        cell = {}
+        end = i + 1
+        for key, start, end in _members(buf, i):
+            if key in ('cell_type', 'source'):
+                cell[key] = json.loads(buf[start:end])
+        sources.extend(code_cells({'cells': [cell]}))
+        # past the closing brace of the cell
+        i = _skip_whitespace(buf, _skip_whitespace(buf, end) + 1)
+        if buf[i:i+1] == b',':
+            i = _skip_whitespace(buf, i + 1)
+    return notebook_language(top), sources
+
+
+def _digest(data: bytes) -> str:
+    """Content hash used as cache key."""
+    return hashlib.sha1(data).hexdigest()
+
+
+class DependencyCache:
+    """
+    Modules and packages found in notebooks and cells.
+
+    Notebooks are keyed by path and validated by modification time, size
+    and content hash. Cells are keyed by the hash of their source, so an
+    edited notebook only needs its changed cells parsed.
+
+    Attributes
+    ----------
+    cache_file : Optional[Path]
+        Location of the JSON file backing the cache, or None to keep the 
+        cache in memory only.
+    """
+
+    def __init__(self, cache_file: Optional[Path]=NOTEBOOK_CACHE_FILE):
+        """Initialize cache backed by cache_file."""
+        self.cache_file = None if cache_file is None else Path(cache_file)
+        self._data = None
+        self._changed = False
+
+    def _load(self) -> Dict[str, Dict]:
+        """Load entries from persistent storage on first use."""
+        if self._data is None:
+            self._data = {'notebooks': {}, 'cells': {}}
+            try:
+                if self.cache_file is not None and self.cache_file.exists():
+                    with open(self.cache_file, 'r') as f:
+                        self._data = json.load(f)
+            except Exception as e:
+                print(f"Failed to load notebook cache: {e}", file=sys.stderr)
+        return self._data
+
+    @property
+    def notebooks(self) -> Dict[str, Dict]:
+        """Notebook entries keyed by absolute path."""
+        return self._load()['notebooks']
+
+    @property
+    def cells(self) -> Dict[str, List[List[str]]]:
+        """Python modules and R packages keyed by cell hash."""
+        return self._load()['cells']
+
+    def fresh_notebook(self, path: str) -> Optional[Dict]:
+        """
+        Entry for notebook at path if the file has not been modified 
+        since it was scanned.
+        """
+        entry = self.notebooks.get(path)
+        if entry is None:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        if entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return entry
+        return None
+
+    def set_notebook(self, path: str, entry: Dict) -> None:
+        """Store entry for notebook at path."""
+        self.notebooks[path] = entry
+        self._changed = True
+
+    def set_cell(self, key: str, found: List[List[str]]) -> None:
+        """Store modules and packages found in a cell."""
+        self.cells[key] = list(found)
+        self._changed = True
+
+    def save(self) -> None:
+        """
+        Save entries to persistent storage, dropping notebooks that no 
+        longer exist and cells no longer in any notebook.
+        """
+        if self.cache_file is None or not self._changed:
+            return
+        data = self._load()
+        data['notebooks'] = {p: e for p, e in data['notebooks'].items()
+                             if os.path.exists(p)}
+        used = set(k for e in data['notebooks'].values() for k in e['cells'])
+        data['cells'] = {k: v for k, v in data['cells'].items() if k in used}
+        try:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = self.cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp_file, self.cache_file)
+            self._changed = False
+        except Exception as e:
+            print(f"Failed to save notebook cache: {e}", file=sys.stderr)
+
+
+def _scan_notebook(path: str, cells: Dict[str, List[List[str]]], 
+                   entry: Optional[Dict]=None
+                   ) -> Tuple[Dict, Dict[str, List[List[str]]]]:
+    """
+    Scan a notebook, reusing results for known cells.
+
+    Parameters
+    ----------
+    path :
+        Absolute path to notebook.
+    cells :
+        Known results keyed by cell hash.
+    entry :
+        Previous cache entry for the notebook, by default None.
+
+    Returns
+    -------
+    :
+        New cache entry for the notebook and results for cells not in 
+        cells.
+    """
+    stat = os.stat(path)
+    with open(path, 'rb') as f:
+        # mapped rather than read, so large outputs are only paged in
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) \
+            if stat.st_size else b'{}'
+        try:
+            digest = _digest(buf)
+            if entry and entry['hash'] == digest:
+                return dict(entry, mtime=stat.st_mtime_ns, size=stat.st_size), {}
+            language, sources = notebook_cells(buf)
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+
+    py_modules, r_modules = set(), set()
+    keys = []
+    new_cells = {}
+    for source in sources:
+        key = _digest(f'{language}\0{source}'.encode())
+        keys.append(key)
+        found = cells.get(key) or new_cells.get(key)
+        if found is None:
+            found = new_cells[key] = list(scan_cell(source, language))
+        py_modules.update(found[0])
+        r_modules.update(found[1])
+
+    entry = {'mtime': stat.st_mtime_ns, 'size': stat.st_size, 'hash': digest,
+             'cells': keys, 'python': sorted(py_modules), 'r': sorted(r_modules)}
+    return entry, new_cells
+
+
+def _scan_notebook_job(args: Tuple[str, Dict, Optional[Dict]]
+                       ) -> Tuple[Dict, Dict[str, List[List[str]]]]:
+    """Run _scan_notebook in a worker process."""
+    return _scan_notebook(*args)
+
+
+def notebook_modules(filename: Path, cache: Optional[DependencyCache]=None
+                     ) -> Tuple[List[str], List[str]]:
+    """
+    Python modules and R packages used in a notebook.
+
+    Parameters
+    ----------
+    filename :
+        Path to notebook.
+    cache :
+        Cache of previous results, by default None.
+
+    Returns
+    -------
+    :
+        Sorted Python module names and sorted R package names.
+    """
+    if cache is None:
+        cache = DependencyCache(None)
+    path = str(Path(filename).resolve())
+    entry = cache.fresh_notebook(path)
+    if entry is None:
+        entry, new_cells = _scan_notebook(path, cache.cells, 
+                                          cache.notebooks.get(path))
+        cache.set_notebook(path, entry)
+        for key, found in new_cells.items():
+            cache.set_cell(key, found)
+    return entry['python'], entry['r']
+
+
+def conda_package(module: str) -> Optional[str]:
+    """
+    Conda package providing a Python module.
+
+    Parameters
+    ----------
+    module :
+        Full dotted module name.
+
+    Returns
+    -------
+    :
+        Package name, or None for standard library and private modules.
+    """
+    parts = module.split('.')
+    if parts[0] in sys.stdlib_module_names or parts[0].startswith('_'):
+        return None
+    for i in range(len(parts), 0, -1):
+        name = '.'.join(parts[:i])
+        if name in py_to_conda_package_map:
+            return py_to_conda_package_map[name]
+    return parts[0]
+
+
+def get_notebook_dependencies(filename: Path, 
+                              cache: Optional[DependencyCache]=None) -> list:
+    """
+    Conda packages used in a notebook.
+
+    Parameters
+    ----------
+    filename :
+        Path to notebook.
+    cache :
+        Cache of previous results, by default None.
+
+    Returns
+    -------
+    :
+        Package names.
+    """
+    py_modules, r_modules = notebook_modules(filename, cache)
     dependencies = []
     for m in py_modules:
-        if m not in sys.stdlib_module_names and not m.startswith('_'):
-            dependencies.append(py_to_conda_package_map.get(m, m))
+        package = conda_package(m)
+        if package is not None and package not in dependencies:
+            dependencies.append(package)
     for m in r_modules:
         dependencies.append(r_to_conda_package_map.get(m, m))
-
     return dependencies
 
+
+def scan_notebooks(root: Path, cache: Optional[DependencyCache]=None, 
+                   jobs: int=1) -> Dict[Path, List[str]]:
+    """
+    Conda packages used in all notebooks below a directory.
+
+    Parameters
+    ----------
+    root :
+        Directory to search for notebooks.
+    cache :
+        Cache of previous results, by default None.
+    jobs :
+        Number of processes scanning notebooks not in the cache, 
+        by default 1.
+
+    Returns
+    -------
+    :
+        Package names for each notebook.
+    """
+    if cache is None:
+        cache = DependencyCache(None)
+    paths = [path for path in sorted(Path(root).glob('**/*.ipynb'))
+             if '.ipynb_checkpoints' not in path.parts]
+    stale = [str(path.resolve()) for path in paths
+             if cache.fresh_notebook(str(path.resolve())) is None]
+
+    if jobs > 1 and len(stale) > 1:
+        # workers get the results for the cells each notebook had when 
+        # last scanned, so an edited notebook only has its new cells parsed
+        def job_args():
+            for path in stale:
+                entry = cache.notebooks.get(path)
+                known = {key: cache.cells[key] for key in 
+                         (entry['cells'] if entry else []) 
+                         if key in cache.cells}
+                yield path, known, entry
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            scanned = executor.map(_scan_notebook_job, job_args(), 
+                                   chunksize=max(1, len(stale) // (4 * jobs)))
+            for path, (entry, new_cells) in zip(stale, scanned):
+                cache.set_notebook(path, entry)
+                for key, found in new_cells.items():
+                    cache.set_cell(key, found)
+
+    result = {}
+    for path in paths:
+        result[path] = get_notebook_dependencies(path, cache)
+    cache.save()
+    return result
+
+
+def add_to_manifest(manifest: PixiManifest, dependencies: Iterable[str], 
+                    feature: str='prod', platform: str='linux-64') -> List[str]:
+    """
+    Add dependencies missing from a pixi manifest without solving.
+
+    The 'r' channel is added if any dependency is an R package. Call
+    `PixiManifest.install` afterwards to solve once for all changes.
+
+    Parameters
+    ----------
+    manifest :
+        Manifest to edit.
+    dependencies :
+        Conda package names.
+    feature :
+        Feature to add dependencies to, by default 'prod'.
+    platform :
+        Platform to add dependencies for, by default 'linux-64'.
+
+    Returns
+    -------
+    :
+        Names of packages added.
+    """
+    dependencies = list(dependencies)
+    if any(x.startswith('r-') for x in dependencies):
+        manifest.add_channel('r')
+    return manifest.add_dependencies(dependencies, feature=feature, 
+                                     platform=platform)
+
+
 if __name__ == '__main__':
 
     # read arguments from command line
     import argparse
     parser = argparse.ArgumentParser(description='Update pixi dependencies from Jupyter notebooks.')
+    parser.add_argument('--no-cache', action='store_true', help='Rescan all notebooks.')
+    parser.add_argument('--jobs', '-j', type=int, default=os.cpu_count(), help='Number of processes scanning notebooks.')
+    parser.add_argument('--feature', type=str, default='prod', help='The feature to add dependencies to.')
+    parser.add_argument('--platform', type=str, default='linux-64', help='The platform to add dependencies for.')
     parser.add_argument('root', type=Path, help='The root dir with notebooks.')
     args = parser.parse_args()
     assert args.root.is_dir(), f"Root directory {args.root} does not exist or is not a directory."
 
+    cache = DependencyCache(None if args.no_cache else NOTEBOOK_CACHE_FILE)
     dependencies = []
-    for path in args.root.glob('**/*.ipynb'):
-        dependencies.extend(get_notebook_dependencies(path))
-    dependencies = list(set(dependencies))  # remove duplicates
+    for deps in scan_notebooks(args.root, cache, jobs=args.jobs).values():
+        dependencies.extend(deps)
+    dependencies = sorted(set(dependencies))  # remove duplicates
 
     os.chdir(args.root)
 
     if not Path('pixi.toml').exists():
-        path = os.path.dirname(sys.modules['franklin'].__file__) + '/data/templates/exercise/pixi.toml'
+        path = Path(__file__).parent / 'data/templates/exercise/pixi.toml'
         shutil.copy(path, 'pixi.toml')
 
         # for p in importlib_resources.files().joinpath('data/templates/exercise').iterdir():
@@ -296,16 +890,14 @@ if __name__ == '__main__':
         #         shutil.copy(p, 'pixi.toml')
         #         break
 
-    if any(x.startswith('r-') for x in dependencies):
-        cmd = 'pixi workspace channel add r'
-        cmd = shlex.split(cmd)
-        cmd[0] = shutil.which(cmd[0])
-        subprocess.run(cmd, check=True)
-
-    cmd = 'pixi add --feature exercise.target.linux-64 ' + ' '.join(dependencies)
-    cmd = shlex.split(cmd)
-    cmd[0] = shutil.which(cmd[0])
-    subprocess.run(cmd, check=True)
+    manifest = PixiManifest('pixi.toml')
+    added = add_to_manifest(manifest, dependencies, 
+                            feature=args.feature, platform=args.platform)
+    for name in added:
+        print(f"Adding {name}")
+    environment = args.feature if args.feature in \
+        manifest.data.get('environments', {}) else None
+    manifest.install(environment=environment)
 
 
 
@@ -0,0 +1,309 @@
+"""
+In-process editing of pixi.toml manifests.
+
+Every ``pixi add`` or ``pixi workspace channel add`` call solves the
+environment again. `PixiManifest` instead edits channels and dependency
+tables of pixi.toml directly, leaving comments and formatting of the
+rest of the file untouched, and `PixiManifest.install` runs a single
+``pixi install`` for all changes, or none if the manifest is unchanged.
+
+Only the standard library is used, so the module can also be used from
+scripts running in exercise containers.
+"""
+
+import re
+import json
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import tomllib
+except ModuleNotFoundError:  # Python < 3.11
+    import tomli as tomllib
+
+
+PACKAGE_SPEC = re.compile(r'^\s*([A-Za-z0-9_][A-Za-z0-9_.\-]*)\s*(.*?)\s*$')
+BARE_KEY = re.compile(r'^[A-Za-z0-9_\-]+$')
+TABLE_HEADER = re.compile(r'^\s*\[([^\[\]]+)\]\s*(#.*)?$')
+
+
+def parse_package(package: str) -> Tuple[str, str]:
+    """
+    Split a package specification as given to 'pixi add'.
+
+    Parameters
+    ----------
+    package :
+        Package name with optional version spec, e.g. 'numpy>=1.26'.
+
+    Returns
+    -------
+    :
+        Package name and version spec ('*' if none is given).
+    """
+    m = PACKAGE_SPEC.match(package)
+    if m is None:
+        raise ValueError(f'Invalid package specification: {package}')
+    name, spec = m.groups()
+    return name, spec or '*'
+
+
+def toml_key(key: str) -> str:
+    """Format key as a bare or quoted TOML key."""
+    return key if BARE_KEY.match(key) else json.dumps(key)
+
+
+class PixiManifest:
+    """
+    A pixi.toml manifest edited in memory.
+
+    Attributes
+    ----------
+    path : Path
+        Location of the manifest.
+    text : str
+        Current content of the manifest.
+    """
+
+    def __init__(self, path: Path='pixi.toml'):
+        """Initialize manifest from the file at path."""
+        self.path = Path(path)
+        self.text = self.path.read_text()
+        self._saved_text = self.text
+        self._needs_install = False
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Parsed manifest."""
+        return tomllib.loads(self.text)
+
+    @property
+    def changed(self) -> bool:
+        """True if the manifest has changes not yet written to disk."""
+        return self.text != self._saved_text
+
+    def _lines(self) -> List[str]:
+        return self.text.split('\n')
+
+    def _table_span(self, lines: List[str], table: str
+                    ) -> Optional[Tuple[int, int]]:
+        """
+        Line index of the header of table and index of the line after
+        its last key.
+        """
+        start = None
+        for i, line in enumerate(lines):
+            m = TABLE_HEADER.match(line)
+            if m is None:
+                continue
+            if start is not None:
+                break
+            if m.group(1).strip() == table:
+                start = i
+        if start is None:
+            return None
+        end = start + 1
+        for i in range(start + 1, len(lines)):
+            if TABLE_HEADER.match(lines[i]) or lines[i].lstrip().startswith('[['):
+                break
+            if lines[i].strip() and not lines[i].lstrip().startswith('#'):
+                end = i + 1
+        return start, end
+
+    def _get(self, table: str) -> Optional[Dict[str, Any]]:
+        """Content of a dotted table name, or None if it does not exist."""
+        node = self.data
+        for part in table.split('.'):
+            if not isinstance(node, dict) or part not in node:
+                return None
+            node = node[part]
+        return node
+
+    def _workspace_table(self) -> str:
+        return 'project' if 'project' in self.data and \
+            'workspace' not in self.data else 'workspace'
+
+    def channels(self) -> List[Any]:
+        """Channels of the workspace."""
+        return list(self.data.get(self._workspace_table(), {})
+                    .get('channels', []))
+
+    def add_channel(self, channel: str) -> bool:
+        """
+        Add a channel to the workspace, like 'pixi workspace channel add'.
+
+        Parameters
+        ----------
+        channel :
+            Channel name.
+
+        Returns
+        -------
+        :
+            True if the channel was added, False if it was already there.
+        """
+        channels = self.channels()
+        if channel in channels:
+            return False
+        if not all(isinstance(c, str) for c in channels):
+            raise ValueError('Cannot edit channels with priorities')
+        channels.append(channel)
+        new_line = f'channels = {json.dumps(channels)}'
+
+        table = self._workspace_table()
+        lines = self._lines()
+        span = self._table_span(lines, table)
+        if span is None:
+            raise ValueError(f'No [{table}] table in {self.path}')
+        start, end = span
+        for i in range(start + 1, end):
+            if re.match(r'\s*channels\s*=', lines[i]):
+                # replace the array, which may span several lines
+                j = i
+                while ']' not in lines[j].split('#')[0]:
+                    j += 1
+                lines[i:j + 1] = [new_line]
+                break
+        else:
+            lines.insert(end, new_line)
+        self._update('\n'.join(lines))
+        return True
+
+    def dependency_table(self, feature: Optional[str]=None,
+                         platform: Optional[str]=None,
+                         pypi: bool=False) -> str:
+        """
+        Name of the table holding dependencies.
+
+        Parameters
+        ----------
+        feature :
+            Feature name, by default None for the default feature.
+        platform :
+            Target platform, by default None for all platforms.
+        pypi :
+            PyPI rather than conda dependencies, by default False.
+
+        Returns
+        -------
+        :
+            Dotted table name, e.g. 'feature.prod.target.linux-64.dependencies'.
+        """
+        parts = []
+        if feature:
+            parts += ['feature', feature]
+        if platform:
+            parts += ['target', platform]
+        parts.append('pypi-dependencies' if pypi else 'dependencies')
+        return '.'.join(parts)
+
+    def dependencies(self, **kwargs) -> Dict[str, Any]:
+        """
+        Dependencies in a table. Takes the arguments of dependency_table.
+        """
+        return dict(self._get(self.dependency_table(**kwargs)) or {})
+
+    def add_dependencies(self, packages: Iterable[str],
+                         feature: Optional[str]=None,
+                         platform: Optional[str]=None,
+                         pypi: bool=False) -> List[str]:
+        """
+        Add dependencies not already in the manifest, like 'pixi add'
+        without solving.
+
+        Parameters
+        ----------
+        packages :
+            Package names with optional version specs.
+        feature :
+            Feature name, by default None for the default feature.
+        platform :
+            Target platform, by default None for all platforms.
+        pypi :
+            PyPI rather than conda dependencies, by default False.
+
+        Returns
+        -------
+        :
+            Names of the packages added.
+        """
+        table = self.dependency_table(feature, platform, pypi)
+        existing = self.dependencies(feature=feature, platform=platform,
+                                     pypi=pypi)
+        new_lines = []
+        added = []
+        for package in packages:
+            name, spec = parse_package(package)
+            if name in existing or name in added:
+                continue
+            new_lines.append(f'{toml_key(name)} = {json.dumps(spec)}')
+            added.append(name)
+        if not added:
+            return added
+
+        lines = self._lines()
+        span = self._table_span(lines, table)
+        if span is None:
+            if self._get(table) is not None:
+                raise ValueError(f'Cannot edit inline table {table}')
+            while lines and not lines[-1].strip():
+                lines.pop()
+            lines += ['', f'[{table}]'] + new_lines + ['']
+        else:
+            _, end = span
+            lines[end:end] = new_lines
+        self._update('\n'.join(lines))
+        return added
+
+    def _update(self, text: str) -> None:
+        """Set new content after checking that it parses."""
+        tomllib.loads(text)
+        self.text = text
+        self._needs_install = True
+
+    def save(self) -> bool:
+        """
+        Write the manifest if it changed.
+
+        Returns
+        -------
+        :
+            True if the file was written.
+        """
+        if not self.changed:
+            return False
+        self.path.write_text(self.text)
+        self._saved_text = self.text
+        return True
+
+    def install(self, environment: Optional[str]=None,
+                force: bool=False) -> bool:
+        """
+        Save the manifest and, if it was edited, solve and install the 
+        environment once.
+
+        Parameters
+        ----------
+        environment :
+            Environment to install, by default None for the default.
+        force :
+            Run 'pixi install' even if the manifest is unchanged,
+            by default False.
+
+        Returns
+        -------
+        :
+            True if 'pixi install' was run.
+        """
+        self.save()
+        if not self._needs_install and not force:
+            return False
+        cmd = [shutil.which('pixi') or 'pixi', 'install',
+               '--manifest-path', str(self.path)]
+        if environment:
+            cmd += ['--environment', environment]
+        subprocess.run(cmd, check=True)
+        self._needs_install = False
+        return True
@@ -0,0 +1,110 @@
+"""
+Allocation of host ports for exercise containers.
+
+Each exercise container publishes Jupyter and a Dash app port on the host.
+To run several exercises side by side, every container needs its own pair
+of host ports. Ports are chosen by checking that they can be bound, that no
+existing container publishes them, and by reserving them with lock files
+under ``~/.franklin/ports`` so that two franklin processes starting at the
+same time cannot pick the same pair before Docker has bound it.
+"""
+
+import os
+import time
+from pathlib import Path
+from typing import Iterable, List
+
+from . import config as cfg
+from .cache import file_lock
+from .logger import logger
+from .system import port_in_use
+
+
+PORT_RESERVATION_DIR = Path.home() / '.franklin' / 'ports'
+
+
+def reserve_ports(ports: List[int],
+                  reservation_dir: Path = PORT_RESERVATION_DIR) -> bool:
+    """
+    Reserve ports by atomically creating a lock file for each.
+
+    Reservations older than cfg.port_reservation_ttl seconds are stale;
+    by then the container owning them has bound the ports itself. Stale
+    reservations are replaced under a lock on the reservation directory,
+    so that a process cannot remove a reservation another process has
+    just made in place of the same stale one.
+
+    Parameters
+    ----------
+    ports :
+        Ports to reserve together.
+    reservation_dir :
+        Directory holding the lock files.
+
+    Returns
+    -------
+    :
+        True if all ports were reserved, False if any was reserved by
+        another process (in which case none are reserved).
+    """
+    reservation_dir.mkdir(parents=True, exist_ok=True)
+    created = []
+    with file_lock(reservation_dir / 'reservations.lock'):
+        for port in ports:
+            lock_file = reservation_dir / f'{port}.lock'
+            try:
+                if time.time() - lock_file.stat().st_mtime > cfg.port_reservation_ttl:
+                    lock_file.unlink()
+            except FileNotFoundError:
+                pass
+            try:
+                fd = os.open(lock_file, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                for f in created:
+                    f.unlink(missing_ok=True)
+                return False
+            with os.fdopen(fd, 'w') as f:
+                f.write(str(os.getpid()))
+            created.append(lock_file)
+    return True
+
+
+def allocate_ports(preferred: List[int], taken: Iterable[int] = (),
+                   attempts: int = 100,
+                   reservation_dir: Path = PORT_RESERVATION_DIR) -> List[int]:
+    """
+    Find and reserve free host ports.
+
+    Candidates are the preferred ports shifted by the same offset (0, 1,
+    2, ...), so the n'th concurrent exercise gets e.g. 8888+n and 8050+n.
+
+    Parameters
+    ----------
+    preferred :
+        Ports to use if they are free.
+    taken :
+        Ports known to be published by containers.
+    attempts :
+        Number of offsets to try, by default 100.
+    reservation_dir :
+        Directory holding reservation lock files.
+
+    Returns
+    -------
+    :
+        Reserved ports in the order of preferred.
+
+    Raises
+    ------
+    RuntimeError
+        If no free set of ports is found.
+    """
+    taken = set(taken)
+    for offset in range(attempts):
+        ports = [port + offset for port in preferred]
+        if any(port in taken or port_in_use(port) for port in ports):
+            continue
+        if reserve_ports(ports, reservation_dir):
+            logger.debug(f'Allocated ports {ports}')
+            return ports
+    raise RuntimeError(f'No free ports near {preferred}')
@@ -10,7 +10,6 @@ import shutil
 import shlex
 import subprocess
 import time
-import requests
 from functools import wraps
 from typing import List, Any, Callable, Optional, Union
 
@@ -327,8 +326,11 @@ def check_internet_connection() -> bool:
     This function never returns False - it exits the application
     on connection failure. The return type annotation may be misleading.
     """
+    # imported here as requests is slow to import at startup
+    import requests
+    from . import http_client
     try:
-        requests.get("https://hub.docker.com/", timeout=10)    
+        http_client.probe_session.head("https://hub.docker.com/", timeout=10)
         logger.debug("Internet connection OK.")
         return True
     except (requests.ConnectionError, requests.Timeout) as exception:
@@ -373,8 +375,10 @@ def internet_ok(func: Callable[..., Any]) -> Callable[..., Any]:
     """
     @wraps(func)
     def wrapper(*args, **kwargs):
+        import requests
+        from . import http_client
         try:
-            requests.get("https://hub.docker.com/", timeout=10)    
+            http_client.probe_session.head("https://hub.docker.com/", timeout=10)
             logger.debug("Internet connection OK.")
         except (requests.ConnectionError, requests.Timeout):
             term.boxed_text(
@@ -60,6 +60,54 @@ def dummy_progressbar(seconds: str, label: str='Hang on...', ljust=None,
             bar.update(1)
 
 
+def polling_progressbar(ready: Callable[[], bool], timeout: float, 
+                        label: str='Hang on...', initial_delay: float=0.05, 
+                        max_delay: float=1, ljust=None, 
+                        **kwargs: dict) -> bool:
+    """
+    Progressbar that polls `ready` with exponential backoff until it 
+    returns True or `timeout` seconds have passed. The bar shows the 
+    time elapsed and completes as soon as `ready` returns True.
+
+    Parameters
+    ----------
+    ready : 
+        Function returning True when the wait is over.
+    timeout : 
+        Maximal number of seconds to wait.
+    label :     
+        Label for progressbar, by default 'Hang on...'
+    initial_delay :
+        Seconds between the first polls, by default 0.05
+    max_delay :
+        Maximal seconds between polls, by default 1
+
+    Returns
+    -------
+    :
+        True if `ready` returned True before the timeout.
+    """
+    pg_options = cfg.pg_options.copy()
+    if ljust is None:
+        ljust = max(len(label), cfg.pg_ljust)
+    pg_options.update(kwargs)
+    start = time.monotonic()
+    delay = initial_delay
+    with click.progressbar(length=100, label=label.ljust(ljust), 
+                           **pg_options) as bar:
+        while True:
+            if ready():
+                bar.update(100 - bar.pos)
+                return True
+            elapsed = time.monotonic() - start
+            if elapsed >= timeout:
+                return False
+            time.sleep(min(delay, timeout - elapsed))
+            delay = min(delay * 2, max_delay)
+            pos = min(int(100 * (time.monotonic() - start) / timeout), 99)
+            bar.update(pos - bar.pos)
+
+
 def wrap(text: str, width: int=None, indent: bool=True, 
          initial_indent: str=None, subsequent_indent: str=None) -> str:
     """
@@ -1,11 +1,11 @@
 import signal 
+import importlib
 import shlex
 import sys
 import os
 import re
 import shutil
 import click
-import requests 
 import stat
 import shutil
 import time
@@ -126,7 +126,7 @@ class AliasedGroup(click.Group):
             'container': 'containers',
         }            
         if cmd_name in aliases:
-            return click.Group.get_command(self, ctx, aliases[cmd_name])
+            return self.get_command(ctx, aliases[cmd_name])
 
     def resolve_command(self, ctx, args):
         # always return the full command name
@@ -134,6 +134,112 @@ class AliasedGroup(click.Group):
         return cmd.name, cmd, args
 
 
+class LazyGroup(AliasedGroup):
+    """
+    An AliasedGroup that imports subcommands only when they are used.
+
+    Subcommands are registered with add_lazy_command() by import path
+    together with their short help, so that listing them in --help does 
+    not import them. Commands from plugins (entry points in plugin_group)
+    are listed by entry point name, with the summary of the distribution
+    providing them as short help, and imported only when looked up.
+    """
+    def __init__(self, *args, plugin_group: str=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.plugin_group = plugin_group
+        self.lazy_commands = {}
+        self._plugin_entry_points = None
+
+    def add_lazy_command(self, name: str, import_path: str, 
+                         short_help: str='', hidden: bool=False) -> None:
+        """
+        Register a subcommand to be imported when used.
+
+        Parameters
+        ----------
+        name : 
+            Command name.
+        import_path : 
+            Location of the command as 'package.module:attribute'.
+        short_help : 
+            Help shown in the command listing.
+        hidden : 
+            Leave the command out of the command listing.
+        """
+        self.lazy_commands[name] = (import_path, short_help, hidden)
+
+    def _load_lazy(self, name):
+        import_path, _, _ = self.lazy_commands[name]
+        module_name, attribute = import_path.split(':')
+        module = importlib.import_module(module_name)
+        self.add_command(getattr(module, attribute), name)
+
+    def _plugins(self):
+        # entry point metadata only, plugins are not imported here
+        if self._plugin_entry_points is None:
+            self._plugin_entry_points = {}
+            if self.plugin_group is not None:
+                from importlib.metadata import entry_points
+                for entry_point in entry_points().select(group=self.plugin_group):
+                    self._plugin_entry_points[entry_point.name] = entry_point
+        return self._plugin_entry_points
+
+    def _plugin_summary(self, name):
+        # summary of the distribution providing the plugin, if known
+        try:
+            return self._plugins()[name].dist.metadata.get('Summary') or ''
+        except Exception:
+            return ''
+
+    def _load_plugin(self, name):
+        from click_plugins.core import BrokenCommand
+        entry_point = self._plugins()[name]
+        try:
+            self.add_command(entry_point.load(), name)
+        except Exception:
+            self.add_command(BrokenCommand(name), name)
+
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_commands)
+                      | set(self._plugins()))
+
+    def get_command(self, ctx, cmd_name):
+        if cmd_name not in self.commands:
+            if cmd_name in self.lazy_commands:
+                self._load_lazy(cmd_name)
+            elif cmd_name in self._plugins():
+                self._load_plugin(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(self, ctx, formatter):
+        names = self.list_commands(ctx)
+        if not names:
+            return
+        # same width limit as click.Group.format_commands
+        limit = formatter.width - 6 - max(len(name) for name in names)
+        rows = []
+        for name in names:
+            if name in self.lazy_commands and name not in self.commands:
+                _, short_help, hidden = self.lazy_commands[name]
+                short_help = click.utils.make_default_short_help(
+                    short_help, limit)
+            elif name in self._plugins() and name not in self.commands:
+                short_help = click.utils.make_default_short_help(
+                    self._plugin_summary(name), limit)
+                hidden = False
+            else:
+                cmd = self.get_command(ctx, name)
+                if cmd is None:
+                    continue
+                short_help = cmd.get_short_help_str(limit)
+                hidden = cmd.hidden
+            if not hidden:
+                rows.append((name, short_help))
+        if rows:
+            with formatter.section('Commands'):
+                formatter.write_dl(rows)
+
+
 class PrefixAliasedGroup(click.Group):
     """
     A click Group that allows for prefix matching of commands.
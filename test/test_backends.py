@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+"""
+Tests for repository listing and response caching in the git backends.
+"""
+
+import sys
+import os
+import time
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli.backends import (
+    GitLabBackend, GitHubBackend, Visibility, BackendFactory)
+from franklin_cli.backends.caching import ResponseCache
+
+
+def pages(items, page_size, fetched):
+    """Iterate over items, counting the pages fetched."""
+    for i, item in enumerate(items):
+        if i % page_size == 0:
+            fetched.append(i // page_size)
+        yield item
+
+
+class TestGitLabListing(unittest.TestCase):
+    """Test lazy listing of GitLab projects."""
+
+    def setUp(self):
+        self.backend = GitLabBackend(token='t0k')
+        self.backend._authenticated = True
+        self.backend.gl = Mock()
+        self.fetched = []
+        self.backend.gl.projects.list.side_effect = \
+            lambda **params: pages(range(1000), params['per_page'], self.fetched)
+        patcher = patch.object(GitLabBackend, '_convert_project_to_repository',
+                               side_effect=lambda p: p)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_filters_and_limit(self):
+        repos = self.backend.iter_repositories(
+            limit=150, owned=True, search='ex', visibility=Visibility.PRIVATE)
+        self.assertEqual(next(repos), 0)
+        self.assertEqual(self.fetched, [0])
+        self.assertEqual(len(list(repos)), 149)
+        self.assertEqual(self.fetched, [0, 1])
+        params = self.backend.gl.projects.list.call_args.kwargs
+        self.assertEqual(params, {'per_page': 100, 'iterator': True,
+                                  'owned': True, 'search': 'ex',
+                                  'visibility': 'private'})
+
+    def test_list_repositories(self):
+        self.assertEqual(len(self.backend.list_repositories()), 1000)
+
+
+class TestGitHubListing(unittest.TestCase):
+    """Test lazy listing of GitHub repositories."""
+
+    def setUp(self):
+        self.backend = GitHubBackend(token='t0k')
+        self.backend._authenticated = True
+        self.backend.gh = Mock()
+        self.backend.gh.get_user.return_value.login = 'teacher'
+        patcher = patch.object(GitHubBackend, '_convert_github_repo_to_repository',
+                               side_effect=lambda r: r.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def repo(self, name, private=False, archived=False):
+        repo = Mock(private=private, archived=archived, description=None)
+        repo.name = name
+        return repo
+
+    def test_visibility_filtered_by_api(self):
+        user = self.backend.gh.get_user.return_value
+        user.get_repos.return_value = iter(
+            [self.repo('a', private=True), self.repo('b', private=True),
+             self.repo('c', private=True, archived=True)])
+        repos = list(self.backend.iter_repositories(
+            owned=True, visibility='private', archived=False))
+        self.assertEqual(repos, ['a', 'b'])
+        user.get_repos.assert_called_once_with(affiliation='owner',
+                                               visibility='private')
+
+    def test_scoped_search_is_client_side(self):
+        org = self.backend.gh.get_organization.return_value
+        org.get_repos.return_value = iter(
+            [self.repo(f'exercise-{i}') for i in range(1500)]
+            + [self.repo('notes')])
+        repos = list(self.backend.iter_repositories(
+            org='course', search='ERCISE', visibility='public'))
+        # substring matches, not truncated at the search API's 1000 results
+        self.assertEqual(len(repos), 1500)
+        org.get_repos.assert_called_once_with(type='public')
+        self.backend.gh.search_repositories.assert_not_called()
+
+    def test_search_without_scope_is_client_side(self):
+        user = self.backend.gh.get_user.return_value
+        user.get_repos.return_value = iter(
+            [self.repo('exercise-1'), self.repo('notes')])
+        self.assertEqual(self.backend.list_repositories(search='exer'),
+                         ['exercise-1'])
+        self.backend.gh.search_repositories.assert_not_called()
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test caching and coalescing of backend lookups."""
+
+    def setUp(self):
+        self.backend = BackendFactory.create_backend('gitlab', token='t0k')
+        self.backend._authenticated = True
+        self.backend.gl = Mock()
+        self.backend.gl.projects.get.side_effect = \
+            lambda repo_id: Mock(path=repo_id)
+        patcher = patch.object(GitLabBackend, '_convert_project_to_repository',
+                               side_effect=lambda p: p.path)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_cached_until_mutated(self):
+        self.assertIsInstance(self.backend, GitLabBackend)
+        self.assertEqual(self.backend.get_repository('course/ex'), 'course/ex')
+        self.backend.get_repository('course/ex')
+        self.backend.get_repository('course/other')
+        self.assertEqual(self.backend.gl.projects.get.call_count, 2)
+
+        self.backend.update_repository('course/ex', description='new')
+        self.backend.get_repository('course/ex')
+        self.assertEqual(self.backend.gl.projects.get.call_count, 4)
+
+    def test_expiry_and_errors(self):
+        self.backend.response_cache.ttls['get_repository'] = 0.05
+        self.backend.get_repository('course/ex')
+        time.sleep(0.1)
+        self.backend.get_repository('course/ex')
+        self.assertEqual(self.backend.gl.projects.get.call_count, 2)
+
+        cache = ResponseCache({'lookup': 60})
+        with self.assertRaises(ValueError):
+            cache.call('lookup', 1, Mock(side_effect=ValueError))
+        self.assertEqual(cache.call('lookup', 1, lambda: 'ok'), 'ok')
+
+    def test_concurrent_lookups_coalesced(self):
+        def slow_get(repo_id):
+            time.sleep(0.2)
+            return Mock(path=repo_id)
+        self.backend.gl.projects.get.side_effect = slow_get
+        results = []
+        threads = [threading.Thread(
+            target=lambda: results.append(self.backend.get_repository('course/ex')))
+            for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(results, ['course/ex'] * 5)
+        self.assertEqual(self.backend.gl.projects.get.call_count, 1)
+
+    def test_file_changes_invalidate_repository(self):
+        self.backend.get_repository('course/ex')
+        with patch.object(GitLabBackend, 'create_file', create=True):
+            self.backend.create_file('course/ex', 'README.md', 'text', 'add')
+        self.backend.get_repository('course/ex')
+        self.assertEqual(self.backend.gl.projects.get.call_count, 2)
+
+    def test_lookup_in_constructor(self):
+        class EagerBackend(GitLabBackend):
+            def __init__(self, **kwargs):
+                super().__init__(**kwargs)
+                self.current_user = self.get_current_user()
+        with patch.object(GitLabBackend, 'get_current_user',
+                          return_value='teacher'):
+            with patch.dict(BackendFactory._backends, {'eager': EagerBackend}):
+                backend = BackendFactory.create_backend('eager', token='t0k')
+        self.assertEqual(backend.current_user, 'teacher')
+
+    def test_cache_disabled(self):
+        backend = BackendFactory.create_backend('gitlab', token='t0k', cache=False)
+        self.assertFalse(hasattr(backend, 'response_cache'))
+        backend = BackendFactory.create_backend('gitlab', token='t0k', cache='false')
+        self.assertFalse(hasattr(backend, 'response_cache'))
+        backend = BackendFactory.create_backend('gitlab', token='t0k', cache='yes')
+        self.assertTrue(hasattr(backend, 'response_cache'))
+        with self.assertRaises(ValueError):
+            BackendFactory.create_backend('gitlab', token='t0k', cache='maybe')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+Tests for the on-disk GitLab catalog cache.
+"""
+
+import sys
+import os
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import requests
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import gitlab
+from franklin_cli.cache import CatalogCache
+
+
+def make_response(status_code=200, data=None, etag=None, total_pages=None):
+    response = Mock()
+    response.status_code = status_code
+    response.ok = status_code < 400
+    response.json.return_value = data
+    response.headers = {'ETag': etag} if etag else {}
+    if total_pages is not None:
+        response.headers['X-Total-Pages'] = str(total_pages)
+    return response
+
+
+class TestCatalogCache(unittest.TestCase):
+    """Test caching and revalidation of catalog listings."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = CatalogCache(Path(self.tmp_dir.name) / 'catalog.json')
+        patcher = patch.object(gitlab, 'catalog_cache', self.cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.url = 'https://gitlab.example.com/api/v4/groups/1/subgroups'
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_fresh_entry_served_from_disk(self, mock_get):
+        mock_get.return_value = make_response(data=[1, 2], etag='"abc"')
+        self.assertEqual(gitlab.get_catalog_json(self.url, ttl=60), [1, 2])
+
+        # a new cache instance reads the same file
+        reloaded = CatalogCache(self.cache.cache_file)
+        with patch.object(gitlab, 'catalog_cache', reloaded):
+            self.assertEqual(gitlab.get_catalog_json(self.url, ttl=60), [1, 2])
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_expired_entry_revalidated_with_etag(self, mock_get):
+        mock_get.return_value = make_response(data=[1, 2], etag='"abc"')
+        gitlab.get_catalog_json(self.url, ttl=0)
+
+        mock_get.return_value = make_response(status_code=304)
+        self.assertEqual(gitlab.get_catalog_json(self.url, ttl=0), [1, 2])
+        headers = mock_get.call_args.kwargs['headers']
+        self.assertEqual(headers['If-None-Match'], '"abc"')
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_refresh_forces_revalidation(self, mock_get):
+        mock_get.return_value = make_response(data=[1], etag='"abc"')
+        gitlab.get_catalog_json(self.url, ttl=3600)
+        self.cache.refresh = True
+        mock_get.return_value = make_response(data=[1, 2, 3], etag='"def"')
+        self.assertEqual(gitlab.get_catalog_json(self.url, ttl=3600), [1, 2, 3])
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_stale_entry_used_when_offline(self, mock_get):
+        mock_get.return_value = make_response(data=[1], etag='"abc"')
+        gitlab.get_catalog_json(self.url, ttl=0)
+        mock_get.side_effect = requests.ConnectionError()
+        self.assertEqual(gitlab.get_catalog_json(self.url, ttl=0), [1])
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_offline_without_entry_raises(self, mock_get):
+        mock_get.side_effect = requests.ConnectionError()
+        with self.assertRaises(requests.ConnectionError):
+            gitlab.get_catalog_json(self.url, ttl=0)
+
+
+class TestConcurrentProcesses(unittest.TestCase):
+    """Test that caches sharing a file keep each other's entries."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_file = Path(self.tmp_dir.name) / 'catalog.json'
+
+    def test_entries_merged(self):
+        first = CatalogCache(self.cache_file)
+        second = CatalogCache(self.cache_file)
+        first.get('a')
+        second.get('b')
+        first.set('a', 1)
+        second.set('b', 2)
+        first.touch('a')
+        reloaded = CatalogCache(self.cache_file)
+        self.assertEqual(reloaded.get('a')['data'], 1)
+        self.assertEqual(reloaded.get('b')['data'], 2)
+        self.assertEqual(first.get('b')['data'], 2)
+
+    def test_refresh_reset(self):
+        cache = CatalogCache(self.cache_file)
+        with cache.refreshing(True):
+            self.assertTrue(cache.refresh)
+        self.assertFalse(cache.refresh)
+
+
+class TestPagination(unittest.TestCase):
+    """Test assembly of paginated listings."""
+
+    def setUp(self):
+        self.url = 'https://gitlab.example.com/api/v4/groups/1/projects'
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_all_pages_assembled_in_order(self, mock_get):
+        def get(url, headers=None, params=None, timeout=None):
+            page = params['page']
+            return make_response(data=[page * 10, page * 10 + 1],
+                                 total_pages=4)
+        mock_get.side_effect = get
+        entries = gitlab.get_all_pages(self.url, params={'archived': 'false'})
+        self.assertEqual(entries, [10, 11, 20, 21, 30, 31, 40, 41])
+        self.assertEqual(mock_get.call_count, 4)
+        for call in mock_get.call_args_list:
+            self.assertEqual(call.kwargs['params']['archived'], 'false')
+            self.assertEqual(call.kwargs['params']['per_page'],
+                             gitlab.cfg.gitlab_per_page)
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_next_page_followed_without_total(self, mock_get):
+        def get(url, headers=None, params=None, timeout=None):
+            page = int(params['page'])
+            response = make_response(data=[page])
+            if page < 3:
+                response.headers['X-Next-Page'] = str(page + 1)
+            return response
+        mock_get.side_effect = get
+        self.assertEqual(gitlab.get_all_pages(self.url), [1, 2, 3])
+
+    @patch('franklin_cli.http_client.session.get')
+    def test_listing_grows_past_unchanged_page(self, mock_get):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        cache = CatalogCache(Path(tmp_dir.name) / 'catalog.json')
+        patcher = patch.object(gitlab, 'catalog_cache', cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        mock_get.return_value = make_response(data=[1], etag='"abc"',
+                                              total_pages=1)
+        self.assertEqual(gitlab.get_all_pages(self.url, ttl=0), [1])
+
+        # first page unchanged, but a second page was added
+        def get(url, headers=None, params=None, timeout=None):
+            if params['page'] == 1:
+                self.assertEqual(headers['If-None-Match'], '"abc"')
+                return make_response(status_code=304, total_pages=2)
+            return make_response(data=[2], etag='"def"', total_pages=2)
+        mock_get.side_effect = get
+        self.assertEqual(gitlab.get_all_pages(self.url, ttl=0), [1, 2])
+        key = next(k for k in cache._load() if 'page=1' in k)
+        self.assertEqual(cache.get(key)['pagination'], {'X-Total-Pages': '2'})
+
+
+class TestResolveExerciseLabels(unittest.TestCase):
+    """Test batch resolution of image labels to display names."""
+
+    @patch('franklin_cli.gitlab.get_exercise_names')
+    @patch('franklin_cli.gitlab.get_course_names')
+    def test_same_exercise_in_two_courses(self, mock_courses, mock_exercises):
+        mock_courses.return_value = {'c1': 'Course 1', 'c2': 'Course 2'}
+        mock_exercises.side_effect = lambda course: {'ex': f'{course} ex'}
+        names = gitlab.resolve_exercise_labels(
+            [('c1', 'ex'), ('c2', 'ex'), ('c1', 'ex')])
+        self.assertEqual(names[('c1', 'ex')], ('Course 1', 'c1 ex'))
+        self.assertEqual(names[('c2', 'ex')], ('Course 2', 'c2 ex'))
+        self.assertEqual(mock_exercises.call_count, 2)
+
+    @patch('franklin_cli.gitlab.get_course_names')
+    def test_no_labels_no_requests(self, mock_courses):
+        self.assertEqual(gitlab.resolve_exercise_labels([]), {})
+        mock_courses.assert_not_called()
+
+
+class TestPrefetch(unittest.TestCase):
+    """Test that listings are fetched while the user picks a course."""
+
+    @patch('franklin_cli.gitlab.pick_exercise', return_value=('e1', 'Ex 1'))
+    @patch('franklin_cli.gitlab.pick_course')
+    @patch('franklin_cli.gitlab.get_registry_listing',
+           return_value={('c1', 'e1'): 'registry/c1/e1'})
+    @patch('franklin_cli.gitlab.get_exercise_names')
+    @patch('franklin_cli.gitlab.get_course_names',
+           return_value={'c1': 'Course 1', 'c2': 'Course 2'})
+    def test_select_image(self, mock_courses, mock_exercises, mock_listing,
+                          mock_pick_course, mock_pick_exercise):
+        mock_exercises.side_effect = lambda course: {'e1': f'{course} ex'}
+        executor = Mock(wraps=gitlab._prefetch_executor)
+
+        def pick_course(course_names):
+            submitted = [c.args for c in executor.submit.call_args_list]
+            self.assertIn((mock_listing, gitlab.cfg.gitlab_api_url +
+                           f'/groups/{gitlab.cfg.gitlab_group}'
+                           '/registry/repositories'), submitted)
+            self.assertIn((mock_exercises, 'c1'), submitted)
+            self.assertIn((mock_exercises, 'c2'), submitted)
+            return 'c1', 'Course 1'
+        mock_pick_course.side_effect = pick_course
+
+        with patch.object(gitlab, '_prefetch_executor', executor):
+            self.assertEqual(gitlab.select_image(), 'registry/c1/e1')
+        mock_pick_exercise.assert_called_once_with(
+            'c1', 'Course 1', {('c1', 'e1'): 'registry/c1/e1'},
+            {'e1': 'c1 ex'})
+        self.assertEqual(mock_listing.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+#!/usr/bin/env python
+"""
+Tests for Docker Desktop settings and startup checks.
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import desktop
+from franklin_cli.cache import CatalogCache
+
+
+class DesktopTestCase(unittest.TestCase):
+    """Use a temporary settings file and state file."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.settings_file = Path(self.tmp_dir.name) / 'settings-store.json'
+        self.settings_file.write_text(json.dumps({'Cpus': 2}))
+        self.state = CatalogCache(Path(self.tmp_dir.name) / 'state.json')
+        for patcher in [
+                patch.object(desktop, 'get_user_config_file',
+                             return_value=self.settings_file),
+                patch.object(desktop, 'desktop_state', self.state),
+                patch.object(desktop, '_desktop_ready', False)]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class TestUserConfig(DesktopTestCase):
+    """Test that the settings file is only written on changes."""
+
+    def test_written_only_on_change(self):
+        with patch.object(desktop, 'write_user_config',
+                          wraps=desktop.write_user_config) as mock_write:
+            self.assertTrue(desktop.update_user_config({'Cpus': 4}))
+            self.assertFalse(desktop.update_user_config({'Cpus': 4}))
+            desktop.config_set('Cpus', '4')
+            self.assertEqual(mock_write.call_count, 1)
+        self.assertEqual(desktop.read_user_config(), {'Cpus': 4})
+
+    def test_disk_size_rounded(self):
+        desktop.update_user_config({'DiskSizeMiB': 25000})
+        self.assertFalse(desktop.update_user_config({'DiskSizeMiB': 25000}))
+        self.assertEqual(desktop.read_user_config()['DiskSizeMiB'], 24576)
+
+    def test_start_settings_skipped_while_unchanged(self):
+        desktop.apply_start_settings()
+        config = desktop.read_user_config()
+        for variable in desktop.cfg.desktop_start_settings:
+            self.assertEqual(config[variable],
+                             desktop.cfg.docker_settings[variable])
+        with patch.object(desktop, 'read_user_config') as mock_read:
+            desktop.apply_start_settings()
+            mock_read.assert_not_called()
+
+        # Docker Desktop rewrote the file
+        self.settings_file.write_text(json.dumps({'Cpus': 2}))
+        os.utime(self.settings_file, (0, 0))
+        desktop.apply_start_settings()
+        self.assertIn(desktop.cfg.desktop_start_settings[0],
+                      desktop.read_user_config())
+
+
+@patch.object(desktop.shutil, 'which', return_value='/usr/bin/docker')
+@patch.object(desktop.system, 'system', return_value='Darwin')
+@patch.object(desktop, 'update_desktop')
+@patch.object(desktop, 'desktop_restart')
+@patch.object(desktop, 'desktop_status', return_value='running')
+class TestFailsafeStart(DesktopTestCase):
+    """Test that startup checks are made once."""
+
+    def test_checks_once_per_process(self, mock_status, mock_restart,
+                                     mock_update, mock_system, mock_which):
+        desktop.failsafe_start_desktop()
+        desktop.failsafe_start_desktop()
+        mock_status.assert_called_once()
+        mock_restart.assert_not_called()
+        mock_update.assert_called_once()
+
+    def test_update_check_throttled(self, mock_status, mock_restart,
+                                    mock_update, mock_system, mock_which):
+        desktop.check_desktop_update()
+        desktop.check_desktop_update()
+        mock_update.assert_called_once()
+
+        # a new process reads the time of the last check from disk
+        with patch.object(desktop, 'desktop_state',
+                          CatalogCache(self.state.cache_file)):
+            desktop.check_desktop_update()
+        mock_update.assert_called_once()
+
+
+class TestWaitForDesktop(unittest.TestCase):
+    """Test polling for the Docker daemon."""
+
+    def test_returns_when_daemon_responds(self):
+        with patch.object(desktop, '_ping',
+                          side_effect=[False, False, True]) as mock_ping:
+            start = time.monotonic()
+            self.assertTrue(desktop.wait_for_desktop(timeout=10))
+            self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(mock_ping.call_count, 3)
+
+    def test_timeout(self):
+        with patch.object(desktop, '_ping', return_value=False):
+            start = time.monotonic()
+            self.assertFalse(desktop.wait_for_desktop(timeout=0.3))
+            self.assertLess(time.monotonic() - start, 1)
+
+    def test_restart_waits_for_daemon_to_go_down(self):
+        with patch.object(desktop, '_ping',
+                          side_effect=[True, True, False, True]) as mock_ping:
+            self.assertTrue(desktop.wait_for_desktop(timeout=10,
+                                                     restarting=True))
+        self.assertEqual(mock_ping.call_count, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
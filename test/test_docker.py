@@ -0,0 +1,328 @@
+#!/usr/bin/env python
+"""
+Tests for Docker container handling without a Docker daemon.
+"""
+
+import sys
+import os
+import time
+import threading
+import subprocess
+import tempfile
+import inspect
+from pathlib import Path
+import unittest
+from unittest.mock import Mock, patch
+
+import click
+import requests
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import docker
+from franklin_cli.docker import PullProgress
+from franklin_cli.cache import CatalogCache
+from franklin_cli.engine import EngineClient, EngineError
+
+
+class TestRunContainer(unittest.TestCase):
+    """Test readiness detection in run_container."""
+
+    def fake_run(self, delay, container_id='abc123', returncode=None):
+        process = Mock()
+        process.poll.return_value = returncode
+        process.returncode = returncode
+
+        def run(image_url, cidfile=None):
+            def write():
+                time.sleep(delay)
+                with open(cidfile, 'w') as f:
+                    f.write(container_id)
+            if returncode is None:
+                threading.Thread(target=write).start()
+            return process, '8888'
+        return run
+
+    def test_returns_when_container_created(self):
+        with patch.object(docker, 'run', self.fake_run(0.2)):
+            start = time.monotonic()
+            container_id, _, port = docker.run_container('image')
+            elapsed = time.monotonic() - start
+        self.assertEqual(container_id, 'abc123')
+        self.assertEqual(port, '8888')
+        self.assertLess(elapsed, 2)
+
+    def test_fails_fast_when_docker_run_exits(self):
+        with patch.object(docker, 'run', self.fake_run(0, returncode=125)):
+            start = time.monotonic()
+            with self.assertRaises(Exception):
+                docker.run_container('image')
+            self.assertLess(time.monotonic() - start, 2)
+
+
+class TestPullProgress(unittest.TestCase):
+    """Test aggregation of docker pull layer output."""
+
+    def test_layer_states(self):
+        progress = PullProgress()
+        lines = ['latest: Pulling from franklin/course/ex\n',
+                 'aaaaaaaaaaaa: Already exists\n',
+                 'bbbbbbbbbbbb: Pulling fs layer\n',
+                 'bbbbbbbbbbbb: Waiting\n',
+                 'bbbbbbbbbbbb: Download complete\n',
+                 'bbbbbbbbbbbb: Extracting\n',
+                 'bbbbbbbbbbbb: Pull complete\n',
+                 'Digest: sha256:abc\n']
+        steps = [progress.update(line) for line in lines]
+        self.assertEqual(steps, [0, 2, 0, 0, 1, 0, 1, 0])
+        self.assertEqual(progress.length, 4)
+        self.assertEqual(progress.done, 4)
+
+
+class TestPull(unittest.TestCase):
+    """Test digest comparison and retries of image pulls."""
+
+    image_url = 'registry.example.com/franklin/course/ex'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.freshness = CatalogCache(Path(self.tmp_dir.name) / 'fresh.json')
+        patcher = patch.object(docker, 'image_freshness', self.freshness)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    @patch.object(docker, '_pull_with_progress')
+    @patch.object(docker, 'registry_image_digest', return_value='sha256:abc')
+    @patch.object(docker, 'local_image_digest', return_value='sha256:abc')
+    def test_skip_when_up_to_date(self, mock_local, mock_remote, mock_pull):
+        docker.pull(self.image_url)
+        mock_pull.assert_not_called()
+
+    @patch.object(docker, '_pull_with_progress')
+    @patch.object(docker, 'registry_image_digest')
+    @patch.object(docker, 'local_image_digest', return_value='sha256:abc')
+    def test_recent_check_skips_registry(self, mock_local, mock_remote,
+                                         mock_pull):
+        self.freshness.set(self.image_url, 'sha256:abc')
+        docker.pull(self.image_url, policy='interval')
+        mock_remote.assert_not_called()
+        mock_pull.assert_not_called()
+
+        docker.pull(self.image_url, policy='always')
+        mock_remote.assert_called_once()
+
+    @patch.object(docker, '_pull_with_progress')
+    @patch.object(docker, 'registry_image_digest',
+                  side_effect=requests.ConnectionError())
+    @patch.object(docker, 'local_image_digest', return_value='sha256:abc')
+    def test_offline_uses_local_image(self, mock_local, mock_remote,
+                                      mock_pull):
+        docker.pull(self.image_url, policy='always')
+        mock_pull.assert_not_called()
+
+    @patch.object(docker.time, 'sleep')
+    @patch.object(docker, '_pull_with_progress')
+    @patch.object(docker, 'registry_image_digest', return_value='sha256:new')
+    @patch.object(docker, 'local_image_digest', return_value='sha256:abc')
+    def test_retry_after_failure(self, mock_local, mock_remote, mock_pull,
+                                 mock_sleep):
+        mock_pull.side_effect = [
+            subprocess.CalledProcessError(1, 'docker pull', 'EOF'), None]
+        docker.pull(self.image_url)
+        self.assertEqual(mock_pull.call_count, 2)
+        mock_sleep.assert_called_once()
+        self.assertEqual(self.freshness.get(self.image_url)['data'],
+                         'sha256:abc')
+
+    @patch.object(docker.time, 'sleep')
+    @patch.object(docker, '_pull_with_progress')
+    @patch.object(docker, 'local_image_digest', return_value=None)
+    def test_gives_up_after_retries(self, mock_local, mock_pull, mock_sleep):
+        mock_pull.side_effect = subprocess.CalledProcessError(
+            1, 'docker pull', 'EOF')
+        with self.assertRaises(subprocess.CalledProcessError):
+            docker.pull(self.image_url)
+        self.assertEqual(mock_pull.call_count, docker.cfg.pull_retries + 1)
+
+    @patch('franklin_cli.http_client.session.get')
+    @patch('franklin_cli.http_client.probe_session.head')
+    def test_registry_digest_with_token(self, mock_head, mock_get):
+        challenge = Mock(status_code=401, ok=False, headers={
+            'WWW-Authenticate': 'Bearer realm="https://gitlab.example.com/jwt/auth",'
+                                'service="container_registry",'
+                                'scope="repository:franklin/course/ex:pull"'})
+        answer = Mock(status_code=200, ok=True,
+                      headers={'Docker-Content-Digest': 'sha256:abc'})
+        mock_head.side_effect = [challenge, answer]
+        mock_get.return_value = Mock(ok=True)
+        mock_get.return_value.json.return_value = {'token': 't0k'}
+
+        self.assertEqual(docker.registry_image_digest(self.image_url),
+                         'sha256:abc')
+        self.assertEqual(mock_get.call_args.kwargs['params']['scope'],
+                         'repository:franklin/course/ex:pull')
+        self.assertEqual(mock_head.call_args.kwargs['headers']['Authorization'],
+                         'Bearer t0k')
+
+
+class TestInventory(unittest.TestCase):
+    """Test container and image listings."""
+
+    def setUp(self):
+        # use the CLI route
+        patcher = patch.object(EngineClient, 'socket_path', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        docker.invalidate_inventory()
+        self.addCleanup(docker.invalidate_inventory)
+
+    @patch.object(docker.utils, 'run_cmd',
+                  return_value='{"ID": "abc", "Image": "img"}\n')
+    def test_no_sizes_by_default(self, mock_run_cmd):
+        self.assertEqual(docker.containers(), [{'ID': 'abc', 'Image': 'img'}])
+        self.assertNotIn('--size', mock_run_cmd.call_args.args[0])
+        docker.containers(sizes=True, filters=[docker.franklin_filter()])
+        cmd = mock_run_cmd.call_args.args[0]
+        self.assertIn('--size', cmd)
+        self.assertIn('--filter label=dk.au.gitlab.group=', cmd)
+
+    @patch.object(docker.utils, 'run_cmd', return_value='')
+    def test_cached_until_invalidated(self, mock_run_cmd):
+        docker.containers()
+        docker.containers()
+        self.assertEqual(mock_run_cmd.call_count, 1)
+        docker.rm_container('abc')
+        docker.containers()
+        self.assertEqual(mock_run_cmd.call_count, 3)
+
+
+class TestCleanup(unittest.TestCase):
+    """Test concurrent removal of containers and images."""
+
+    def test_apply_concurrently(self):
+        def slow(item, force=False):
+            time.sleep(0.3)
+        start = time.monotonic()
+        docker.apply_concurrently(slow, [str(i) for i in range(6)], force=True)
+        self.assertLess(time.monotonic() - start, 1)
+
+    def test_apply_concurrently_raises(self):
+        def fail(item, force=False):
+            if item == 'b':
+                raise ValueError(item)
+        with self.assertRaises(ValueError):
+            docker.apply_concurrently(fail, ['a', 'b', 'c'])
+
+    @patch.object(docker.time, 'sleep')
+    @patch.object(docker, 'rm_image')
+    @patch.object(docker, 'rm_container')
+    @patch.object(docker, 'containers',
+                  return_value=[{'ID': 'c1'}, {'ID': 'c2'}])
+    def test_cleanup_exercises(self, mock_containers, mock_rm_container,
+                               mock_rm_image, mock_sleep):
+        docker.cleanup_exercises('img')
+        self.assertIn('ancestor=img', mock_containers.call_args.kwargs['filters'])
+        self.assertEqual(
+            sorted(c.args[0] for c in mock_rm_container.call_args_list),
+            ['c1', 'c2'])
+        mock_rm_image.assert_called_once_with('img')
+        mock_sleep.assert_not_called()
+
+    @patch.object(docker, 'rm_image')
+    @patch.object(docker, 'rm_container')
+    @patch.object(docker, 'kill_container')
+    @patch.object(docker, 'containers', return_value=[{'ID': 'c1'}])
+    def test_cleanup_without_force_stops(self, mock_containers, mock_kill,
+                                         mock_rm_container, mock_rm_image):
+        docker.cleanup_exercises('img', force=False)
+        mock_kill.assert_called_once_with('c1', force=False)
+        mock_rm_container.assert_called_once_with('c1', force=False)
+
+        mock_kill.reset_mock()
+        docker.cleanup_exercises('img', force=True)
+        mock_kill.assert_not_called()
+        mock_rm_container.assert_called_with('c1', force=True)
+
+    @patch.object(docker.utils, 'run_cmd')
+    @patch.object(docker, 'Popen')
+    @patch.object(EngineClient, 'socket_path', None)
+    def test_kill_or_stop(self, mock_popen, mock_run_cmd):
+        docker.kill_container('c1', force=False)
+        mock_run_cmd.assert_called_once_with('docker stop c1', check=False)
+        mock_popen.assert_not_called()
+        docker.kill_container('c1')
+        mock_popen.assert_called_once()
+
+
+class TestWarmContainers(unittest.TestCase):
+    """Test preparing and claiming warm containers."""
+
+    image_url = 'registry.example.com/franklin/course/ex'
+
+    @patch.object(docker, 'rm_container')
+    @patch.object(docker, '_container_action')
+    @patch.object(docker, 'jupyter_responds', return_value=True)
+    @patch.object(docker, 'run_container', return_value=('cid', Mock(), '8890'))
+    @patch.object(docker, 'warm_containers', return_value=[])
+    def test_warm_container(self, mock_warm, mock_run_container,
+                            mock_responds, mock_action, mock_rm):
+        self.assertEqual(docker.warm_container(self.image_url, Path('.')), 'cid')
+        kwargs = mock_run_container.call_args.kwargs
+        self.assertTrue(kwargs['detach'])
+        self.assertIn(docker.WARM_LABEL, kwargs['labels'])
+        mock_action.assert_called_once_with('cid', 'pause')
+
+    @patch.object(docker, 'rm_container')
+    @patch.object(docker, '_container_action',
+                  side_effect=EngineError(409, 'container is not running'))
+    @patch.object(docker, 'jupyter_responds', return_value=True)
+    @patch.object(docker, 'run_container', return_value=('cid', Mock(), '8890'))
+    @patch.object(docker, 'warm_containers', return_value=[])
+    def test_pause_failure_removes_container(self, mock_warm, mock_run_container,
+                                             mock_responds, mock_action, mock_rm):
+        self.assertIsNone(docker.warm_container(self.image_url, Path('.')))
+        mock_rm.assert_called_once_with('cid', force=True)
+
+    @patch.object(docker, 'Popen')
+    @patch.object(docker, '_container_action')
+    @patch.object(docker, 'containers', return_value=[
+        {'ID': 'cid', 'State': 'paused',
+         'Labels': 'dk.au.franklin.port=8890,dk.au.franklin.warm=abc'}])
+    def test_claim_paused_container(self, mock_containers, mock_action,
+                                    mock_popen):
+        container_id, _, port = docker.claim_warm_container(self.image_url)
+        self.assertEqual((container_id, port), ('cid', '8890'))
+        mock_action.assert_called_once_with('cid', 'unpause')
+        filters = mock_containers.call_args.kwargs['filters']
+        self.assertIn(f'ancestor={self.image_url}:latest', filters)
+
+    @patch.object(docker, 'rm_container')
+    @patch.object(docker, '_container_action', side_effect=Exception('gone'))
+    @patch.object(docker, 'containers', return_value=[
+        {'ID': 'cid', 'State': 'exited', 'Labels': ''}])
+    def test_unusable_container_removed(self, mock_containers, mock_action,
+                                        mock_rm):
+        self.assertIsNone(docker.claim_warm_container(self.image_url))
+        mock_rm.assert_called_once_with('cid', force=True)
+
+    @patch.object(docker, 'warm_container')
+    @patch.object(docker, 'pull')
+    @patch.object(docker, 'get_registry_listing',
+                  return_value={('course', 'ex'): image_url})
+    def test_warm_command_validates_exercise(self, mock_listing, mock_pull,
+                                             mock_warm):
+        warm = inspect.unwrap(docker._warm.callback)
+        with self.assertRaises(click.Abort):
+            warm('course/unknown', '.')
+        mock_pull.assert_not_called()
+        warm('course/ex', '.')
+        mock_pull.assert_called_once_with(self.image_url)
+        mock_warm.assert_called_once_with(self.image_url, Path('.'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+"""
+Tests for the Docker Engine API client against a fake daemon socket.
+"""
+
+import sys
+import os
+import json
+import time
+import tempfile
+import threading
+import unittest
+import socketserver
+from http.server import BaseHTTPRequestHandler
+from unittest.mock import patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import engine as engine_module
+from franklin_cli.engine import EngineClient, EngineError, human_size, human_duration
+
+
+class FakeDaemon(BaseHTTPRequestHandler):
+    """Answers a few Engine API endpoints and records requests."""
+
+    requests = []
+
+    def address_string(self):
+        return 'fake'
+
+    def log_message(self, *args):
+        pass
+
+    def reply(self, status, data=None, content_type='application/json'):
+        body = b'' if data is None else (
+            data.encode() if isinstance(data, str) else json.dumps(data).encode())
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self.requests.append(('GET', self.path))
+        if self.path == '/_ping':
+            self.reply(200, 'OK', content_type='text/plain')
+        elif self.path.startswith('/containers/json'):
+            self.reply(200, [{
+                'Id': 'abcdef0123456789', 'Image': 'registry/franklin/c/e:latest',
+                'Names': ['/happy_cat'], 'Labels': {'dk.au.gitlab.group': 'franklin'},
+                'State': 'running', 'Status': 'Up 3 minutes',
+                'Created': time.time() - 200, 'SizeRw': 1500, 'SizeRootFs': 2.5e9}])
+        elif self.path.startswith('/images/json'):
+            self.reply(200, [{
+                'Id': 'sha256:0123456789abcdef', 'Created': time.time() - 3.5 * 86400,
+                'RepoTags': ['registry/franklin/c/e:latest'], 'Size': 1234567890}])
+        elif self.path.startswith('/images/missing'):
+            self.reply(404, {'message': 'No such image: missing'})
+        else:
+            self.reply(404, {'message': 'page not found'})
+
+    def do_POST(self):
+        self.requests.append(('POST', self.path))
+        if self.path.startswith('/containers/slow/stop'):
+            # container ignoring SIGTERM until killed after the grace period
+            time.sleep(0.5)
+            self.reply(204)
+        elif self.path.startswith('/build/prune') and 'label' in self.path:
+            self.reply(400, {'message': 'invalid filter \'label\''})
+        elif self.path.startswith('/networks/prune') and 'fail' in self.path:
+            self.reply(500, {'message': 'a prune operation is already running'})
+        else:
+            self.reply(204)
+
+    def do_DELETE(self):
+        self.requests.append(('DELETE', self.path))
+        self.reply(200, [])
+
+
+class UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class TestEngineClient(unittest.TestCase):
+    """Test Engine API requests and conversion to CLI output."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.socket_path = os.path.join(cls.tmp_dir.name, 'docker.sock')
+        cls.server = UnixServer(cls.socket_path, FakeDaemon)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.tmp_dir.cleanup()
+
+    def setUp(self):
+        FakeDaemon.requests = []
+        self.client = EngineClient(self.socket_path)
+
+    def test_ping(self):
+        self.assertTrue(self.client.ping())
+        self.assertFalse(EngineClient(self.socket_path + '.none').ping())
+
+    def test_containers(self):
+        containers = self.client.containers(
+            size=True, filters=['label=dk.au.gitlab.group=franklin'])
+        self.assertEqual(containers[0]['ID'], 'abcdef012345')
+        self.assertEqual(containers[0]['Names'], 'happy_cat')
+        self.assertEqual(containers[0]['RunningFor'], '3 minutes ago')
+        self.assertEqual(containers[0]['Size'], '1.5kB (virtual 2.5GB)')
+        method, path = FakeDaemon.requests[-1]
+        self.assertIn('size=1', path)
+        self.assertIn('dk.au.gitlab.group%3Dfranklin', path)
+
+    def test_images(self):
+        images = self.client.images()
+        self.assertEqual(images, [{
+            'ID': '0123456789ab', 'Repository': 'registry/franklin/c/e',
+            'Tag': 'latest', 'CreatedSince': '3 days ago', 'Size': '1.23GB'}])
+
+    def test_missing_image(self):
+        self.assertIsNone(self.client.inspect_image('missing'))
+        with self.assertRaises(EngineError):
+            self.client.request('GET', '/nothing')
+
+    def test_kill_and_remove(self):
+        self.client.kill('abc')
+        self.client.remove_container('abc', force=True)
+        self.assertEqual(FakeDaemon.requests, [
+            ('POST', '/containers/abc/kill'),
+            ('DELETE', '/containers/abc?force=1')])
+
+    def test_stop_waits_for_grace_period(self):
+        client = EngineClient(self.socket_path, timeout=0.2)
+        client.stop('slow', grace=1)
+        self.assertEqual(FakeDaemon.requests,
+                         [('POST', '/containers/slow/stop?t=1')])
+
+    def test_build_cache_label_filter_rejected(self):
+        with self.assertRaises(EngineError) as cm:
+            self.client.prune('build', filters=['label=a=b'])
+        self.assertEqual(cm.exception.status, 400)
+
+    def test_system_prune(self):
+        from franklin_cli import docker
+        with patch.object(docker, 'engine', self.client), \
+                patch.object(engine_module, 'engine', self.client), \
+                patch.object(docker.utils, 'run_cmd') as mock_run_cmd:
+            docker.system_prune()
+            mock_run_cmd.assert_not_called()
+        paths = [path for method, path in FakeDaemon.requests]
+        self.assertEqual([p.split('?')[0] for p in paths],
+                         ['/containers/prune', '/networks/prune',
+                          '/images/prune', '/build/prune'])
+        self.assertNotIn('label', paths[-1])
+
+    def test_system_prune_falls_back_per_kind(self):
+        from franklin_cli import docker
+        with patch.object(docker, 'engine', self.client), \
+                patch.object(engine_module, 'engine', self.client), \
+                patch.object(docker, 'franklin_filter', return_value='label=fail'), \
+                patch.object(docker.utils, 'run_cmd') as mock_run_cmd:
+            docker.system_prune()
+        mock_run_cmd.assert_called_once_with(
+            'docker network prune --force --filter label=fail', check=False)
+
+    def test_fallback_when_unreachable(self):
+        def api():
+            return engine_module.engine.request('GET', '/_ping')
+        with patch.object(engine_module, 'engine',
+                          EngineClient(self.socket_path + '.none')):
+            self.assertEqual(engine_module.with_fallback(api, lambda: 'cli'),
+                             'cli')
+        with patch.object(engine_module, 'engine', self.client):
+            self.assertEqual(engine_module.with_fallback(api, lambda: 'cli'),
+                             'OK')
+
+
+class TestFormatting(unittest.TestCase):
+    """Test CLI style formatting of sizes and durations."""
+
+    def test_human_size(self):
+        self.assertEqual(human_size(0), '0B')
+        self.assertEqual(human_size(999), '999B')
+        self.assertEqual(human_size(6600), '6.6kB')
+        self.assertEqual(human_size(2.5e9), '2.5GB')
+
+    def test_human_duration(self):
+        self.assertEqual(human_duration(30), '30 seconds')
+        self.assertEqual(human_duration(90), 'About a minute')
+        self.assertEqual(human_duration(3600), 'About an hour')
+        self.assertEqual(human_duration(5 * 3600), '5 hours')
+        self.assertEqual(human_duration(20 * 86400), '2 weeks')
+
+
+if __name__ == '__main__':
+    unittest.main()
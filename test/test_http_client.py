@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+"""
+Tests for the shared HTTP client.
+"""
+
+import sys
+import os
+import unittest
+from unittest.mock import patch
+
+import requests
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import http_client
+from franklin_cli import config as cfg
+
+
+class TestFranklinSession(unittest.TestCase):
+    """Test defaults applied by the shared session."""
+
+    def setUp(self):
+        self.session = http_client.FranklinSession()
+
+    @patch.object(requests.Session, 'request')
+    def test_gitlab_token_injected(self, mock_request):
+        self.session.get(f'https://{cfg.gitlab_domain}/api/v4/groups')
+        headers = mock_request.call_args.kwargs['headers']
+        self.assertEqual(headers['PRIVATE-TOKEN'], cfg.gitlab_token)
+        self.assertEqual(mock_request.call_args.kwargs['timeout'],
+                         cfg.http_timeout)
+
+    @patch.object(requests.Session, 'request')
+    def test_explicit_token_kept(self, mock_request):
+        self.session.get(f'https://{cfg.gitlab_domain}/api/v4/groups',
+                         headers={'private-token': 'other'}, timeout=3)
+        headers = mock_request.call_args.kwargs['headers']
+        self.assertEqual(headers['PRIVATE-TOKEN'], 'other')
+        self.assertEqual(mock_request.call_args.kwargs['timeout'], 3)
+
+    @patch.object(requests.Session, 'request')
+    def test_no_token_for_other_hosts(self, mock_request):
+        self.session.get('https://hub.docker.com/')
+        self.assertNotIn('headers', mock_request.call_args.kwargs)
+
+    def test_adapter_retries(self):
+        adapter = self.session.get_adapter(f'https://{cfg.gitlab_domain}')
+        self.assertEqual(adapter.max_retries.total, cfg.http_retries)
+        self.assertIn(429, adapter.max_retries.status_forcelist)
+
+    def test_probe_session_does_not_retry(self):
+        adapter = http_client.probe_session.get_adapter('https://hub.docker.com/')
+        self.assertEqual(adapter.max_retries.total, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""
+Tests for Jupyter startup detection without a Docker daemon.
+"""
+
+import io
+import sys
+import os
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import jupyter
+
+
+def fake_log_process(text):
+    process = Mock()
+    process.stdout = io.StringIO(text)
+    return process
+
+
+class BlockingStream:
+    """File-like stream that never produces a line until closed."""
+    closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        while not self.closed:
+            time.sleep(0.05)
+        raise StopIteration
+
+    def close(self):
+        self.closed = True
+
+
+@patch('franklin_cli.jupyter.utils.fmt_cmd', lambda cmd: cmd.split())
+class TestWaitForTokenUrl(unittest.TestCase):
+    """Test detection of the Jupyter token URL."""
+
+    @patch('franklin_cli.docker.requests.get',
+           side_effect=requests.ConnectionError())
+    @patch('franklin_cli.jupyter.Popen')
+    def test_url_from_log(self, mock_popen, mock_get):
+        mock_popen.return_value = fake_log_process(
+            'starting\n'
+            '    http://127.0.0.1:8888/lab?token=abc\n')
+        url = jupyter.wait_for_token_url('cid', '8890', timeout=5)
+        self.assertEqual(url, 'http://127.0.0.1:8890/lab?token=abc')
+
+    @patch('franklin_cli.docker.requests.get',
+           side_effect=requests.ConnectionError())
+    @patch('franklin_cli.jupyter.Popen')
+    def test_container_dies(self, mock_popen, mock_get):
+        mock_popen.return_value = fake_log_process('error: boom\n')
+        with self.assertRaises(RuntimeError):
+            jupyter.wait_for_token_url('cid', '8890', timeout=5)
+
+    @patch('franklin_cli.jupyter.utils.run_cmd',
+           return_value='http://127.0.0.1:8888/lab?token=xyz\n')
+    @patch('franklin_cli.docker.requests.get')
+    @patch('franklin_cli.jupyter.Popen')
+    def test_url_after_http_ready(self, mock_popen, mock_get, mock_run_cmd):
+        process = Mock()
+        process.stdout = BlockingStream()
+        mock_popen.return_value = process
+        url = jupyter.wait_for_token_url('cid', '8890', timeout=5)
+        self.assertEqual(url, 'http://127.0.0.1:8890/lab?token=xyz')
+
+    @patch('franklin_cli.docker.requests.get',
+           side_effect=requests.ConnectionError())
+    @patch('franklin_cli.jupyter.Popen')
+    def test_timeout(self, mock_popen, mock_get):
+        process = Mock()
+        process.stdout = BlockingStream()
+        mock_popen.return_value = process
+        with self.assertRaises(TimeoutError):
+            jupyter.wait_for_token_url('cid', '8890', timeout=0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
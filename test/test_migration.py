@@ -0,0 +1,282 @@
+#!/usr/bin/env python
+"""
+Tests for migration of repositories between backends.
+"""
+
+import sys
+import os
+import time
+import threading
+import tempfile
+import subprocess
+import shutil
+from pathlib import Path
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli.backends import migration
+from franklin_cli.backends.base import Repository, Visibility
+from franklin_cli.backends.migration import (
+    RateLimiter, RepositoryMigrator, MigrationJournal, MirrorCache)
+
+
+def make_repo(full_name):
+    name = full_name.split('/')[-1]
+    return Repository(id=full_name, name=name, full_name=full_name,
+                      description='', visibility=Visibility.PRIVATE,
+                      default_branch='main',
+                      clone_url=f'https://example.com/{full_name}.git',
+                      ssh_url='', web_url='', owner=full_name.split('/')[0],
+                      created_at=datetime.now(), updated_at=datetime.now())
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test throttling of API calls."""
+
+    def test_min_interval(self):
+        limiter = RateLimiter(max_concurrent=4, min_interval=0.1)
+        start = time.monotonic()
+        for _ in range(4):
+            with limiter:
+                pass
+        self.assertGreaterEqual(time.monotonic() - start, 0.3)
+
+    def test_max_concurrent(self):
+        limiter = RateLimiter(max_concurrent=2)
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def call():
+            with limiter:
+                with lock:
+                    active.append(1)
+                    peak.append(len(active))
+                time.sleep(0.05)
+                with lock:
+                    active.pop()
+        threads = [threading.Thread(target=call) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(max(peak), 2)
+
+
+class TestRepositoryMigrator(unittest.TestCase):
+    """Test concurrent migration with fake backends."""
+
+    def setUp(self):
+        self.source = Mock()
+        self.source.get_repository.side_effect = make_repo
+        self.target = Mock()
+        self.target.create_repository.side_effect = \
+            lambda name, **kwargs: make_repo(f'target/{name}')
+        patcher = patch.dict(migration.API_RATE_LIMITS,
+                             {'Mock': (8, 0.0)})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.journal = MigrationJournal(
+            Path(self.tmp_dir.name) / 'journal.jsonl')
+
+    def test_concurrent_migration(self):
+        def transfer(source_repo, target_repo, repo_id=None):
+            time.sleep(0.2)
+            return source_repo.name != 'ex3'
+
+        migrator = RepositoryMigrator(self.source, self.target, jobs=4,
+                                      journal=self.journal)
+        repo_ids = [f'course/ex{i}' for i in range(8)]
+        with patch.object(migrator, '_transfer_content', side_effect=transfer):
+            start = time.monotonic()
+            count = migrator.migrate_multiple(repo_ids)
+            self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(count, 7)
+
+        statuses = {e['source']: e['status'] for e in migrator.migration_log}
+        self.assertEqual(sorted(statuses), repo_ids)
+        self.assertEqual(statuses['course/ex3'], 'failed')
+        self.assertEqual(list(statuses.values()).count('migrated'), 7)
+
+    def test_failures_logged(self):
+        self.source.get_repository.side_effect = Exception('not found')
+        migrator = RepositoryMigrator(self.source, self.target, jobs=2,
+                                      journal=self.journal)
+        self.assertEqual(migrator.migrate_multiple(['a/b', 'a/c']), 0)
+        self.assertEqual([e['status'] for e in migrator.migration_log],
+                         ['failed', 'failed'])
+        self.assertIn('not found', migrator.migration_log[0]['error'])
+        self.target.create_repository.assert_not_called()
+
+    def test_log_keyed_by_repo_id(self):
+        # numeric IDs resolve to a different full name
+        self.source.get_repository.side_effect = \
+            lambda repo_id: make_repo(f'course/ex{repo_id}')
+        migrator = RepositoryMigrator(self.source, self.target, jobs=2,
+                                      journal=self.journal)
+        with patch.object(migrator, '_transfer_content',
+                          side_effect=[True, False]):
+            migrator.migrate_multiple(['1', '2'])
+        self.assertEqual(sorted(e['source'] for e in migrator.migration_log),
+                         ['1', '2'])
+
+
+class LocalRepoTestCase(unittest.TestCase):
+    """Use local git repositories as source and target."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+        self.journal = MigrationJournal(self.root / 'journal.jsonl')
+
+        work = self.root / 'work'
+        self.git('init', '-q', '-b', 'main', str(work))
+        (work / 'README.md').write_text('exercise')
+        self.git('add', '.', cwd=work)
+        self.git('commit', '-q', '-m', 'init', cwd=work)
+        self.git('tag', 'v1', cwd=work)
+        self.git('clone', '-q', '--bare', str(work), str(self.root / 'ex.git'))
+
+        self.source = Mock(token=None)
+        self.source.get_repository.return_value = self.local_repo('course/ex')
+        self.target = Mock(token=None)
+        self.target.create_repository.return_value = \
+            self.local_repo('target/ex')
+        self.target.get_repository.return_value = self.local_repo('target/ex')
+
+    def git(self, *args, cwd=None):
+        subprocess.run(['git', '-c', 'user.name=test',
+                        '-c', 'user.email=test@example.com', *args],
+                       cwd=cwd, check=True, capture_output=True)
+
+    def local_repo(self, full_name):
+        repo = make_repo(full_name)
+        repo.clone_url = str(self.root / full_name.replace('/', '_')) \
+            if full_name.startswith('target') else str(self.root / 'ex.git')
+        return repo
+
+
+class TestResume(LocalRepoTestCase):
+    """Test resuming migrations between local git repositories."""
+
+    def migrator(self, resume=False):
+        return RepositoryMigrator(self.source, self.target, resume=resume,
+                                  journal=self.journal)
+
+    def test_resume_after_failed_push(self):
+        # target repository was created, but the push fails
+        self.assertIsNone(self.migrator().migrate_repository('course/ex'))
+        state = self.journal.load()[('course/ex', 'Mock')]
+        self.assertEqual(state['stages'], {'started', 'created', 'cloned'})
+        self.assertIn('refs/tags/v1', state['refs'])
+
+        self.git('init', '-q', '--bare', str(self.root / 'target_ex'))
+        self.migrator(resume=True).migrate_repository('course/ex')
+        self.target.create_repository.assert_called_once()
+        state = self.journal.load()[('course/ex', 'Mock')]
+        self.assertIn('pushed', state['stages'])
+
+        # completed migrations are verified, not transferred again
+        migrator = self.migrator(resume=True)
+        with patch.object(migrator, '_transfer_content') as mock_transfer:
+            self.assertIsNotNone(migrator.migrate_repository('course/ex'))
+            mock_transfer.assert_not_called()
+        self.assertEqual(migrator.migration_log[0]['status'], 'verified')
+
+        # without resume, migration starts over
+        self.migrator().migrate_repository('course/ex')
+        self.assertEqual(self.target.create_repository.call_count, 2)
+
+    def test_mirror_cache(self):
+        self.git('init', '-q', '--bare', str(self.root / 'target_ex'))
+        cache = MirrorCache(self.root / 'mirrors')
+        migrator = RepositoryMigrator(self.source, self.target,
+                                      journal=self.journal, mirror_cache=cache)
+        self.assertIsNotNone(migrator.migrate_repository('course/ex'))
+        self.assertTrue(cache.path(str(self.root / 'ex.git')).exists())
+        self.assertEqual(migrator._remote_refs(self.local_repo('target/ex'),
+                                               self.target),
+                         self.journal.load()[('course/ex', 'Mock')]['refs'])
+
+    def test_truncated_journal_line(self):
+        self.journal.record('course/ex', 'Mock', 'started', namespace=None)
+        with open(self.journal.path, 'a') as f:
+            f.write('{"source": "course/ex", "backe')
+        self.assertEqual(self.journal.load()[('course/ex', 'Mock')]['stages'],
+                         {'started'})
+
+
+class TestMirrorCache(LocalRepoTestCase):
+    """Test incremental updates and eviction of cached mirrors."""
+
+    def setUp(self):
+        super().setUp()
+        self.url = str(self.root / 'ex.git')
+        self.cache = MirrorCache(self.root / 'mirrors')
+
+    def refs(self, path):
+        return subprocess.run(['git', 'show-ref'], cwd=path, check=True,
+                              capture_output=True, text=True).stdout
+
+    def test_incremental_update(self):
+        with self.cache.checkout(self.url, f'file://{self.url}') as path:
+            first = self.refs(path)
+        # credentials are not stored in the mirror
+        origin = subprocess.run(['git', 'config', 'remote.origin.url'],
+                                cwd=path, capture_output=True, text=True)
+        self.assertEqual(origin.stdout.strip(), self.url)
+
+        self.git('--git-dir', self.url, 'tag', 'v2', 'v1')
+        with patch.object(migration.subprocess, 'run',
+                          wraps=subprocess.run) as mock_run:
+            with self.cache.checkout(self.url) as path:
+                pass
+        self.assertEqual([c.args[0][1] for c in mock_run.call_args_list],
+                         ['fetch'])
+        self.assertIn('refs/tags/v1', first)
+        self.assertIn('refs/tags/v2', self.refs(path))
+
+    def test_eviction(self):
+        self.cache.max_size = 0
+        with self.cache.checkout(self.url) as path:
+            # mirrors in use are kept
+            self.assertEqual(self.cache.evict(), [])
+            self.assertTrue(path.exists())
+        self.assertFalse(path.exists())
+        self.assertEqual(self.cache._key_locks, {})
+        self.assertEqual(list(self.cache.root.iterdir()), [])
+
+    def test_damaged_mirror_removed_outside_lock(self):
+        with self.cache.checkout(self.url) as path:
+            pass
+        shutil.rmtree(path / 'objects')
+        key_lock = self.cache._key_locks[path]
+        rmtree = shutil.rmtree
+        def unlocked_rmtree(path, **kwargs):
+            if str(path).endswith('.trash'):
+                self.assertFalse(key_lock.locked() or self.cache._lock.locked())
+            rmtree(path, **kwargs)
+        with patch.object(migration.shutil, 'rmtree',
+                          side_effect=unlocked_rmtree) as mock_rmtree:
+            with self.cache.checkout(self.url) as path:
+                self.assertIn('refs/tags/v1', self.refs(path))
+        self.assertTrue(any(str(c.args[0]).endswith('.trash')
+                            for c in mock_rmtree.call_args_list))
+
+    def test_mirror_cache_opt_in(self):
+        option = next(p for p in migration.repos.params
+                      if p.name == 'mirror_cache')
+        self.assertFalse(option.default)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""
+Tests for detection of notebook dependencies.
+"""
+
+import sys
+import os
+import json
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import pixi_deps
+from franklin_cli.pixi_deps import DependencyCache, scan_cell, notebook_cells
+
+
+def write_notebook(path, cells, language='python'):
+    nb = {'nbformat': 4, 'nbformat_minor': 5,
+          'metadata': {'kernelspec': {'language': language}},
+          'cells': [{'cell_type': cell_type, 'metadata': {}, 'source': source}
+                    for cell_type, source in cells]}
+    path.write_text(json.dumps(nb))
+
+
+class TestScanCell(unittest.TestCase):
+    """Test parsing of cell sources."""
+
+    def test_python_imports(self):
+        source = ('%matplotlib inline\n'
+                  'import numpy as np, os\n'
+                  'from scipy.stats import (\n'
+                  '    norm,\n'
+                  '    t)\n'
+                  '!pip list\n'
+                  'from . import local\n'
+                  'if True:\n'
+                  '    import importlib\n'
+                  '    sk = importlib.import_module("sklearn.linear_model")\n')
+        modules, packages = scan_cell(source)
+        self.assertEqual(modules, ['importlib', 'numpy', 'os', 'scipy.stats',
+                                   'sklearn.linear_model'])
+        self.assertEqual(packages, [])
+
+    def test_incomplete_code(self):
+        modules, _ = scan_cell('import pandas\n\ndef f(x):\n    # your code\n')
+        self.assertEqual(modules, ['pandas'])
+
+    def test_r_code(self):
+        self.assertEqual(scan_cell('library(ggplot2)\nrequire("dplyr")\n'
+                                   '# library(MASS)', 'r'),
+                         ([], ['dplyr', 'ggplot2']))
+        self.assertEqual(scan_cell('%%R\nlibrary(tidyr)'), ([], ['tidyr']))
+        self.assertEqual(scan_cell('%%bash\nimport numpy'), ([], []))
+
+
+class TestNotebookCells(unittest.TestCase):
+    """Test streaming extraction of cell sources."""
+
+    def test_outputs_skipped(self):
+        nb = {'metadata': {'kernelspec': {'language': 'R'}},
+              'nbformat': 4,
+              'cells': [
+                  {'cell_type': 'code', 'execution_count': 1,
+                   'outputs': [{'data': {'text/html': '<b>"}]{[\\</b>',
+                                         'image/png': 'A' * 100000},
+                                'output_type': 'display_data'}],
+                   'source': ['library(ggplot2)\n', 'x <- "\\"']},
+                  {'cell_type': 'markdown', 'source': 'library(MASS)'},
+                  {'source': 'library(dplyr)', 'cell_type': 'code',
+                   'outputs': []}]}
+        for indent in [None, 1]:
+            buf = json.dumps(nb, indent=indent).encode()
+            self.assertEqual(notebook_cells(buf), (
+                'r', ['library(ggplot2)\nx <- "\\"', 'library(dplyr)']))
+
+    def test_nbformat3(self):
+        nb = {'metadata': {}, 'nbformat': 3, 'worksheets': [{'cells': [
+            {'cell_type': 'code', 'input': ['import numpy'], 'outputs': []}]}]}
+        self.assertEqual(notebook_cells(json.dumps(nb).encode()),
+                         ('python', ['import numpy']))
+
+
+class TestNotebookDependencies(unittest.TestCase):
+    """Test scanning notebooks with a cache."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.root = Path(self.tmp_dir.name)
+        self.cache_file = self.root / 'cache.json'
+
+    def test_markdown_cells_ignored(self):
+        write_notebook(self.root / 'nb.ipynb', [
+            ('markdown', 'Use library("ggplot2") and import seaborn'),
+            ('code', 'import sklearn\nimport mpl_toolkits.mplot3d')])
+        self.assertEqual(
+            pixi_deps.get_notebook_dependencies(self.root / 'nb.ipynb'),
+            ['matplotlib', 'scikit-learn'])
+
+    def test_only_changed_cells_rescanned(self):
+        cells = [('code', f'import mod{i}') for i in range(5)]
+        write_notebook(self.root / 'a.ipynb', cells)
+        write_notebook(self.root / 'b.ipynb', [('code', 'import pandas')])
+        pixi_deps.scan_notebooks(self.root, DependencyCache(self.cache_file))
+
+        with patch.object(pixi_deps, 'scan_cell',
+                          wraps=pixi_deps.scan_cell) as mock_scan:
+            result = pixi_deps.scan_notebooks(
+                self.root, DependencyCache(self.cache_file))
+            mock_scan.assert_not_called()
+            self.assertEqual(result[self.root / 'b.ipynb'], ['pandas'])
+
+            cells[2] = ('code', 'import polars')
+            write_notebook(self.root / 'a.ipynb', cells)
+            result = pixi_deps.scan_notebooks(
+                self.root, DependencyCache(self.cache_file))
+            mock_scan.assert_called_once_with('import polars', 'python')
+        self.assertIn('polars', result[self.root / 'a.ipynb'])
+        self.assertNotIn('mod2', result[self.root / 'a.ipynb'])
+
+    def test_parallel_scan(self):
+        for i in range(6):
+            write_notebook(self.root / f'nb{i}.ipynb',
+                           [('code', f'import mod{i}'), ('code', 'import numpy')])
+        cache = DependencyCache(self.cache_file)
+        result = pixi_deps.scan_notebooks(self.root, cache, jobs=2)
+        self.assertEqual(result[self.root / 'nb3.ipynb'], ['mod3', 'numpy'])
+        self.assertEqual(result, pixi_deps.scan_notebooks(self.root))
+
+        # results from workers are cached
+        with patch.object(pixi_deps, '_scan_notebook') as mock_scan:
+            pixi_deps.scan_notebooks(self.root, DependencyCache(self.cache_file),
+                                     jobs=2)
+            mock_scan.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Tests for in-process editing of pixi.toml.
+"""
+
+import sys
+import os
+import shutil
+import tempfile
+import unittest
+import importlib.util
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import pixi_manifest, pixi_deps
+from franklin_cli.pixi_manifest import PixiManifest, parse_package
+
+TEMPLATE = Path(src_dir) / 'franklin_cli' / 'data' / 'templates' / 'exercise' / 'pixi.toml'
+
+
+class TestPixiManifest(unittest.TestCase):
+    """Test editing channels and dependencies."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.path = Path(self.tmp_dir.name) / 'pixi.toml'
+        shutil.copy(TEMPLATE, self.path)
+
+    def test_parse_package(self):
+        self.assertEqual(parse_package('numpy'), ('numpy', '*'))
+        self.assertEqual(parse_package('numpy >=1.26'), ('numpy', '>=1.26'))
+        self.assertEqual(parse_package('r-data.table'), ('r-data.table', '*'))
+
+    def test_add_dependencies(self):
+        manifest = PixiManifest(self.path)
+        added = manifest.add_dependencies(
+            ['jupyter', 'numpy>=1.26', 'r-data.table', 'numpy'],
+            feature='prod', platform='linux-64')
+        self.assertEqual(added, ['numpy', 'r-data.table'])
+        deps = manifest.dependencies(feature='prod', platform='linux-64')
+        self.assertEqual(deps['numpy'], '>=1.26')
+        self.assertEqual(deps['r-data.table'], '*')
+        # other tables and comments are untouched
+        self.assertIn('# for the production image', manifest.text)
+        self.assertEqual(manifest.data['tasks'],
+                         PixiManifest(TEMPLATE).data['tasks'])
+
+    def test_new_table(self):
+        manifest = PixiManifest(self.path)
+        manifest.add_dependencies(['requests'], feature='extra', pypi=True)
+        self.assertEqual(manifest.data['feature']['extra']['pypi-dependencies'],
+                         {'requests': '*'})
+
+    def test_add_channel(self):
+        manifest = PixiManifest(self.path)
+        self.assertTrue(manifest.add_channel('r'))
+        self.assertFalse(manifest.add_channel('r'))
+        self.assertEqual(manifest.channels(),
+                         ['conda-forge', 'munch-group', 'r'])
+
+    @patch.object(pixi_manifest.subprocess, 'run')
+    def test_single_install(self, mock_run):
+        manifest = PixiManifest(self.path)
+        added = pixi_deps.add_to_manifest(
+            manifest, [f'pkg{i}' for i in range(30)] + ['r-ggplot2'])
+        self.assertEqual(len(added), 31)
+        self.assertTrue(manifest.install(environment='prod'))
+        mock_run.assert_called_once()
+        self.assertIn('install', mock_run.call_args.args[0])
+
+        # nothing new, no solve
+        manifest = PixiManifest(self.path)
+        self.assertEqual(pixi_deps.add_to_manifest(manifest, ['pkg3']), [])
+        self.assertFalse(manifest.install())
+        mock_run.assert_called_once()
+        self.assertIn('r', manifest.channels())
+
+
+class TestDeclaredPackages(unittest.TestCase):
+    """Test which declared packages %franklin treats as installed."""
+
+    def test_only_notebook_environment(self):
+        spec = importlib.util.spec_from_file_location(
+            'exercise_magic', TEMPLATE.parent / 'magic.py')
+        magic = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(magic)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            manifest = Path(tmp_dir) / 'pixi.toml'
+            manifest.write_text(
+                '[dependencies]\npython = "*"\n'
+                '[pypi-dependencies]\nrich = "*"\n'
+                '[feature.exercise.target.linux-64.dependencies]\nnumpy = "*"\n'
+                '[feature.build.dependencies]\ncompilers = "*"\n'
+                '[target.osx-arm64.dependencies]\nlibcxx = "*"\n')
+            self.assertEqual(magic.declared_packages(str(manifest)),
+                             {'python', 'rich', 'numpy'})
+
+
+if __name__ == '__main__':
+    unittest.main()
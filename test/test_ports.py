@@ -0,0 +1,103 @@
+#!/usr/bin/env python
+"""
+Tests for allocation of host ports for exercise containers.
+"""
+
+import sys
+import os
+import time
+import socket
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import docker
+from franklin_cli.ports import allocate_ports, reserve_ports
+
+
+class TestAllocatePorts(unittest.TestCase):
+    """Test choice and reservation of port pairs."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.reservations = Path(self.tmp_dir.name)
+        # an unused port to build test pairs around
+        with socket.socket() as s:
+            s.bind(('127.0.0.1', 0))
+            self.base = s.getsockname()[1]
+
+    def test_skips_ports_taken_by_containers(self):
+        ports = allocate_ports([self.base, self.base + 100],
+                               taken=[self.base + 100],
+                               reservation_dir=self.reservations)
+        self.assertEqual(ports, [self.base + 1, self.base + 101])
+
+    def test_skips_bound_ports(self):
+        with socket.socket() as s:
+            s.bind(('0.0.0.0', self.base))
+            s.listen()
+            ports = allocate_ports([self.base],
+                                   reservation_dir=self.reservations)
+        self.assertNotEqual(ports, [self.base])
+
+    def test_reservation_blocks_second_allocation(self):
+        first = allocate_ports([self.base], reservation_dir=self.reservations)
+        second = allocate_ports([self.base], reservation_dir=self.reservations)
+        self.assertNotEqual(first, second)
+
+    def test_failed_reservation_releases_ports(self):
+        self.assertTrue(reserve_ports([self.base + 1], self.reservations))
+        self.assertFalse(reserve_ports([self.base, self.base + 1],
+                                       self.reservations))
+        self.assertTrue(reserve_ports([self.base], self.reservations))
+
+    def test_stale_reservation_reclaimed(self):
+        self.assertTrue(reserve_ports([self.base], self.reservations))
+        old = time.time() - 3600
+        os.utime(self.reservations / f'{self.base}.lock', (old, old))
+        self.assertTrue(reserve_ports([self.base], self.reservations))
+
+    def test_stale_reservation_reclaimed_once(self):
+        self.assertTrue(reserve_ports([self.base], self.reservations))
+        old = time.time() - 3600
+        os.utime(self.reservations / f'{self.base}.lock', (old, old))
+
+        def slow_unlink(path, missing_ok=False):
+            # widen the window between the staleness check and the unlink
+            time.sleep(0.1)
+            unlink(path, missing_ok=missing_ok)
+        unlink = Path.unlink
+        results = []
+        with patch.object(Path, 'unlink', slow_unlink):
+            threads = [threading.Thread(target=lambda: results.append(
+                reserve_ports([self.base], self.reservations)))
+                for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        self.assertEqual(sorted(results), [False, False, False, True])
+
+
+class TestContainerHostPorts(unittest.TestCase):
+    """Test parsing of published container ports."""
+
+    @patch.object(docker, 'containers', return_value=[
+        {'Ports': '0.0.0.0:8888->8888/tcp, :::8888->8888/tcp, '
+                  '0.0.0.0:8050->8050/tcp'},
+        {'Ports': '8888/tcp'},
+        {'Ports': ''}])
+    def test_published_ports(self, mock_containers):
+        self.assertEqual(docker.container_host_ports(), [8050, 8888])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""
+Tests guarding the startup time of the franklin command.
+"""
+
+import sys
+import os
+import subprocess
+import unittest
+from unittest.mock import Mock, patch
+
+import click
+from click.testing import CliRunner
+
+# Add src directory to Python path
+parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+src_dir = os.path.join(parent_dir, 'src')
+sys.path.insert(0, src_dir)
+
+from franklin_cli import franklin
+from franklin_cli.utils import LazyGroup
+
+
+# modules only needed by particular commands
+HEAVY_MODULES = ['requests', 'psutil', 'selenium', 'nbformat',
+                 'franklin_cli.docker', 'franklin_cli.jupyter',
+                 'franklin_cli.gitlab', 'franklin_cli.desktop',
+                 'franklin_cli.update']
+
+# generous bound on the cumulative import time of franklin_cli
+IMPORT_TIME_BUDGET_US = 300_000
+
+
+def run_python(code):
+    env = dict(os.environ, PYTHONPATH=src_dir)
+    return subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                          capture_output=True, text=True, env=env, check=True)
+
+
+def import_times(stderr):
+    """Cumulative import times in microseconds by module."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, module = line.split('|')
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    """Test that the entry point imports only what it needs."""
+
+    def test_import_time(self):
+        times = import_times(run_python('import franklin_cli').stderr)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+        self.assertLess(times['franklin_cli'], IMPORT_TIME_BUDGET_US)
+
+    def test_help_imports_no_commands(self):
+        result = run_python(
+            'import sys\n'
+            'from click.testing import CliRunner\n'
+            'from franklin_cli import franklin\n'
+            'result = CliRunner().invoke(franklin, ["--help"])\n'
+            'print(result.output)')
+        self.assertIn('jupyter', result.stdout)
+        times = import_times(result.stderr)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, times)
+
+
+class TestLazyGroup(unittest.TestCase):
+    """Test lazily registered subcommands."""
+
+    def test_short_help_matches_command(self):
+        ctx = click.Context(franklin)
+        for name, (_, short_help, hidden) in \
+                list(franklin.lazy_commands.items()):
+            cmd = franklin.get_command(ctx, name)
+            self.assertEqual(cmd.get_short_help_str(1000), short_help)
+            self.assertEqual(cmd.hidden, hidden)
+
+    def test_alias_resolves_lazy_command(self):
+        ctx = click.Context(franklin)
+        self.assertEqual(franklin.get_command(ctx, 'dl').name, 'download')
+
+    def test_plugins_listed_without_import(self):
+        entry_point = Mock()
+        entry_point.name = 'exercise'
+        entry_point.load.return_value = click.Command('exercise')
+        entry_point.dist.metadata = {'Summary': 'Tools for educators'}
+        group = LazyGroup(plugin_group='test.plugins')
+        with patch('importlib.metadata.entry_points') as mock_entry_points:
+            mock_entry_points.return_value.select.return_value = [entry_point]
+            ctx = click.Context(group)
+            self.assertEqual(group.list_commands(ctx), ['exercise'])
+            result = CliRunner().invoke(group, ['--help'])
+            self.assertIn('Tools for educators', result.output)
+            entry_point.load.assert_not_called()
+            self.assertEqual(group.get_command(ctx, 'exercise').name, 'exercise')
+            entry_point.load.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()